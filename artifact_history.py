@@ -0,0 +1,210 @@
+"""Content-addressed, deduplicated history of artifact.md versions.
+
+Layout under ``artifact_history/``::
+
+    objects/<2 hex>/<62 hex>   zlib-compressed artifact text, keyed by sha256
+    index.jsonl                append-only {"ts", "hash", "parent"} records
+
+Identical content is stored once and unchanged iterations add nothing. A tiered
+retention policy thins old index entries (everything recent, then hourly,
+daily, weekly) and garbage-collects unreferenced blobs, so disk use grows
+sublinearly with the number of iterations.
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class ArtifactVersion:
+    ts: datetime
+    hash: str
+    parent: Optional[str]
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Keep every version younger than ``keep_all``; beyond that keep one
+    version per bucket width for as long as each tier lasts."""
+
+    keep_all: timedelta = timedelta(days=1)
+    tiers: Tuple[Tuple[timedelta, timedelta], ...] = (
+        # (maximum age, bucket width)
+        (timedelta(days=7), timedelta(hours=1)),
+        (timedelta(days=90), timedelta(days=1)),
+        (timedelta.max, timedelta(weeks=1)),
+    )
+
+    def select(self, versions: Sequence[ArtifactVersion], now: datetime) -> List[ArtifactVersion]:
+        """Return the versions to keep (the newest one in each bucket)."""
+        kept: List[ArtifactVersion] = []
+        seen_buckets: set[tuple[int, int]] = set()
+        for version in sorted(versions, key=lambda v: v.ts, reverse=True):
+            age = now - version.ts
+            if age < self.keep_all:
+                kept.append(version)
+                continue
+            for tier_index, (max_age, width) in enumerate(self.tiers):
+                if age < max_age:
+                    bucket = (tier_index, int(version.ts.timestamp() // width.total_seconds()))
+                    if bucket not in seen_buckets:
+                        seen_buckets.add(bucket)
+                        kept.append(version)
+                    break
+        return sorted(kept, key=lambda v: v.ts)
+
+
+class ArtifactHistory:
+    """History store rooted at ``root`` (usually ``<artifact dir>/artifact_history``)."""
+
+    COMPACT_EVERY = 50
+
+    def __init__(self, root: Path, *, policy: Optional[RetentionPolicy] = None) -> None:
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.index_path = self.root / "index.jsonl"
+        self.policy = policy or RetentionPolicy()
+        self._cache: Optional[Tuple[int, List[ArtifactVersion]]] = None
+
+    # --- blobs ---
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def _write_blob(self, content: str) -> str:
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(zlib.compress(data, 9))
+            os.replace(tmp, path)
+        return digest
+
+    def read(self, digest: str) -> str:
+        return zlib.decompress(self._blob_path(digest).read_bytes()).decode("utf-8")
+
+    # --- index ---
+
+    def versions(self) -> List[ArtifactVersion]:
+        """All indexed versions, oldest first."""
+        try:
+            size = self.index_path.stat().st_size
+        except FileNotFoundError:
+            return []
+        if self._cache is not None and self._cache[0] == size:
+            return list(self._cache[1])
+        versions: List[ArtifactVersion] = []
+        with self.index_path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                    versions.append(
+                        ArtifactVersion(datetime.fromisoformat(rec["ts"]), rec["hash"], rec.get("parent"))
+                    )
+                except (ValueError, KeyError, TypeError):
+                    continue  # tolerate a torn trailing line
+        self._cache = (size, versions)
+        return list(versions)
+
+    def head(self) -> Optional[ArtifactVersion]:
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def record(self, content: str, *, ts: Optional[datetime] = None) -> Optional[ArtifactVersion]:
+        """Store ``content`` as a new version unless it equals the current head.
+
+        Returns the new version, or None when nothing changed.
+        """
+        head = self.head()
+        digest = self._write_blob(content)
+        if head is not None and head.hash == digest:
+            return None
+        version = ArtifactVersion(
+            ts=(ts or datetime.now()).replace(microsecond=0),
+            hash=digest,
+            parent=head.hash if head else None,
+        )
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self.index_path.open("a", encoding="utf-8") as fh:
+            fh.write(self._encode(version))
+        if len(self.versions()) % self.COMPACT_EVERY == 0:
+            self.compact(now=version.ts)
+        return version
+
+    @staticmethod
+    def _encode(version: ArtifactVersion) -> str:
+        rec = {"ts": version.ts.isoformat(timespec="seconds"), "hash": version.hash, "parent": version.parent}
+        return json.dumps(rec) + "\n"
+
+    # --- queries ---
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[ArtifactVersion]:
+        """Versions with ``start <= ts <= end`` (either bound optional)."""
+        return [
+            v for v in self.versions()
+            if (start is None or v.ts >= start) and (end is None or v.ts <= end)
+        ]
+
+    def at(self, when: datetime) -> Optional[ArtifactVersion]:
+        """The version that was current at ``when``."""
+        current = None
+        for version in self.versions():
+            if version.ts > when:
+                break
+            current = version
+        return current
+
+    def diff(self, old: str, new: str, *, context: int = 3) -> str:
+        """Unified diff between two versions given by hash."""
+        a = self.read(old).splitlines(keepends=True)
+        b = self.read(new).splitlines(keepends=True)
+        return "".join(difflib.unified_diff(a, b, fromfile=old[:12], tofile=new[:12], n=context))
+
+    # --- retention ---
+
+    def compact(self, *, now: Optional[datetime] = None) -> int:
+        """Apply the retention policy and drop unreferenced blobs.
+
+        Returns the number of index entries removed.
+        """
+        versions = self.versions()
+        if not versions:
+            return 0
+        kept = self.policy.select(versions, now or datetime.now())
+        if versions[-1] not in kept:
+            kept.append(versions[-1])  # never drop the head
+        rebuilt: List[ArtifactVersion] = []
+        for version in kept:
+            parent = rebuilt[-1].hash if rebuilt else None
+            if parent == version.hash:
+                continue
+            rebuilt.append(ArtifactVersion(version.ts, version.hash, parent))
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text("".join(self._encode(v) for v in rebuilt), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+        self._cache = None
+        self._gc({v.hash for v in rebuilt})
+        return len(versions) - len(rebuilt)
+
+    def _gc(self, referenced: Iterable[str]) -> None:
+        keep = set(referenced)
+        if not self.objects.exists():
+            return
+        for bucket in self.objects.iterdir():
+            for blob in bucket.iterdir():
+                if bucket.name + blob.name not in keep:
+                    blob.unlink(missing_ok=True)
+
+
+__all__ = ["ArtifactHistory", "ArtifactVersion", "RetentionPolicy"]
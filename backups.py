@@ -1,39 +1,303 @@
+"""Hourly/daily/weekly backups of constraints.md.
+
+constraints.md is append-only, so most of every snapshot repeats the previous
+one. The first snapshot of each period is written as a full *base*
+(``<tier>/<stem>-<period>.md``). Later snapshots in the same hour only append
+the new bytes to ``hourly/<stem>-<period>.delta``. ``manifest-<stem>.jsonl`` records
+every snapshot as ``base + delta[:end]`` with its size and CRC32, so any
+recorded point restores with two reads and no chain replay.
+
+CLI::
+
+    python backups.py verify
+    python backups.py restore --at "2025-11-12 15:30" [--out restored.md]
+"""
+
 from __future__ import annotations
 
+import argparse
+import json
 import os
+import re
+import sys
+import zlib
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
+from typing import Iterator, Optional
+
+_TAIL_CHARS = 64
+_PERIOD_PATTERNS = {"hourly": r"\d{10}", "daily": r"\d{8}", "weekly": r"\d{4}W\d{2}"}
 
 
 def _backup_root() -> Path:
     return Path(os.getenv("NLCO_BACKUP_DIR", ".nlco/backups"))
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class BackupRetention:
+    """How many bases to keep per tier (0 keeps everything)."""
+
+    hourly: int = 48
+    daily: int = 60
+    weekly: int = 104
+
+    @classmethod
+    def from_env(cls) -> "BackupRetention":
+        return cls(
+            hourly=_env_int("NLCO_BACKUP_KEEP_HOURLY", cls.hourly),
+            daily=_env_int("NLCO_BACKUP_KEEP_DAILY", cls.daily),
+            weekly=_env_int("NLCO_BACKUP_KEEP_WEEKLY", cls.weekly),
+        )
+
+
+def _periods(ts: datetime) -> dict[str, str]:
+    iso_year, iso_week, _ = ts.isocalendar()
+    return {
+        "hourly": f"{ts:%Y%m%d%H}",
+        "daily": f"{ts:%Y%m%d}",
+        "weekly": f"{iso_year}W{iso_week:02d}",
+    }
+
+
+class BackupEngine:
+    """Base + append-delta snapshot store for one source file stem."""
+
+    def __init__(self, root: Path, stem: str, *, retention: Optional[BackupRetention] = None) -> None:
+        self.root = Path(root)
+        self.stem = stem
+        self.retention = retention or BackupRetention.from_env()
+        self.manifest = self.root / f"manifest-{stem}.jsonl"
+
+    # --- manifest ---
+
+    def records(self) -> Iterator[dict]:
+        if not self.manifest.exists():
+            return
+        with self.manifest.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def _last_record(self, tier: str = "hourly") -> Optional[dict]:
+        """Last manifest record for ``tier``, read from the end of the file."""
+        try:
+            size = self.manifest.stat().st_size
+        except FileNotFoundError:
+            return None
+        window = 4096
+        with self.manifest.open("rb") as fh:
+            while True:
+                start = max(0, size - window)
+                fh.seek(start)
+                lines = fh.read(size - start).decode("utf-8", errors="replace").splitlines()
+                complete = lines if start == 0 else lines[1:]
+                for line in reversed(complete):
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if rec.get("tier") == tier:
+                        return rec
+                if start == 0:
+                    return None
+                window *= 4
+
+    def _append_record(self, rec: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self.manifest.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    # --- snapshots ---
+
+    def _write_base(self, tier: str, period: str, data: bytes) -> str:
+        directory = self.root / tier
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.stem}-{period}.md"
+        n = 1
+        while path.exists():
+            # A non-append rewrite inside an already based period
+            n += 1
+            path = directory / f"{self.stem}-{period}-{n}.md"
+        path.write_bytes(data)
+        return str(path.relative_to(self.root))
+
+    def snapshot(self, content: str, now: Optional[datetime] = None) -> None:
+        ts = now or datetime.now()
+        periods = _periods(ts)
+        data: Optional[bytes] = None
+
+        for tier in ("daily", "weekly"):
+            if not (self.root / tier / f"{self.stem}-{periods[tier]}.md").exists():
+                data = data if data is not None else content.encode("utf-8")
+                base = self._write_base(tier, periods[tier], data)
+                self._append_record(self._record(ts, tier, base, None, 0, len(data), zlib.crc32(data), content))
+                self._prune(tier)
+
+        last = self._last_record("hourly")
+        prefix = periods["hourly"]
+        same_period = last is not None and Path(last["base"]).name.startswith(f"{self.stem}-{prefix}")
+        if same_period and (self.root / last["base"]).exists() and self._is_append(last, content):
+            if len(content) == last["chars"]:
+                return
+            appended = content[last["chars"]:].encode("utf-8")
+            delta = last["delta"] or str(Path("hourly") / f"{Path(last['base']).stem}.delta")
+            with (self.root / delta).open("ab") as fh:
+                if fh.tell() != last["end"]:
+                    fh.truncate(last["end"])  # drop bytes from an interrupted write
+                fh.write(appended)
+            self._append_record(
+                self._record(
+                    ts, "hourly", last["base"], delta, last["end"] + len(appended),
+                    last["size"] + len(appended), zlib.crc32(appended, last["crc"]), content,
+                )
+            )
+            return
+
+        data = data if data is not None else content.encode("utf-8")
+        base = self._write_base("hourly", prefix, data)
+        self._append_record(self._record(ts, "hourly", base, None, 0, len(data), zlib.crc32(data), content))
+        self._prune("hourly")
+
+    @staticmethod
+    def _record(ts, tier, base, delta, end, size, crc, content) -> dict:
+        return {
+            "ts": ts.isoformat(timespec="seconds"),
+            "tier": tier,
+            "base": base,
+            "delta": delta,
+            "end": end,
+            "size": size,
+            "crc": crc,
+            "chars": len(content),
+            "tail": content[-_TAIL_CHARS:],
+        }
+
+    @staticmethod
+    def _is_append(last: dict, content: str) -> bool:
+        chars = last["chars"]
+        tail = last["tail"]
+        return len(content) >= chars and content[chars - len(tail):chars] == tail
+
+    # --- retention ---
+
+    def _prune(self, tier: str) -> None:
+        keep = getattr(self.retention, tier)
+        if keep <= 0:
+            return
+        # Exact "<stem>-<period>[-N]" names only: a glob on "<stem>-*" would also
+        # match other stems sharing the prefix (e.g. "c" vs "c-notes").
+        pattern = re.compile(rf"{re.escape(self.stem)}-({_PERIOD_PATTERNS[tier]})(?:-\d+)?")
+        bases = {}
+        for path in (self.root / tier).glob("*.md"):
+            match = pattern.fullmatch(path.stem)
+            if match:
+                bases[path] = match.group(1)
+        periods = sorted(set(bases.values()))
+        expired = set(periods[:-keep])
+        if not expired:
+            return
+        for path, period in bases.items():
+            if period in expired:
+                path.unlink(missing_ok=True)
+                path.with_suffix(".delta").unlink(missing_ok=True)
+        self._compact_manifest()
+
+    def _compact_manifest(self) -> None:
+        kept = [rec for rec in self.records() if (self.root / rec["base"]).exists()]
+        tmp = self.manifest.with_suffix(".tmp")
+        tmp.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in kept), encoding="utf-8")
+        os.replace(tmp, self.manifest)
+
+    # --- restore / verify ---
+
+    def _materialize(self, rec: dict) -> bytes:
+        data = (self.root / rec["base"]).read_bytes()
+        if rec.get("delta"):
+            with (self.root / rec["delta"]).open("rb") as fh:
+                data += fh.read(rec["end"])
+        return data
+
+    def restore(self, at: Optional[datetime] = None) -> Optional[str]:
+        """Content of the latest snapshot taken at or before ``at``."""
+        best = None
+        for rec in self.records():
+            if at is not None and datetime.fromisoformat(rec["ts"]) > at:
+                continue
+            if best is None or rec["ts"] >= best["ts"]:
+                best = rec
+        if best is None:
+            return None
+        return self._materialize(best).decode("utf-8")
+
+    def verify(self) -> list[str]:
+        """Check every manifest record; returns a list of problems (empty if OK)."""
+        problems = []
+        for rec in self.records():
+            label = f"{rec['ts']} {rec['tier']} {rec['base']}"
+            try:
+                data = self._materialize(rec)
+            except OSError as exc:
+                problems.append(f"{label}: {exc}")
+                continue
+            if len(data) != rec["size"]:
+                problems.append(f"{label}: size {len(data)} != {rec['size']}")
+            elif zlib.crc32(data) != rec["crc"]:
+                problems.append(f"{label}: checksum mismatch")
+        return problems
+
+
 def ensure_backups(src_path: Path, *, content: str, now: datetime | None = None) -> None:
-    """Write hourly, daily, and weekly snapshots of ``content`` if missing.
+    """Snapshot ``content`` into the hourly/daily/weekly backup tiers.
 
-    - Minimal: creates a single file per period boundary; no rotation.
     - Safe: if ``content`` is empty, does nothing.
+    - Cheap: appends within the current hour only write the appended bytes.
     """
     if not content:
         return
-    ts = now or datetime.now()
-    root = _backup_root()
-    stem = src_path.stem or "constraints"
-
-    hourly = root / "hourly"
-    daily = root / "daily"
-    weekly = root / "weekly"
-    for d in (hourly, daily, weekly):
-        d.mkdir(parents=True, exist_ok=True)
-
-    files: list[tuple[Path, str]] = []
-    files.append((hourly / f"{stem}-{ts:%Y%m%d%H}.md", content))
-    files.append((daily / f"{stem}-{ts:%Y%m%d}.md", content))
-    iso_year, iso_week, _ = ts.isocalendar()
-    files.append((weekly / f"{stem}-{iso_year}W{iso_week:02d}.md", content))
+    BackupEngine(_backup_root(), src_path.stem or "constraints").snapshot(content, now=now)
+
+
+def main(argv: list[str]) -> int:
+    p = argparse.ArgumentParser(description="Inspect constraints backups")
+    p.add_argument("--root", default=None, help="backup dir (default: $NLCO_BACKUP_DIR or .nlco/backups)")
+    p.add_argument("--stem", default="constraints")
+    sub = p.add_subparsers(dest="command", required=True)
+    sub.add_parser("verify", help="check integrity of every recorded snapshot")
+    r = sub.add_parser("restore", help="print or write a snapshot")
+    r.add_argument("--at", default=None, help="'YYYY-MM-DD HH:MM[:SS]' (default: latest)")
+    r.add_argument("--out", default=None)
+    args = p.parse_args(argv)
+
+    engine = BackupEngine(Path(args.root) if args.root else _backup_root(), args.stem)
+    if args.command == "verify":
+        problems = engine.verify()
+        for line in problems:
+            print(line)
+        count = sum(1 for _ in engine.records())
+        print(f"{count} snapshot(s) checked, {len(problems)} problem(s)")
+        return 1 if problems else 0
+
+    at = datetime.fromisoformat(args.at) if args.at else None
+    content = engine.restore(at)
+    if content is None:
+        print("no snapshot found", file=sys.stderr)
+        return 1
+    if args.out:
+        Path(args.out).write_text(content, encoding="utf-8")
+    else:
+        sys.stdout.write(content)
+    return 0
 
-    for path, data in files:
-        if not path.exists():
-            path.write_text(data, encoding="utf-8")
 
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
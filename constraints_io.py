@@ -1,15 +1,129 @@
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, Dict, List
 import os
 
 from file_lock import locked_file
 from backups import ensure_backups
 
 
+_TAIL_BLOCK_SIZE = 64 * 1024
+_VERIFY_BYTES = 64
+
+
+@dataclass
+class _TailState:
+    """Cached tail of a file, used to parse only appended bytes on refresh."""
+
+    ino: int
+    size: int
+    mtime_ns: int
+    lines: List[str]
+    keep: int
+    complete: bool  # ``lines`` covers the whole file
+    last_bytes: bytes  # trailing bytes used to confirm the change was an append
+
+
+_TAIL_CACHE: Dict[Path, _TailState] = {}
+
+
+def _ends_with_break(text: str) -> bool:
+    return bool(text) and (text + "x").splitlines()[-1] == "x"
+
+
+def _read_tail(fh: BinaryIO, end: int, n: int, block_size: int = _TAIL_BLOCK_SIZE) -> tuple[List[str], bool]:
+    """Read backwards in blocks until ``n`` complete lines are available.
+
+    Returns ``(lines, complete)`` where ``complete`` means the start of the file
+    was reached. Cuts happen just after a ``\n`` byte, which is always a valid
+    UTF-8 boundary and a line boundary for ``str.splitlines``.
+    """
+    pos = end
+    chunks: List[bytes] = []
+    newlines = 0
+    while pos > 0 and newlines <= n:
+        step = min(block_size, pos)
+        pos -= step
+        fh.seek(pos)
+        chunk = fh.read(step)
+        chunks.append(chunk)
+        newlines += chunk.count(b"\n")
+    data = b"".join(reversed(chunks))
+    if pos > 0:
+        data = data[data.index(b"\n") + 1:]
+    return data.decode("utf-8").splitlines()[-n:], pos == 0
+
+
+def _try_append(fh: BinaryIO, state: _TailState, st: os.stat_result) -> bool:
+    """Extend ``state`` with bytes appended since it was cached.
+
+    Returns False when the change was not a pure append (rewrite, truncation,
+    or an ambiguous ``\r`` / ``\r\n`` split), so the caller re-reads the tail.
+    """
+    if st.st_ino != state.ino or st.st_size <= state.size or state.last_bytes.endswith(b"\r"):
+        return False
+    fh.seek(state.size - len(state.last_bytes))
+    if fh.read(len(state.last_bytes)) != state.last_bytes:
+        return False
+    appended = fh.read(st.st_size - state.size)
+    try:
+        text = appended.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+    lines = state.lines
+    if lines and not _ends_with_break(state.last_bytes.decode("utf-8", errors="ignore")):
+        text = lines.pop() + text
+    lines.extend(text.splitlines())
+    if len(lines) > state.keep:
+        del lines[: len(lines) - state.keep]
+        state.complete = False
+    state.size = st.st_size
+    state.mtime_ns = st.st_mtime_ns
+    state.last_bytes = (state.last_bytes + appended)[-_VERIFY_BYTES:]
+    return True
+
+
 def tail_lines(path: Path, n: int) -> List[str]:
-    if not path.exists():
+    """Return the last ``n`` lines of ``path`` (same result as ``splitlines()[-n:]``).
+
+    Only the end of the file is read, and repeated calls on an append-only file
+    parse just the newly appended bytes, so refresh cost does not grow with the
+    file size.
+    """
+    if n <= 0:
+        # Keep the slicing semantics of ``[-0:]`` (whole file) for odd callers.
+        if not path.exists():
+            return []
+        return path.read_text(encoding="utf-8").splitlines()[-n:]
+    try:
+        fh = path.open("rb")
+    except FileNotFoundError:
+        _TAIL_CACHE.pop(path, None)
         return []
-    return path.read_text(encoding="utf-8").splitlines()[-n:]
+    with fh:
+        st = os.fstat(fh.fileno())
+        state = _TAIL_CACHE.get(path)
+        if state is not None and (state.keep >= n or state.complete):
+            unchanged = (
+                st.st_ino == state.ino
+                and st.st_size == state.size
+                and st.st_mtime_ns == state.mtime_ns
+            )
+            if unchanged or _try_append(fh, state, st):
+                return state.lines[-n:]
+        lines, complete = _read_tail(fh, st.st_size, n)
+        fh.seek(max(0, st.st_size - _VERIFY_BYTES))
+        last_bytes = fh.read(min(st.st_size, _VERIFY_BYTES))
+    _TAIL_CACHE[path] = _TailState(
+        ino=st.st_ino,
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        lines=list(lines),
+        keep=n,
+        complete=complete,
+        last_bytes=last_bytes,
+    )
+    return lines
 
 
 def append_line(path: Path, text: str) -> None:
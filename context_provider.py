@@ -1,9 +1,23 @@
-"""Context provider for nlco_iter - handles system info, weather, etc."""
+"""Context provider for nlco_iter - handles system info, weather, etc.
+
+Each source is wrapped in a :class:`ContextSource` with its own TTL. Sources are
+refreshed concurrently on a small thread pool; once a value exists it is served
+immediately and revalidated in the background when stale, so building the
+context never waits on a slow source for longer than ``CONTEXT_WAIT_SECONDS``.
+"""
 
 import datetime
+import os
 import subprocess
 import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, Optional
+from urllib.request import urlopen
 
 
 # Load location from validated config
@@ -74,9 +88,8 @@ def get_weather_info():
     """Get weather information for configured location."""
     try:
         # Get current + 3 day forecast with hourly data
-        weather_raw = subprocess.run(['curl', '-s', f'wttr.in/{LOCATION}?format=j1'], 
-                                   capture_output=True, text=True, timeout=5).stdout
-        w = json.loads(weather_raw)
+        with urlopen(f"https://wttr.in/{LOCATION}?format=j1", timeout=5) as resp:
+            w = json.loads(resp.read().decode("utf-8"))
         
         # Current conditions
         current = w['current_condition'][0]
@@ -110,11 +123,50 @@ def get_weather_info():
         return f"{LOCATION}: unavailable (error: {str(e)})"
 
 
+def _format_bytes(num: float) -> str:
+    for unit in ("B", "K", "M", "G", "T"):
+        if abs(num) < 1024 or unit == "T":
+            return f"{num:.1f}{unit}" if unit != "B" else f"{num:.0f}B"
+        num /= 1024
+    return f"{num:.1f}T"
+
+
+def _read_meminfo(path: Path = Path("/proc/meminfo")) -> dict[str, int]:
+    """Parse /proc/meminfo into bytes keyed by field name."""
+    info: dict[str, int] = {}
+    for line in path.read_text().splitlines():
+        key, _, rest = line.partition(":")
+        parts = rest.split()
+        if parts and parts[0].isdigit():
+            info[key] = int(parts[0]) * (1024 if parts[1:2] == ["kB"] else 1)
+    return info
+
+
 def get_system_info():
-    """Get system memory and disk info."""
-    mem = subprocess.run(['free', '-h'], capture_output=True, text=True, check=True).stdout
-    df_output = subprocess.run(['df', '-h', '/'], capture_output=True, text=True, check=True).stdout
-    return f"'free -h':\n{mem}\n'df -h /':\n{df_output}"
+    """Get system memory and disk info from /proc and statvfs (no subprocesses)."""
+    try:
+        mem = _read_meminfo()
+        st = os.statvfs("/")
+    except (OSError, AttributeError):
+        # Non-Linux hosts without /proc: fall back to the shell tools.
+        mem_out = subprocess.run(['free', '-h'], capture_output=True, text=True, check=True).stdout
+        df_output = subprocess.run(['df', '-h', '/'], capture_output=True, text=True, check=True).stdout
+        return f"'free -h':\n{mem_out}\n'df -h /':\n{df_output}"
+
+    total = mem.get("MemTotal", 0)
+    available = mem.get("MemAvailable", mem.get("MemFree", 0))
+    swap_total = mem.get("SwapTotal", 0)
+    swap_used = swap_total - mem.get("SwapFree", 0)
+    disk_total = st.f_blocks * st.f_frsize
+    disk_free = st.f_bavail * st.f_frsize
+    disk_used = disk_total - st.f_bfree * st.f_frsize
+    pct = (disk_used / disk_total * 100) if disk_total else 0.0
+    return (
+        f"Memory: {_format_bytes(total - available)} used / {_format_bytes(total)} total "
+        f"({_format_bytes(available)} available), swap {_format_bytes(swap_used)} / {_format_bytes(swap_total)}\n"
+        f"Disk /: {_format_bytes(disk_used)} used / {_format_bytes(disk_total)} total "
+        f"({_format_bytes(disk_free)} free, {pct:.0f}% used)"
+    )
 
 
 def get_home_status():
@@ -126,27 +178,111 @@ def get_home_status():
         return ""
 
 
+CONTEXT_WAIT_SECONDS = float(os.getenv("NLCO_CONTEXT_WAIT", "2.0"))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=6, thread_name_prefix="context")
+
+
+@dataclass
+class ContextSource:
+    """A TTL-cached context source with stale-while-revalidate refresh."""
+
+    name: str
+    fetch: Callable[[], str]
+    ttl: float
+    placeholder: str = ""
+    value: Optional[str] = None
+    fetched_at: float = 0.0
+    _future: Optional[Future] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _refresh(self) -> str:
+        # The in-flight future is cleared together with storing the value, so
+        # a concurrent caller either joins this refresh or sees the fresh value.
+        try:
+            value = self.fetch()
+        except BaseException:
+            with self._lock:
+                self._future = None
+            raise
+        with self._lock:
+            self.value = value
+            self.fetched_at = time.monotonic()
+            self._future = None
+        return value
+
+    def kick(self) -> Optional[Future]:
+        """Start a background refresh if the cached value is missing or stale."""
+        with self._lock:
+            if self.value is not None and time.monotonic() - self.fetched_at < self.ttl:
+                return None
+            if self._future is None:
+                self._future = _EXECUTOR.submit(self._refresh)
+            return self._future
+
+    def get(self, *, wait: float) -> str:
+        future = self.kick()
+        with self._lock:
+            cached = self.value
+        if future is None or cached is not None:
+            return cached or ""
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeout:
+            return self.placeholder
+        except Exception as exc:
+            return f"{self.placeholder or self.name} (error: {exc})"
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.value = None
+            self.fetched_at = 0.0
+
+
+# Fetchers are looked up at call time so tests can monkeypatch the getters.
+SOURCES: dict[str, ContextSource] = {
+    "weather": ContextSource(
+        "weather", lambda: get_weather_info(), ttl=15 * 60,
+        placeholder=f"{LOCATION}: unavailable (refreshing)",
+    ),
+    "home": ContextSource("home", lambda: get_home_status(), ttl=60),
+    "post_queue": ContextSource("post_queue", lambda: get_post_queue_status(), ttl=60),
+    "autoposter": ContextSource("autoposter", lambda: get_autoposter_alert(), ttl=60),
+    "system": ContextSource("system", lambda: get_system_info(), ttl=30),
+}
+
+
+def collect_sources(wait: float = CONTEXT_WAIT_SECONDS) -> dict[str, str]:
+    """Refresh all sources concurrently and return their values.
+
+    Sources without a cached value get at most ``wait`` seconds in total;
+    anything slower falls back to its placeholder and lands in the cache
+    for the next call.
+    """
+    for source in SOURCES.values():
+        source.kick()
+    deadline = time.monotonic() + wait
+    return {
+        name: source.get(wait=max(0.0, deadline - time.monotonic()))
+        for name, source in SOURCES.items()
+    }
+
+
 def create_context_string():
     """Create the full context string for the AI."""
     now = datetime.datetime.now()
+    values = collect_sources()
     context_parts = [
         f"Datetime: {now:%Y-%m-%d %H:%M:%S} ({now:%A})",
-        f"Weather: {get_weather_info()}",
+        f"Weather: {values['weather']}",
     ]
-    
-    # Add home status if available
-    home_status = get_home_status()
-    if home_status:
-        context_parts.append(home_status)
-
-    post_queue_status = get_post_queue_status()
-    if post_queue_status:
-        context_parts.append(post_queue_status)
 
-    autoposter_alert = get_autoposter_alert()
-    if autoposter_alert:
-        context_parts.append(autoposter_alert)
+    # Optional sources are only included when they have something to say
+    for name in ("home", "post_queue", "autoposter"):
+        if values[name]:
+            context_parts.append(values[name])
 
-    context_parts.append(get_system_info())
+    context_parts.append(values["system"])
 
     return "\n".join(context_parts)
+
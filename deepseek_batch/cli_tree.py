@@ -14,12 +14,18 @@ def main() -> None:
     p.add_argument("--iters", type=int, default=2)
     p.add_argument("--model", default=None)
     p.add_argument("--temperature", type=float, default=None)
+    p.add_argument("--branch", type=int, default=1, help="children per beam node per depth")
+    p.add_argument("--token-budget", type=int, default=None, help="stop expanding after ~N generated tokens")
+    p.add_argument("--tree-json", default=None, help="write the search tree to this file")
     args = p.parse_args()
 
     gen_params = ({"temperature": args.temperature} if args.temperature is not None else None)
-    tree = TryTree(init_n=args.init_n, expand_k=args.expand_k, iters=args.iters, model=args.model, gen_params=gen_params)
+    tree = TryTree(init_n=args.init_n, expand_k=args.expand_k, iters=args.iters, model=args.model, gen_params=gen_params, branch=args.branch, token_budget=args.token_budget)
     out = tree(args.text)
     print(_c("BEST", "36") + ": " + _c(out, "1;32"))
+    if args.tree_json:
+        with open(args.tree_json, "w", encoding="utf-8") as fh:
+            fh.write(tree.last_tree.to_json(indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,281 @@
+"""Pairwise ranking strategies for large candidate pools.
+
+A single ``PickBest`` prompt degrades (and eventually overflows context) as
+the pool grows, and ``BinaryRanker`` issues its comparisons one at a time.
+The strategies here judge many pairs at once and only wait between rounds:
+
+- ``tournament``: single elimination; N candidates need ceil(log2 N) rounds
+  and N - 1 comparisons.
+- ``swiss``: every candidate plays each round against one with the same
+  score (no rematches when avoidable); ranks the whole pool, not only the
+  winner.
+- ``bradley_terry``: judges a sample of random pairs in a single round and
+  fits Bradley-Terry strengths to the outcomes.
+
+Verdicts are kept in a :class:`ComparisonCache`, so a pair judged once (in
+either order) by the same comparator and model is never sent again.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import dspy
+
+Pair = Tuple[int, int]
+
+
+def lm_id() -> str:
+    """Model name of the configured dspy LM, or "" when none is set."""
+    lm = getattr(getattr(dspy, "settings", None), "lm", None)
+    if lm is None:
+        return ""
+    return str(getattr(lm, "model", None) or getattr(lm, "kwargs", {}).get("model", "") or type(lm).__name__)
+
+
+class ComparisonCache:
+    """Thread-safe memo of pairwise verdicts: ``(left, right) -> left won``.
+
+    Verdicts are keyed by comparator and judging model as well as the pair.
+    With ``max_entries`` set, the least recently used verdicts are dropped.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self._verdicts: "OrderedDict[Tuple[str, str, str, str], bool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.hits = 0
+
+    def get(self, comparator: str, left: str, right: str, *, model: str = "") -> Optional[bool]:
+        with self._lock:
+            key = (comparator, model, left, right)
+            verdict = self._verdicts.get(key)
+            if verdict is None:
+                key = (comparator, model, right, left)
+                reverse = self._verdicts.get(key)
+                verdict = None if reverse is None else not reverse
+            if verdict is not None:
+                self._verdicts.move_to_end(key)
+                self.hits += 1
+            return verdict
+
+    def put(self, comparator: str, left: str, right: str, left_won: bool, *, model: str = "") -> None:
+        with self._lock:
+            key = (comparator, model, left, right)
+            self._verdicts[key] = left_won
+            self._verdicts.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._verdicts) > self.max_entries:
+                    self._verdicts.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._verdicts)
+
+
+class PairwiseJudge:
+    """Runs a left/right comparator Signature over many pairs concurrently."""
+
+    def __init__(self, comparator: Type[dspy.Signature], *, cache: Optional[ComparisonCache] = None, max_concurrency: int = 8):
+        self.comparator = comparator
+        self.cache = cache if cache is not None else ComparisonCache()
+        self.max_concurrency = max(1, max_concurrency)
+        self.calls = 0
+        self._pending: Dict[Tuple[str, str, str], Awaitable[bool]] = {}
+
+    async def _judge(self, left: str, right: str, slots: asyncio.Semaphore, model: str) -> bool:
+        pred = dspy.Predict(self.comparator)
+        async with slots:
+            acall = getattr(pred, "acall", None)
+            res = await acall(left=left, right=right) if acall is not None else await asyncio.to_thread(pred, left=left, right=right)
+        self.calls += 1
+        left_won = "left" in str(getattr(res, "better", res)).lower()
+        self.cache.put(self.comparator.__name__, left, right, left_won, model=model)
+        return left_won
+
+    async def compare(self, left: str, right: str, slots: Optional[asyncio.Semaphore] = None) -> bool:
+        """True when ``left`` beats ``right``; cached and coalesced per pair."""
+        name, model = self.comparator.__name__, lm_id()
+        cached = self.cache.get(name, left, right, model=model)
+        if cached is not None:
+            return cached
+        pending = self._pending.get((model, left, right))
+        if pending is not None:
+            return await pending
+        pending = self._pending.get((model, right, left))
+        if pending is not None:
+            return not await pending
+        task = asyncio.ensure_future(self._judge(left, right, slots or asyncio.Semaphore(self.max_concurrency), model))
+        self._pending[(model, left, right)] = task
+        try:
+            return await task
+        finally:
+            self._pending.pop((model, left, right), None)
+
+    async def compare_many(self, items: Sequence[str], pairs: Sequence[Pair]) -> List[bool]:
+        """Judge every ``(i, j)`` index pair of ``items`` in parallel."""
+        slots = asyncio.Semaphore(self.max_concurrency)
+        return list(await asyncio.gather(*(self.compare(items[i], items[j], slots) for i, j in pairs)))
+
+
+@dataclass
+class RankResult:
+    """Candidates best-first, with the strategy's score for each."""
+
+    ranking: List[str]
+    scores: List[float]
+    rounds: int = 0
+    comparisons: int = 0
+    details: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def best(self) -> str:
+        return self.ranking[0] if self.ranking else ""
+
+
+async def tournament(items: Sequence[str], judge: PairwiseJudge) -> RankResult:
+    """Single elimination; later eliminations rank higher, ties keep seed order."""
+    alive = list(range(len(items)))
+    eliminated: List[List[int]] = []
+    rounds = comparisons = 0
+    while len(alive) > 1:
+        pairs = [(alive[k], alive[k + 1]) for k in range(0, len(alive) - 1, 2)]
+        verdicts = await judge.compare_many(items, pairs)
+        rounds += 1
+        comparisons += len(pairs)
+        winners = [i if left_won else j for (i, j), left_won in zip(pairs, verdicts)]
+        eliminated.append([j if left_won else i for (i, j), left_won in zip(pairs, verdicts)])
+        if len(alive) % 2:
+            winners.append(alive[-1])  # bye
+        alive = winners
+    order = alive + [i for lost in reversed(eliminated) for i in sorted(lost)]
+    survived = {i: float(r) for r, lost in enumerate(eliminated) for i in lost}
+    survived.update({i: float(rounds) for i in alive})
+    return RankResult([items[i] for i in order], [survived[i] for i in order], rounds, comparisons)
+
+
+def _swiss_pairs(standings: List[int], played: set, had_bye: set) -> Tuple[List[Pair], Optional[int]]:
+    unpaired = list(standings)
+    pairs: List[Pair] = []
+    bye = None
+    if len(unpaired) % 2:
+        # Lowest-ranked candidate that has not had a bye yet sits out.
+        bye = next((i for i in reversed(unpaired) if i not in had_bye), unpaired[-1])
+        unpaired.remove(bye)
+    while unpaired:
+        first = unpaired.pop(0)
+        partner = next((k for k, j in enumerate(unpaired) if frozenset((first, j)) not in played), 0)
+        pairs.append((first, unpaired.pop(partner)))
+    return pairs, bye
+
+
+async def swiss(items: Sequence[str], judge: PairwiseJudge, rounds: Optional[int] = None) -> RankResult:
+    """Swiss system: ``rounds`` (default ceil(log2 N)) rounds of score-matched pairings."""
+    n = len(items)
+    rounds = max(1, math.ceil(math.log2(n))) if rounds is None else rounds
+    points = [0.0] * n
+    opponents: List[List[int]] = [[] for _ in range(n)]
+    played: set = set()
+    had_bye: set = set()
+    comparisons = 0
+    for _ in range(rounds if n > 1 else 0):
+        standings = sorted(range(n), key=lambda i: (-points[i], i))
+        pairs, bye = _swiss_pairs(standings, played, had_bye)
+        verdicts = await judge.compare_many(items, pairs)
+        comparisons += len(pairs)
+        for (i, j), left_won in zip(pairs, verdicts):
+            points[i if left_won else j] += 1.0
+            opponents[i].append(j)
+            opponents[j].append(i)
+            played.add(frozenset((i, j)))
+        if bye is not None:
+            points[bye] += 1.0
+            had_bye.add(bye)
+    # Buchholz (sum of opponents' points) breaks ties between equal scores.
+    buchholz = [sum(points[o] for o in opponents[i]) for i in range(n)]
+    order = sorted(range(n), key=lambda i: (-points[i], -buchholz[i], i))
+    return RankResult([items[i] for i in order], [points[i] for i in order], rounds if n > 1 else 0, comparisons, {"buchholz": [buchholz[i] for i in order]})
+
+
+def fit_bradley_terry(n: int, outcomes: Sequence[Tuple[int, int]], iters: int = 200, tol: float = 1e-9) -> List[float]:
+    """Bradley-Terry strengths from ``(winner, loser)`` pairs via the MM algorithm.
+
+    Every item also gets one win and one loss against a virtual opponent of
+    strength 1, which keeps the fit finite for unbeaten or winless items.
+    """
+    wins = [1.0] * n
+    games: List[Dict[int, float]] = [{} for _ in range(n)]
+    for winner, loser in outcomes:
+        wins[winner] += 1.0
+        games[winner][loser] = games[winner].get(loser, 0.0) + 1.0
+        games[loser][winner] = games[loser].get(winner, 0.0) + 1.0
+    strength = [1.0] * n
+    for _ in range(iters):
+        updated = []
+        for i in range(n):
+            denom = 2.0 / (strength[i] + 1.0)
+            denom += sum(count / (strength[i] + strength[j]) for j, count in games[i].items())
+            updated.append(wins[i] / denom)
+        delta = max(abs(a - b) for a, b in zip(updated, strength)) if n else 0.0
+        strength = updated
+        if delta < tol:
+            break
+    return strength
+
+
+async def bradley_terry(items: Sequence[str], judge: PairwiseJudge, samples_per_item: int = 4, seed: Optional[int] = None) -> RankResult:
+    """Judge ~``samples_per_item`` random pairs per candidate in one round and fit strengths."""
+    n = len(items)
+    rng = random.Random(seed)
+    pairs: List[Pair] = []
+    seen: set = set()
+    # Each shuffled ring gives every item two opponents and keeps the graph connected.
+    for _ in range(max(1, math.ceil(samples_per_item / 2)) if n > 1 else 0):
+        ring = list(range(n))
+        rng.shuffle(ring)
+        for k in range(n if n > 2 else 1):
+            i, j = ring[k], ring[(k + 1) % n]
+            if frozenset((i, j)) not in seen:
+                seen.add(frozenset((i, j)))
+                pairs.append((i, j))
+    verdicts = await judge.compare_many(items, pairs)
+    outcomes = [(i, j) if left_won else (j, i) for (i, j), left_won in zip(pairs, verdicts)]
+    strength = fit_bradley_terry(n, outcomes)
+    order = sorted(range(n), key=lambda i: (-strength[i], i))
+    return RankResult([items[i] for i in order], [strength[i] for i in order], 1 if pairs else 0, len(pairs))
+
+
+STRATEGIES: Dict[str, Callable[..., Awaitable[RankResult]]] = {
+    "tournament": tournament,
+    "swiss": swiss,
+    "bradley_terry": bradley_terry,
+}
+
+
+async def rank(items: Sequence[str], judge: PairwiseJudge, strategy: str = "tournament", **options) -> RankResult:
+    """Rank ``items`` with a named strategy (see ``STRATEGIES``)."""
+    try:
+        run = STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"unknown ranking strategy {strategy!r}; expected one of {sorted(STRATEGIES)}") from None
+    if not items:
+        return RankResult([], [])
+    return await run(list(items), judge, **options)
+
+
+__all__ = [
+    "ComparisonCache",
+    "PairwiseJudge",
+    "RankResult",
+    "STRATEGIES",
+    "bradley_terry",
+    "fit_bradley_terry",
+    "lm_id",
+    "rank",
+    "swiss",
+    "tournament",
+]
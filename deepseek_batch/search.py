@@ -0,0 +1,138 @@
+"""Beam search over refinements, recorded as an inspectable tree.
+
+Each depth expands the whole frontier at once (``branch`` children per beam
+node, all requested concurrently), drops children whose content was already
+seen, then ranks beam plus children with a batched pairwise strategy from
+:mod:`deepseek_batch.ranking` and keeps the best ``beam_width``. Wall time
+therefore grows with depth rather than with the number of nodes.
+
+Every node, including duplicates and pruned ones, is kept in a
+:class:`SearchTree` that serialises to JSON for later inspection.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .ranking import PairwiseJudge, rank
+
+
+def content_hash(text: str) -> str:
+    """Hash used to spot identical candidates (surrounding whitespace ignored)."""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budget accounting."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class SearchNode:
+    id: int
+    text: str
+    hash: str
+    depth: int
+    parent: Optional[int] = None
+    duplicate_of: Optional[int] = None
+    rank: Optional[int] = None  # position in the last ranking this node took part in
+    in_beam: bool = False
+
+
+@dataclass
+class SearchTree:
+    nodes: List[SearchNode] = field(default_factory=list)
+    best: Optional[int] = None
+    depth: int = 0
+    tokens: int = 0
+    comparisons: int = 0
+    stopped: str = "depth"  # "depth", "budget" or "exhausted"
+
+    @property
+    def best_text(self) -> str:
+        return self.nodes[self.best].text if self.best is not None else ""
+
+    def children(self, node_id: int) -> List[SearchNode]:
+        return [node for node in self.nodes if node.parent == node_id]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "best": self.best,
+            "depth": self.depth,
+            "tokens": self.tokens,
+            "comparisons": self.comparisons,
+            "stopped": self.stopped,
+            "nodes": [asdict(node) for node in self.nodes],
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+
+async def beam_search(
+    seeds: Sequence[str],
+    expand: Callable[[str], Awaitable[str]],
+    judge: PairwiseJudge,
+    *,
+    depth: int = 2,
+    beam_width: int = 2,
+    branch: int = 1,
+    token_budget: Optional[int] = None,
+    strategy: str = "tournament",
+    max_concurrency: int = 8,
+) -> SearchTree:
+    """Run the search from ``seeds``; ``expand(text)`` returns one refinement."""
+    tree = SearchTree()
+    seen: Dict[str, int] = {}
+    slots = asyncio.Semaphore(max(1, max_concurrency))
+
+    def add(text: str, level: int, parent: Optional[int]) -> Optional[SearchNode]:
+        node = SearchNode(id=len(tree.nodes), text=text, hash=content_hash(text), depth=level, parent=parent)
+        tree.nodes.append(node)
+        tree.tokens += estimate_tokens(text)
+        if node.hash in seen:
+            node.duplicate_of = seen[node.hash]
+            return None
+        seen[node.hash] = node.id
+        return node
+
+    async def select(pool: List[SearchNode]) -> List[SearchNode]:
+        result = await rank([node.text for node in pool], judge, strategy)
+        tree.comparisons += result.comparisons
+        # Map ranked texts back to nodes (texts are unique after dedup).
+        by_text = {node.text: node for node in pool}
+        ordered = [by_text[text] for text in result.ranking]
+        for position, node in enumerate(ordered):
+            node.rank = position
+            node.in_beam = position < beam_width
+        return ordered[:beam_width]
+
+    async def child(parent: SearchNode) -> str:
+        async with slots:
+            return await expand(parent.text)
+
+    beam = [node for node in (add(text, 0, None) for text in seeds) if node is not None]
+    if beam:
+        beam = await select(beam)
+    for level in range(1, depth + 1):
+        if not beam:
+            tree.stopped = "exhausted"
+            break
+        if token_budget is not None and tree.tokens >= token_budget:
+            tree.stopped = "budget"
+            break
+        parents = [parent for parent in beam for _ in range(max(1, branch))]
+        texts = await asyncio.gather(*(child(parent) for parent in parents))
+        fresh = [node for node in (add(text, level, parent.id) for text, parent in zip(texts, parents)) if node is not None]
+        tree.depth = level
+        if fresh:
+            beam = await select(beam + fresh)
+    if beam:
+        tree.best = beam[0].id
+    return tree
+
+
+__all__ = ["SearchNode", "SearchTree", "beam_search", "content_hash", "estimate_tokens"]
@@ -35,8 +35,14 @@ to simulate, learn, and then run a greedy-actor demo.
 """
 
 import argparse
+import asyncio
+import hashlib
 import math
+import os
 import random
+import sqlite3
+import threading
+import time
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 
@@ -467,12 +473,203 @@ class TagConcepts(dspy.Signature):
     )
 
 
+class RowActivations(BaseModel):
+    index: int = Field(..., description="0-based position of the observation in the batch.")
+    activations: List[ConceptActivation]
+
+
+class BatchActivations(BaseModel):
+    rows: List[RowActivations]
+
+
+class TagConceptsBatch(dspy.Signature):
+    """
+    Tag each STATE concept as true/false for EVERY observation in a batch.
+
+    Inputs:
+      - observations: reactor text logs; the i-th log has index i (0-based).
+      - concepts: the list of STATE concepts to tag, each with id + definition.
+
+    Output:
+      - rows: a structured object matching the BatchActivations schema:
+          {"rows": [{"index": 0, "activations": [{"concept_id": "...", "value": true/false}, ...]}, ...]}.
+        Output exactly one row per observation, and in each row exactly one
+        activation per input concept, with:
+          - concept_id: EXACTLY one of the given concept ids.
+          - value: true if the concept is clearly present in that observation,
+                   false otherwise.
+
+    Tag each observation on its own. Do NOT invent new concept ids. If unsure,
+    default to false.
+    """
+
+    observations: List[str] = dspy.InputField(
+        desc="Reactor log observations; the i-th has index i."
+    )
+    concepts: List[Concept] = dspy.InputField(
+        desc="List of STATE concept objects with 'id' and 'definition'."
+    )
+    rows: BatchActivations = dspy.OutputField(
+        desc="Structured BatchActivations object with one row per observation."
+    )
+
+
+class _RateLimiter:
+    """Spaces call starts at least 1/rate seconds apart (rate=None → unlimited)."""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _activation_vector(activations: List[ConceptActivation], state_concepts: List[Concept]) -> np.ndarray:
+    """Ternary STATE vector: 1 present, -1 absent, 0 missing (see tag_state)."""
+    vec = np.zeros(len(state_concepts), dtype=int)
+    id_to_idx = {c.id: i for i, c in enumerate(state_concepts)}
+    for act in activations:
+        if act.concept_id in id_to_idx:
+            vec[id_to_idx[act.concept_id]] = 1 if bool(act.value) else -1
+    return vec
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class ActivationCache:
+    """
+    On-disk observation → STATE activation cache (SQLite).
+
+    Keyed by (observation hash, concept id, definition hash, model), so an
+    edited definition or a different tagging model never reuses old answers.
+    Only definite answers (+1/-1) are stored; "missing" (0) is asked again.
+    The CLI opens it via from_env: CONCEPT_ACTIVATION_CACHE overrides the
+    default location, "off" disables it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS activations ("
+            " obs_hash TEXT NOT NULL, concept_id TEXT NOT NULL, def_hash TEXT NOT NULL,"
+            " model TEXT NOT NULL, value INTEGER NOT NULL,"
+            " PRIMARY KEY (obs_hash, concept_id, def_hash, model)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["ActivationCache"]:
+        path = os.getenv(
+            "CONCEPT_ACTIVATION_CACHE",
+            os.path.join(os.path.expanduser("~"), ".cache", "concept_world_model", "activations.sqlite"),
+        )
+        if path.strip().lower() in ("", "off", "0", "none"):
+            return None
+        return cls(path)
+
+    def lookup(
+        self, obs_hashes: List[str], concepts: List[Concept], model: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (values, known) arrays of shape (len(obs_hashes), len(concepts))."""
+        values = np.zeros((len(obs_hashes), len(concepts)), dtype=int)
+        known = np.zeros(values.shape, dtype=bool)
+        row_of = {h: i for i, h in enumerate(obs_hashes)}
+        col_of = {(c.id, _text_hash(c.definition)): j for j, c in enumerate(concepts)}
+        unique = list(row_of)
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start : start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT obs_hash, concept_id, def_hash, value FROM activations"
+                    f" WHERE model = ? AND obs_hash IN ({marks})",
+                    [model, *chunk],
+                ).fetchall()
+                for obs_hash, concept_id, def_hash, value in rows:
+                    j = col_of.get((concept_id, def_hash))
+                    if j is not None:
+                        values[row_of[obs_hash], j] = value
+                        known[row_of[obs_hash], j] = True
+        return values, known
+
+    def store(
+        self, obs_hashes: List[str], concepts: List[Concept], values: np.ndarray, model: str
+    ) -> None:
+        def_hashes = [_text_hash(c.definition) for c in concepts]
+        rows = [
+            (h, c.id, def_hashes[j], model, int(values[i, j]))
+            for i, h in enumerate(obs_hashes)
+            for j, c in enumerate(concepts)
+            if values[i, j] != 0
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO activations VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM activations").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
 class LLMConceptTagger(dspy.Module):
-    """One LLM call per observation → STATE concept bits only."""
+    """
+    LLM tagger for STATE concept bits.
+
+    tag_state makes one call per observation. tag_many packs `batch_size`
+    observations into one structured call (the concept list is sent once per
+    batch), runs up to `max_concurrency` batches at a time while starting at
+    most `calls_per_second` calls, and re-asks only for the rows a batch
+    answer missed or garbled, up to `max_retries` times, before falling back to
+    tag_state for those rows.
+
+    With an ActivationCache, both paths only ask the LLM for (observation,
+    concept) cells not answered before; identical observations are tagged once.
+    After the universe grows, only the new concept columns are tagged.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: int = 8,
+        max_concurrency: int = 4,
+        calls_per_second: Optional[float] = None,
+        max_retries: int = 2,
+        cache: Optional[ActivationCache] = None,
+    ):
         super().__init__()
         self.predict = dspy.Predict(TagConcepts)
+        self.predict_batch = dspy.Predict(TagConceptsBatch)
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.calls_per_second = calls_per_second
+        self.max_retries = max(0, max_retries)
+        self.cache = cache
+
+    def _model_name(self) -> str:
+        return str(getattr(dspy.settings.lm, "model", "") or "")
 
     def tag_state(self, observation: str, universe: ConceptUniverse) -> np.ndarray:
         """
@@ -484,6 +681,20 @@ class LLMConceptTagger(dspy.Module):
           - 0  → missing / no information (e.g. concept added after this data)
         """
         state_concepts = universe.state_concepts
+        if self.cache is None:
+            return self._predict_state(observation, state_concepts)
+        obs_hash = [_text_hash(observation)]
+        model = self._model_name()
+        values, known = self.cache.lookup(obs_hash, state_concepts, model)
+        missing = np.flatnonzero(~known[0])
+        if missing.size:
+            concepts = [state_concepts[k] for k in missing]
+            fresh = self._predict_state(observation, concepts)
+            values[0, missing] = fresh
+            self.cache.store(obs_hash, concepts, fresh[None, :], model)
+        return values[0]
+
+    def _predict_state(self, observation: str, state_concepts: List[Concept]) -> np.ndarray:
         out = self.predict(observation=observation, concepts=state_concepts)
         try:
             # Allow either a ConceptActivations instance, a dict-like object,
@@ -499,14 +710,133 @@ class LLMConceptTagger(dspy.Module):
             console.print(f"[red]Raw activations output:[/red] {getattr(out, 'activations', None)!r}")
             console.print(exc)
             raise
-        K_state = len(state_concepts)
-        vec = np.zeros(K_state, dtype=int)
-        id_to_idx = {c.id: i for i, c in enumerate(state_concepts)}
-        for act in activations.activations:
-            if act.concept_id in id_to_idx:
-                idx = id_to_idx[act.concept_id]
-                vec[idx] = 1 if bool(act.value) else -1
-        return vec
+        return _activation_vector(activations.activations, state_concepts)
+
+    async def _call_batch(self, observations: List[str], state_concepts: List[Concept]):
+        acall = getattr(self.predict_batch, "acall", None)
+        if acall is not None:
+            return await acall(observations=observations, concepts=state_concepts)
+        return await asyncio.to_thread(
+            self.predict_batch, observations=observations, concepts=state_concepts
+        )
+
+    async def _tag_batch(
+        self,
+        rows: List[int],
+        observations: List[str],
+        state_concepts: List[Concept],
+        out: np.ndarray,
+        slots: asyncio.Semaphore,
+        limiter: _RateLimiter,
+    ) -> None:
+        pending = list(rows)
+        for attempt in range(self.max_retries + 1):
+            async with slots:
+                await limiter.wait()
+                try:
+                    result = await self._call_batch(
+                        [observations[r] for r in pending], state_concepts
+                    )
+                    parsed = BatchActivations.model_validate(result.rows)
+                except Exception as exc:  # whole batch unusable; retry all its rows
+                    console.print(
+                        f"[yellow]Batch tag call failed for {len(pending)} rows "
+                        f"(attempt {attempt + 1}): {exc}[/yellow]"
+                    )
+                    continue
+            answered = {}
+            for row in parsed.rows:
+                if 0 <= row.index < len(pending) and row.activations:
+                    answered[row.index] = row.activations
+            for local, activations in answered.items():
+                out[pending[local], :] = _activation_vector(activations, state_concepts)
+            pending = [r for local, r in enumerate(pending) if local not in answered]
+            if not pending:
+                return
+        # Rows the batch calls never answered: one call each, errors surface.
+        for r in pending:
+            async with slots:
+                await limiter.wait()
+                universe = ConceptUniverse(state_concepts)
+                out[r, :] = await asyncio.to_thread(self.tag_state, observations[r], universe)
+
+    async def atag_many(
+        self,
+        observations: List[str],
+        universe: ConceptUniverse,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Async tag_many; unseen cells are tagged, the rest come from the cache."""
+        state_concepts = universe.state_concepts
+        if out is None:
+            out = np.zeros((len(observations), len(state_concepts)), dtype=int)
+        # Tag each distinct observation once and copy its row to duplicates.
+        position: Dict[str, int] = {}
+        unique_obs: List[str] = []
+        row_of: List[int] = []
+        for obs in observations:
+            h = _text_hash(obs)
+            if h not in position:
+                position[h] = len(unique_obs)
+                unique_obs.append(obs)
+            row_of.append(position[h])
+        hashes = list(position)
+        model = self._model_name()
+        if self.cache is not None:
+            values, known = self.cache.lookup(hashes, state_concepts, model)
+        else:
+            values = np.zeros((len(unique_obs), len(state_concepts)), dtype=int)
+            known = np.zeros(values.shape, dtype=bool)
+
+        # Rows missing the same concept columns are tagged together for just those columns.
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for u in range(len(unique_obs)):
+            missing = tuple(int(k) for k in np.flatnonzero(~known[u]))
+            if missing:
+                groups.setdefault(missing, []).append(u)
+
+        slots = asyncio.Semaphore(self.max_concurrency)
+        limiter = _RateLimiter(self.calls_per_second)
+
+        async def tag_group(columns: Tuple[int, ...], members: List[int]) -> None:
+            concepts = [state_concepts[k] for k in columns]
+            group_obs = [unique_obs[u] for u in members]
+            group_out = np.zeros((len(members), len(columns)), dtype=int)
+            await asyncio.gather(
+                *(
+                    self._tag_batch(
+                        list(range(start, min(start + self.batch_size, len(members)))),
+                        group_obs,
+                        concepts,
+                        group_out,
+                        slots,
+                        limiter,
+                    )
+                    for start in range(0, len(members), self.batch_size)
+                )
+            )
+            values[np.ix_(members, list(columns))] = group_out
+            if self.cache is not None:
+                self.cache.store([hashes[u] for u in members], concepts, group_out, model)
+
+        await asyncio.gather(*(tag_group(cols, members) for cols, members in groups.items()))
+        if row_of:
+            out[:, :] = values[row_of]
+        return out
+
+    def tag_many(
+        self,
+        observations: List[str],
+        universe: ConceptUniverse,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Tag many observations with batched, concurrent calls.
+
+        Returns (or fills `out`, shape (n, K_state)) with the same ternary
+        encoding as tag_state.
+        """
+        return asyncio.run(self.atag_many(observations, universe, out))
 
 
 # =========================
@@ -588,20 +918,23 @@ class EpisodeDataset:
             self.meltdown_steps.append(meltdown_step)
 
     def tag_all_state(self, tagger: LLMConceptTagger, universe: ConceptUniverse):
-        """Tag all observations with STATE concepts (LLM)."""
+        """Tag all observations with STATE concepts (LLM), batched when supported."""
         n = len(self.observations)
         K_state = len(universe.state_concepts)
         Z = np.zeros((n, K_state), dtype=int)
         print("\n[LLM TAGGING v3] STATE concepts (id, source):")
         for c in universe.state_concepts:
             print(f"  - {c.id} [{c.source}]")
+        if hasattr(tagger, "tag_many"):
+            tagger.tag_many(self.observations, universe, out=Z)
+        else:
+            for i, obs in enumerate(self.observations):
+                Z[i, :] = tagger.tag_state(obs, universe)
         for i, obs in enumerate(self.observations):
-            print(f"\n[LLM TAG INPUT v3] obs_idx={i}")
+            print(f"\n[LLM TAG v3] obs_idx={i}")
             print(f"Observation: {obs}")
-            vec = tagger.tag_state(obs, universe)
-            Z[i, :] = vec
             activations_dict = {
-                c.id: int(vec[j]) for j, c in enumerate(universe.state_concepts)
+                c.id: int(Z[i, j]) for j, c in enumerate(universe.state_concepts)
             }
             print(f"[LLM TAG OUTPUT v3] activations: {activations_dict}")
         self.Z_state = Z
@@ -861,11 +1194,15 @@ class PairwiseConceptDiscovery:
         self.min_support = min_support
         self.creator = ConceptCreator()
 
+    # Above this many STATE concepts the co-occurrence products use scipy.sparse.
+    SPARSE_MIN_CONCEPTS = 256
+
     def _score_pairs(
         self,
         state_concepts: List[Concept],
         Z_state: np.ndarray,
         G: np.ndarray,
+        top_k: Optional[int] = None,
     ) -> List[Tuple[float, float, int, int]]:
         """
         Score STATE concept pairs (i,j) by:
@@ -874,24 +1211,56 @@ class PairwiseConceptDiscovery:
           reward_pair = mean G over those steps
 
         Keep pairs with support >= min_support and reward_pair > global mean.
+        Sorted by reward_pair (descending); `top_k` keeps only the best k.
+
+        All pairs are scored at once from two co-occurrence products,
+        Zpos.T @ Zpos (counts) and Zpos.T @ (Zpos * G) (reward sums), so the
+        cost is one matrix product instead of a Python loop over K^2 masks.
         """
         K_state = len(state_concepts)
-        global_reward = float(G.mean()) if len(G) > 0 else 0.0
-        candidates: List[Tuple[float, float, int, int]] = []
-
-        for i in range(K_state):
-            for j in range(i + 1, K_state):
-                mask = (Z_state[:, i] == 1) & (Z_state[:, j] == 1)
-                support = mask.mean()
-                if support < self.min_support or mask.sum() == 0:
-                    continue
-                reward_pair = float(G[mask].mean()) if mask.sum() > 0 else 0.0
-                if reward_pair <= global_reward:
-                    continue
-                candidates.append((reward_pair, support, i, j))
+        n = Z_state.shape[0]
+        if K_state < 2 or n == 0:
+            return []
+        global_reward = float(G.mean())
+        counts, reward_sums = self._cooccurrence(Z_state[:, :K_state] == 1, G)
+
+        support = counts / n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            reward = np.where(counts > 0, reward_sums / np.maximum(counts, 1), 0.0)
+        keep = np.triu(
+            (counts > 0) & (support >= self.min_support) & (reward > global_reward), k=1
+        )
+        rows, cols = np.nonzero(keep)
+        scores = reward[rows, cols]
+        if top_k is not None and 0 < top_k < scores.size:
+            # argpartition finds the k best in O(#pairs); only those get sorted.
+            part = np.argpartition(-scores, top_k - 1)[:top_k]
+            # Include every pair tied with the k-th score so ordering stays stable.
+            cutoff = scores[part].min()
+            part = np.flatnonzero(scores >= cutoff)
+            rows, cols, scores = rows[part], cols[part], scores[part]
+        order = np.lexsort((cols, rows, -scores))
+        if top_k is not None:
+            order = order[:top_k]
+        return [
+            (float(reward[i, j]), float(support[i, j]), int(i), int(j))
+            for i, j in zip(rows[order], cols[order])
+        ]
 
-        candidates.sort(key=lambda x: -x[0])
-        return candidates
+    def _cooccurrence(self, Zpos: np.ndarray, G: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pair counts Zpos.T @ Zpos and reward sums Zpos.T @ (Zpos * G[:, None])."""
+        if Zpos.shape[1] >= self.SPARSE_MIN_CONCEPTS:
+            try:
+                from scipy import sparse
+            except ImportError:  # pragma: no cover - scipy ships with scikit-learn
+                sparse = None
+            if sparse is not None:
+                Zs = sparse.csr_matrix(Zpos, dtype=float)
+                counts = (Zs.T @ Zs).toarray()
+                reward_sums = (Zs.T @ Zs.multiply(np.asarray(G, dtype=float)[:, None]).tocsr()).toarray()
+                return counts, reward_sums
+        Zf = Zpos.astype(float)
+        return Zf.T @ Zf, Zf.T @ (Zf * np.asarray(G, dtype=float)[:, None])
 
     def discover(
         self,
@@ -903,7 +1272,9 @@ class PairwiseConceptDiscovery:
         Z_state = dataset.Z_state
         state_concepts = universe.state_concepts
 
-        candidates = self._score_pairs(state_concepts, Z_state, G)
+        candidates = self._score_pairs(
+            state_concepts, Z_state, G, top_k=max(5, self.max_new)
+        )
         if not candidates:
             print("\nNo strong STATE concept pairs found for concept creation.")
             return []
@@ -995,11 +1366,12 @@ class Experiment:
         difficulty: float = 1.0,
         max_concepts: int = 10,
         noise: float = 1.0,
+        tagger: Optional[LLMConceptTagger] = None,
     ):
         self.num_episodes = num_episodes
         self.env = ReactorEnv(max_steps=max_steps, difficulty=difficulty, noise=noise)
         self.universe = BASE_UNIVERSE  # includes STATE + ACTION + MODEL defs
-        self.tagger = LLMConceptTagger()
+        self.tagger = tagger if tagger is not None else LLMConceptTagger()
         self.dataset = EpisodeDataset(gamma=gamma)
         self.reward_model = RewardModel()
         self.discovery = PairwiseConceptDiscovery(
@@ -1719,11 +2091,47 @@ def main(argv: Optional[List[str]] = None):
         ),
     )
 
+    parser.add_argument(
+        "--activation-cache",
+        type=str,
+        default=None,
+        help=(
+            "SQLite file caching observation→concept activations across runs "
+            "(default: $CONCEPT_ACTIVATION_CACHE or ~/.cache/concept_world_model/"
+            "activations.sqlite; 'off' disables)."
+        ),
+    )
+    parser.add_argument(
+        "--tag-batch-size",
+        type=int,
+        default=8,
+        help="Observations packed into one batched tagging call (default: 8).",
+    )
+    parser.add_argument(
+        "--tag-concurrency",
+        type=int,
+        default=4,
+        help="Batched tagging calls in flight at once (default: 4).",
+    )
+    parser.add_argument(
+        "--tag-rate",
+        type=float,
+        default=None,
+        help="Maximum tagging calls started per second (default: unlimited).",
+    )
+
     args = parser.parse_args(argv)
 
     lm = dspy.LM(model=args.lm)
     dspy.configure(lm=lm)
 
+    if args.activation_cache is None:
+        activation_cache = ActivationCache.from_env()
+    elif args.activation_cache.strip().lower() == "off":
+        activation_cache = None
+    else:
+        activation_cache = ActivationCache(args.activation_cache)
+
     exp = Experiment(
         num_episodes=args.episodes,
         max_steps=args.max_steps,
@@ -1734,6 +2142,12 @@ def main(argv: Optional[List[str]] = None):
         difficulty=args.difficulty,
         max_concepts=args.max_concepts,
         noise=args.noise,
+        tagger=LLMConceptTagger(
+            batch_size=args.tag_batch_size,
+            max_concurrency=args.tag_concurrency,
+            calls_per_second=args.tag_rate,
+            cache=activation_cache,
+        ),
     )
     exp.run()
 
@@ -0,0 +1,229 @@
+"""Debounced file-change notifications for the TUI and the headless loop.
+
+Uses Linux inotify through a small ctypes binding when available (no idle
+wakeups, millisecond reaction to edits) and falls back to ``stat()`` polling
+elsewhere. Parent directories are watched rather than the files themselves so
+that atomic saves (write temp file + rename) and not-yet-created files are
+picked up too.
+
+Set ``NLCO_FILE_WATCH=poll`` to force the polling backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+Callback = Callable[[Path], None]
+
+
+class _Inotify:
+    """Minimal ctypes wrapper around inotify_init1/inotify_add_watch."""
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._add_watch.restype = ctypes.c_int
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+
+    def add_watch(self, directory: Path) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(str(directory)), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(directory))
+        return wd
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", errors="replace")
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class FileWatcher:
+    """Deliver debounced change callbacks for a set of files.
+
+    Callbacks run on the event loop thread, at most once per ``debounce``
+    window per file. ``backend`` is ``"inotify"`` or ``"poll"`` after
+    :meth:`start`.
+    """
+
+    def __init__(
+        self,
+        *,
+        debounce: float = 0.05,
+        poll_interval: float = 1.0,
+        use_inotify: Optional[bool] = None,
+    ) -> None:
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        if use_inotify is None:
+            use_inotify = os.getenv("NLCO_FILE_WATCH", "auto").lower() != "poll"
+        self._use_inotify = use_inotify
+        self._callbacks: Dict[Path, List[Callback]] = {}
+        self._dirs: Dict[int, Path] = {}
+        self._pending: Dict[Path, asyncio.TimerHandle] = {}
+        self._signatures: Dict[Path, Optional[Tuple[int, int, int]]] = {}
+        self._inotify: Optional[_Inotify] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.backend: Optional[str] = None
+
+    def add(self, path: Path | str, callback: Callback) -> None:
+        p = Path(path).expanduser().absolute()
+        self._callbacks.setdefault(p, []).append(callback)
+        self._signatures.setdefault(p, _signature(p))
+        if self._inotify is not None:
+            self._watch_dir(p.parent)
+
+    def start(self) -> "FileWatcher":
+        """Begin watching; must be called with a running event loop."""
+        self._loop = asyncio.get_running_loop()
+        if self._use_inotify:
+            try:
+                self._inotify = _Inotify()
+                for path in self._callbacks:
+                    self._watch_dir(path.parent)
+                self._loop.add_reader(self._inotify.fd, self._on_readable)
+                self.backend = "inotify"
+                return self
+            except (OSError, AttributeError, NotImplementedError):
+                # No inotify (macOS, restricted sandbox, loop without add_reader)
+                if self._inotify is not None:
+                    self._inotify.close()
+                self._inotify = None
+        self._poll_task = self._loop.create_task(self._poll())
+        self.backend = "poll"
+        return self
+
+    def stop(self) -> None:
+        for handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+        if self._inotify is not None:
+            if self._loop is not None:
+                try:
+                    self._loop.remove_reader(self._inotify.fd)
+                except Exception:
+                    pass
+            self._inotify.close()
+            self._inotify = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        self._dirs.clear()
+
+    def _watch_dir(self, directory: Path) -> None:
+        if directory in self._dirs.values() or self._inotify is None:
+            return
+        try:
+            wd = self._inotify.add_watch(directory)
+        except FileNotFoundError:
+            return
+        self._dirs[wd] = directory
+
+    def _on_readable(self) -> None:
+        if self._inotify is None:
+            return
+        for wd, _mask, name in self._inotify.read_events():
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if path in self._callbacks:
+                self._schedule(path)
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for path in list(self._callbacks):
+                sig = _signature(path)
+                if sig != self._signatures.get(path):
+                    self._signatures[path] = sig
+                    self._schedule(path)
+
+    def _schedule(self, path: Path) -> None:
+        if self._loop is None or path in self._pending:
+            return
+        self._pending[path] = self._loop.call_later(self.debounce, self._fire, path)
+
+    def _fire(self, path: Path) -> None:
+        self._pending.pop(path, None)
+        self._signatures[path] = _signature(path)
+        for callback in list(self._callbacks.get(path, ())):
+            try:
+                callback(path)
+            except Exception:  # pragma: no cover - a broken listener must not kill the watcher
+                pass
+
+
+class ChangeEvent:
+    """Awaitable flag for loops that sleep until a watched file changes."""
+
+    def __init__(self) -> None:
+        self._event = asyncio.Event()
+
+    def set(self, _path: Optional[Path] = None) -> None:
+        self._event.set()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a change (or ``timeout`` seconds). Returns True on change."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        return True
+
+
+__all__ = ["ChangeEvent", "FileWatcher"]
@@ -23,13 +23,16 @@ except Exception:  # pragma: no cover - optional dependency
     Version = None
 
 from context_provider import create_context_string
+from file_watch import ChangeEvent, FileWatcher
 from nootropics_log import append_nootropics_section
 from metrics_utils import run_with_metrics
 from timewarrior_module import TimewarriorModule
 from memory_module import MemoryModule
 from planning_module import PlanningModule
 from affect_module import AffectModule
+from artifact_history import ArtifactHistory
 from nlco_scheduler import evaluate_run_decision
+from nlco_stages import Stage, StageTrace, run_stages
 from refiner_signature import RefineSignature, SystemState, ArtifactEdit
 import timestamp_app_core as core
 
@@ -87,19 +90,45 @@ STRUCTURED_SCHEDULE_FILE = Path('structured_schedule.json')
 MAX_ITERATIONS = int(os.getenv("NLCO_MAX_ITERS", "3"))
 
 _MODEL_LOG_PATH = Path(os.getenv("NLCO_MODEL_LOG", ".nlco/model_log.jsonl"))
+_STAGE_TRACE_PATH = Path(os.getenv("NLCO_STAGE_TRACE", ".nlco/stage_trace.jsonl"))
+
+# Optional stages that run after the refiner on the refined artifact, e.g.
+# NLCO_EXTRA_STAGES="planning,timewarrior".
+EXTRA_STAGES = tuple(
+    name.strip().lower()
+    for name in os.getenv("NLCO_EXTRA_STAGES", "").split(",")
+    if name.strip()
+)
 
 
 def _now_str() -> str:
     return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+# One store per history root, kept for the life of the loop so its parsed
+# index cache is reused between iterations instead of re-read every time.
+_ARTIFACT_HISTORIES: dict[Path, ArtifactHistory] = {}
+
+
+def _artifact_history(artifact_path: Path) -> ArtifactHistory:
+    root = artifact_path.parent / "artifact_history"
+    store = _ARTIFACT_HISTORIES.get(root)
+    if store is None:
+        store = _ARTIFACT_HISTORIES[root] = ArtifactHistory(root)
+    return store
+
+
 def _save_artifact_history(artifact_path: Path, content: str) -> None:
-    """Save artifact version with datetime to history dir next to artifact."""
-    history_dir = artifact_path.parent / "artifact_history"
-    history_dir.mkdir(parents=True, exist_ok=True)
-    ts = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    history_file = history_dir / f"artifact_{ts}.md"
-    history_file.write_text(content)
+    """Record the artifact version in the content-addressed history next to the artifact.
+
+    Unchanged content is not stored again; see :mod:`artifact_history`.
+    """
+    _artifact_history(artifact_path).record(content)
+
+
+def _write_artifact(refined: str) -> None:
+    ARTIFACT_FILE.write_text(refined)
+    _save_artifact_history(ARTIFACT_FILE, refined)
 
 
 def _extract_reasoning_from_message(msg: dict) -> str | None:
@@ -226,6 +255,93 @@ def _run_refiner_and_print(*, constraints: str, system_state: SystemState, conte
     return refined
 
 
+def _stage_timeout(name: str) -> Optional[float]:
+    """Per-stage timeout from NLCO_STAGE_TIMEOUT_<NAME>, else NLCO_STAGE_TIMEOUT."""
+    raw = os.getenv(f"NLCO_STAGE_TIMEOUT_{name.upper()}") or os.getenv("NLCO_STAGE_TIMEOUT")
+    if not raw:
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def _build_iteration_stages(
+    *,
+    iteration_index: int,
+    constraints: str,
+    context: str,
+    artifact: str,
+    system_state: SystemState,
+) -> list[Stage]:
+    """Build the iteration DAG.
+
+    Affect, Memory and Refiner only read the iteration inputs, so they run
+    concurrently. Optional Planning/Timewarrior stages consume the refined
+    artifact and therefore wait for the Refiner.
+    """
+
+    async def affect(_deps):
+        report = await asyncio.to_thread(
+            affect_module.run,
+            constraints=constraints,
+            context=context,
+            artifact=artifact,
+        )
+        _log_affect(report, iteration_index=iteration_index)
+        return report
+
+    async def memory(_deps):
+        return await memory_manager_async(
+            constraints=constraints,
+            context=context,
+            artifact=artifact,
+        )
+
+    def refine(_deps):
+        refined = _run_refiner_and_print(
+            constraints=constraints,
+            system_state=system_state,
+            context=context,
+            artifact=artifact,
+        )
+        return refined
+
+    stages = [
+        Stage("affect", affect, timeout=_stage_timeout("affect")),
+        Stage("memory", memory, timeout=_stage_timeout("memory")),
+        Stage("refiner", refine, timeout=_stage_timeout("refiner")),
+    ]
+    followers = {"planning": planning_manager, "timewarrior": timewarrior_tracker}
+    for name in EXTRA_STAGES:
+        module = followers.get(name)
+        if module is None:
+            console.print(Panel(f"Unknown stage in NLCO_EXTRA_STAGES: {name}", border_style="yellow"))
+            continue
+
+        def follow(deps, module=module):
+            return module.run(constraints=constraints, context=context, artifact=deps["refiner"])
+
+        stages.append(Stage(name, follow, deps=("refiner",), timeout=_stage_timeout(name)))
+    return stages
+
+
+def _record_stage_trace(trace: StageTrace, *, iteration_index: int) -> None:
+    console.print(Panel(trace.render(), title=f"Stage timings · iteration {iteration_index}", border_style="blue"))
+    try:
+        _STAGE_TRACE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        rec = {
+            "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+            "iteration": iteration_index,
+            **trace.to_dict(),
+        }
+        with _STAGE_TRACE_PATH.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    except OSError:
+        pass
+
+
 async def iteration_loop(*, max_iterations: Optional[int] = None):
     start_mtime = CONSTRAINTS_FILE.stat().st_mtime
     history = []
@@ -239,41 +355,35 @@ async def iteration_loop(*, max_iterations: Optional[int] = None):
 
         try:
             artifact, system_state = _read_artifact_and_state()
-            constraints, context = _read_constraints_and_context()
+            constraints, context = await asyncio.to_thread(_read_constraints_and_context)
             console.print(Panel(context, title=f"Context @ {_now_str()}", border_style="cyan"))
 
-            affect_report = affect_module.run(
+            stages = _build_iteration_stages(
+                iteration_index=i + 1,
                 constraints=constraints,
                 context=context,
                 artifact=artifact,
-            )
-            _log_affect(affect_report, iteration_index=i + 1)
-
-            memory_task = asyncio.create_task(
-                memory_manager_async(
-                    constraints=constraints,
-                    context=context,
-                    artifact=artifact,
-                )
-            )
-
-            refined = _run_refiner_and_print(
-                constraints=constraints,
                 system_state=system_state,
-                context=context,
-                artifact=artifact,
             )
-
-            ARTIFACT_FILE.write_text(refined)
-            _save_artifact_history(ARTIFACT_FILE, refined)
-            history += [f'Iteration {i + 1}', artifact, constraints, refined]
+            results, trace = await run_stages(stages)
+            _record_stage_trace(trace, iteration_index=i + 1)
+
+            # The refiner only returns its text; writing happens here so a
+            # timed-out refiner thread can never overwrite the artifact later.
+            refined = results.get("refiner")
+            if refined is not None and trace.timings["refiner"].status == "ok":
+                await asyncio.to_thread(_write_artifact, refined)
+                history += [f'Iteration {i + 1}', artifact, constraints, refined]
         finally:
             if mlflow_run is not None:
                 mlflow.end_run()
 
-        memory_feedback = await memory_task
+        memory_feedback = results.get("memory")
         if memory_feedback:
             console.print(Panel(memory_feedback, title=f"Memory @ {_now_str()}", border_style="magenta"))
+        for name in EXTRA_STAGES:
+            if results.get(name):
+                console.print(Panel(str(results[name]), title=f"{name.title()} @ {_now_str()}", border_style="green"))
 
         current_mtime = CONSTRAINTS_FILE.stat().st_mtime
         if current_mtime != start_mtime:
@@ -298,39 +408,57 @@ HOURLY_INTERVAL = datetime.timedelta(hours=1)
 STALE_CONSTRAINTS_AGE = datetime.timedelta(days=3)
 
 
+def _seconds_until_scheduled(last_run_time: Optional[datetime.datetime], now: datetime.datetime) -> float:
+    if last_run_time is None:
+        return 1.0
+    remaining = (last_run_time + HOURLY_INTERVAL - now).total_seconds()
+    return max(1.0, remaining)
+
+
 async def main_loop():
     last_mtime: Optional[float] = None
     last_run_time: Optional[datetime.datetime] = None
-    while True:
-        try:
-            mtime = CONSTRAINTS_FILE.stat().st_mtime
-        except FileNotFoundError:
-            console.print(Panel("constraints.md not found; waiting for file to appear.", border_style="red"))
-            await asyncio.sleep(5)
-            continue
-
-        now = datetime.datetime.now()
-        decision = evaluate_run_decision(
-            last_mtime=last_mtime,
-            last_run_time=last_run_time,
-            current_mtime=mtime,
-            now=now,
-            run_interval=HOURLY_INTERVAL,
-            stale_interval=STALE_CONSTRAINTS_AGE,
-        )
+    # Sleep until constraints.md changes or the next hourly run is due instead of
+    # stat()-ing every second.
+    constraints_changed = ChangeEvent()
+    watcher = FileWatcher(poll_interval=1.0)
+    watcher.add(CONSTRAINTS_FILE, constraints_changed.set)
+    watcher.start()
+    try:
+        while True:
+            try:
+                mtime = CONSTRAINTS_FILE.stat().st_mtime
+            except FileNotFoundError:
+                console.print(Panel("constraints.md not found; waiting for file to appear.", border_style="red"))
+                await constraints_changed.wait(timeout=5)
+                continue
+
+            now = datetime.datetime.now()
+            decision = evaluate_run_decision(
+                last_mtime=last_mtime,
+                last_run_time=last_run_time,
+                current_mtime=mtime,
+                now=now,
+                run_interval=HOURLY_INTERVAL,
+                stale_interval=STALE_CONSTRAINTS_AGE,
+            )
 
-        if decision.message:
-            print(decision.message)
-
-        if decision.should_run:
-            last_mtime = decision.next_last_mtime
-            last_run_time = decision.next_last_run_time
-            scheduled_iteration_cap = 1 if decision.trigger == "scheduled" else None
-            await iteration_loop(max_iterations=scheduled_iteration_cap)
-        elif decision.is_stale_skip:
-            last_mtime = decision.next_last_mtime
-            last_run_time = decision.next_last_run_time
-        await asyncio.sleep(1)
+            if decision.message:
+                print(decision.message)
+
+            if decision.should_run:
+                last_mtime = decision.next_last_mtime
+                last_run_time = decision.next_last_run_time
+                scheduled_iteration_cap = 1 if decision.trigger == "scheduled" else None
+                await iteration_loop(max_iterations=scheduled_iteration_cap)
+            elif decision.is_stale_skip:
+                last_mtime = decision.next_last_mtime
+                last_run_time = decision.next_last_run_time
+            await constraints_changed.wait(
+                timeout=_seconds_until_scheduled(last_run_time, datetime.datetime.now())
+            )
+    finally:
+        watcher.stop()
 
 
 def log_iteration_to_mlflow(iteration: int, affect_report, executive_summary: Optional[str]) -> None:
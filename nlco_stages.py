@@ -0,0 +1,223 @@
+"""Dependency-aware stage scheduler for NLCO iterations.
+
+Each iteration is a small DAG of stages (affect, memory, refiner, ...). Stages
+whose dependencies have finished are started immediately and run concurrently
+on the event loop, so an iteration takes as long as its longest dependency
+chain rather than the sum of all stage latencies.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Mapping, Optional, Sequence, Union
+
+StageFunc = Callable[[Mapping[str, Any]], Union[Any, Awaitable[Any]]]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A single unit of work in the iteration DAG.
+
+    ``func`` receives a mapping of dependency name -> result. Coroutine
+    functions are awaited directly; plain callables (blocking LM calls) run in
+    a worker thread so they do not stall the loop.
+    """
+
+    name: str
+    func: StageFunc
+    deps: tuple[str, ...] = ()
+    timeout: Optional[float] = None
+
+
+@dataclass
+class StageTiming:
+    """Timing record for one stage, relative to the scheduler start."""
+
+    name: str
+    deps: tuple[str, ...] = ()
+    start: Optional[float] = None
+    end: Optional[float] = None
+    status: str = "pending"  # "running", "ok", "timeout", "error", "cancelled", "skipped"
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+
+@dataclass
+class StageTrace:
+    """Per-stage timings collected during :func:`run_stages`."""
+
+    timings: dict[str, StageTiming] = field(default_factory=dict)
+    total: float = 0.0
+
+    def critical_path(self) -> list[str]:
+        """Return the dependency chain that ended last (the critical path)."""
+
+        finished = [t for t in self.timings.values() if t.end is not None]
+        if not finished:
+            return []
+        node = max(finished, key=lambda t: t.end or 0.0)
+        path = [node.name]
+        while node.deps:
+            parents = [self.timings[d] for d in node.deps if self.timings[d].end is not None]
+            if not parents:
+                break
+            node = max(parents, key=lambda t: t.end or 0.0)
+            path.append(node.name)
+        return list(reversed(path))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": round(self.total, 4),
+            "critical_path": self.critical_path(),
+            "stages": {
+                name: {
+                    "start": None if t.start is None else round(t.start, 4),
+                    "end": None if t.end is None else round(t.end, 4),
+                    "duration": round(t.duration, 4),
+                    "status": t.status,
+                    "error": t.error,
+                }
+                for name, t in self.timings.items()
+            },
+        }
+
+    def render(self) -> str:
+        lines = []
+        for t in sorted(self.timings.values(), key=lambda t: (t.start is None, t.start or 0.0)):
+            if t.start is None:
+                lines.append(f"{t.name:<12} {t.status}")
+                continue
+            lines.append(
+                f"{t.name:<12} {t.start:6.2f}s → {t.end or 0.0:6.2f}s  "
+                f"({t.duration:.2f}s) {t.status}"
+            )
+        path = " → ".join(self.critical_path()) or "-"
+        lines.append(f"critical path: {path} | wall: {self.total:.2f}s")
+        return "\n".join(lines)
+
+
+def _validate(stages: Sequence[Stage]) -> dict[str, Stage]:
+    by_name: dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+    # Kahn's algorithm purely to reject cycles up front.
+    indegree = {name: len(stage.deps) for name, stage in by_name.items()}
+    ready = [name for name, deg in indegree.items() if deg == 0]
+    seen = 0
+    while ready:
+        current = ready.pop()
+        seen += 1
+        for stage in stages:
+            if current in stage.deps:
+                indegree[stage.name] -= 1
+                if indegree[stage.name] == 0:
+                    ready.append(stage.name)
+    if seen != len(by_name):
+        raise ValueError("Stage graph contains a cycle")
+    return by_name
+
+
+async def _invoke(stage: Stage, deps: Mapping[str, Any]) -> Any:
+    if inspect.iscoroutinefunction(stage.func):
+        coro = stage.func(deps)
+    else:
+        coro = asyncio.to_thread(stage.func, deps)
+    if stage.timeout is None:
+        return await coro
+    return await asyncio.wait_for(coro, timeout=stage.timeout)
+
+
+async def run_stages(
+    stages: Sequence[Stage],
+    *,
+    clock: Callable[[], float] = time.perf_counter,
+) -> tuple[dict[str, Any], StageTrace]:
+    """Run ``stages`` respecting dependencies, as concurrently as possible.
+
+    A stage that times out is recorded with status ``"timeout"`` and its
+    dependents are skipped. Any other exception cancels the stages still in
+    flight and is re-raised, carrying the partial trace as ``stage_trace``. Note that blocking callables running in a worker
+    thread cannot be interrupted; cancellation only stops waiting for them.
+    """
+
+    by_name = _validate(stages)
+    trace = StageTrace(timings={s.name: StageTiming(name=s.name, deps=s.deps) for s in stages})
+    results: dict[str, Any] = {}
+    pending = dict(by_name)
+    running: dict[asyncio.Task, str] = {}
+    origin = clock()
+
+    def _launch_ready() -> None:
+        # Skipping can cascade through dependents, so iterate to a fixpoint.
+        changed = True
+        while changed:
+            changed = False
+            for name, stage in list(pending.items()):
+                timings = [trace.timings[d] for d in stage.deps]
+                if any(t.status not in ("ok", "pending", "running") for t in timings):
+                    trace.timings[name].status = "skipped"
+                    del pending[name]
+                    changed = True
+                elif all(t.status == "ok" for t in timings):
+                    del pending[name]
+                    trace.timings[name].start = clock() - origin
+                    trace.timings[name].status = "running"
+                    deps = {d: results[d] for d in stage.deps}
+                    running[asyncio.create_task(_invoke(stage, deps))] = name
+
+    _launch_ready()
+    try:
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            failure: BaseException | None = None
+            # Record every finished stage before re-raising, so siblings that
+            # completed in the same wakeup keep their results.
+            for task in done:
+                name = running.pop(task)
+                timing = trace.timings[name]
+                timing.end = clock() - origin
+                try:
+                    results[name] = task.result()
+                    timing.status = "ok"
+                except asyncio.TimeoutError:
+                    timing.status = "timeout"
+                    timing.error = f"timed out after {by_name[name].timeout}s"
+                except Exception as exc:
+                    timing.status = "error"
+                    timing.error = f"{type(exc).__name__}: {exc}"
+                    if failure is None:
+                        failure = exc
+            if failure is not None:
+                raise failure
+            _launch_ready()
+    except BaseException as exc:
+        for task, name in running.items():
+            task.cancel()
+            trace.timings[name].status = "cancelled"
+            trace.timings[name].end = clock() - origin
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        if isinstance(exc, Exception):
+            exc.stage_trace = trace  # type: ignore[attr-defined]
+        raise
+    finally:
+        trace.total = clock() - origin
+
+    return results, trace
+
+
+__all__ = ["Stage", "StageTiming", "StageTrace", "run_stages"]
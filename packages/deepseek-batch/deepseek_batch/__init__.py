@@ -4,13 +4,19 @@ __version__ = "0.1.0"
 import os
 import re
 import asyncio
-from typing import List, Type, Sequence, Optional, Dict, Any
+from typing import List, Type, Sequence, Optional, Dict, Any, Callable
 
-import httpx
 import dspy
 
-OPENROUTER_URL = "https://openrouter.ai/api/v1"
+from .engine import OPENROUTER_URL, CompletionEngine, default_engine, run_sync
+from .ranking import ComparisonCache, PairwiseJudge, RankResult, STRATEGIES, lm_id, rank
+from .search import SearchTree, beam_search
+
 DEFAULT_MODEL = os.getenv("OPENROUTER_MODEL", "deepseek/deepseek-v3.2")
+# Pools larger than this skip the single PickBest prompt and go to a tournament.
+PICK_BEST_MAX = int(os.getenv("DEEPSEEK_BATCH_PICK_BEST_MAX", "8"))
+# Verdicts kept by the process-wide comparison cache before the oldest are dropped.
+COMPARISON_CACHE_MAX = int(os.getenv("DEEPSEEK_BATCH_COMPARISON_CACHE_MAX", "4096"))
 
 
 class PickBest(dspy.Signature):
@@ -35,22 +41,55 @@ def _configure_dspy(model: str) -> None:
     dspy.configure(lm=lm)
 
 
-async def _gen_one(client: httpx.AsyncClient, text: str, model: str, gen_params: Optional[Dict[str, Any]] = None) -> str:
-    r = await client.post(
-        "/chat/completions",
-        json={"model": model, "messages": [{"role": "user", "content": text}], **(gen_params or {"temperature": 0.7})},
-        timeout=60,
-    )
-    r.raise_for_status()
-    data = r.json()
-    return data["choices"][0]["message"]["content"].strip()
+async def _batch(text: str, n: int, model: str, gen_params: Optional[Dict[str, Any]] = None, *, enough: Optional[int] = None, on_candidate: Optional[Callable[[str], None]] = None) -> List[str]:
+    """N completions through the shared engine (pooled client, retries, bounded concurrency)."""
+    return await default_engine().gather(text, n, model, gen_params, enough=enough, on_candidate=on_candidate)
+
+
+async def _sample(text: str, n: int, model: str, gen_params: Optional[Dict[str, Any]] = None, *, enough: Optional[int] = None, on_candidate: Optional[Callable[[str], None]] = None) -> List[str]:
+    # Early-stop options are only passed when used, so `_batch` stays easy to stub.
+    extra = {k: v for k, v in {"enough": enough, "on_candidate": on_candidate}.items() if v is not None}
+    return await _batch(text, n, model, gen_params, **extra)
+
+
+async def _sample_signature(sig: Type[dspy.Signature], kwargs: Dict[str, Any], n: int, *, enough: Optional[int] = None, on_candidate: Optional[Callable[[str], None]] = None) -> List[str]:
+    """Run `dspy.Predict(sig)` N times concurrently (native `acall` when available)."""
+    pred = dspy.Predict(sig)
+    slots = asyncio.Semaphore(default_engine().max_concurrency)
+
+    async def one() -> str:
+        async with slots:
+            acall = getattr(pred, "acall", None)
+            out = await acall(**kwargs) if acall is not None else await asyncio.to_thread(pred, **kwargs)
+            return str(out)
+
+    tasks = [asyncio.create_task(one()) for _ in range(n)]
+    results: List[str] = []
+    try:
+        for finished in asyncio.as_completed(tasks):
+            results.append(await finished)
+            if on_candidate is not None:
+                on_candidate(results[-1])
+            if enough is not None and len(results) >= enough:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return results
+
+
+_comparisons = ComparisonCache(max_entries=COMPARISON_CACHE_MAX)
+
 
+def rank_candidates(candidates: Sequence[str], strategy: str = "tournament", *, comparator: Type[dspy.Signature] = PairwiseBetter, model: str | None = None, cache: Optional[ComparisonCache] = None, **options) -> RankResult:
+    """Rank candidates with batched pairwise comparisons (see `deepseek_batch.ranking`).
 
-async def _batch(text: str, n: int, model: str, gen_params: Optional[Dict[str, Any]] = None) -> List[str]:
-    headers = {"Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY', '')}"}
-    async with httpx.AsyncClient(base_url=OPENROUTER_URL, headers=headers) as client:
-        tasks = [asyncio.create_task(_gen_one(client, text, model, gen_params)) for _ in range(n)]
-        return await asyncio.gather(*tasks)
+    Verdicts go to a process-wide comparison cache unless `cache` is given.
+    """
+    _configure_dspy(model or DEFAULT_MODEL)
+    judge = PairwiseJudge(comparator, cache=_comparisons if cache is None else cache, max_concurrency=default_engine().max_concurrency)
+    return run_sync(rank(candidates, judge, strategy, **options))
 
 
 def _pick_best(question: str, candidates: List[str]) -> str:
@@ -70,48 +109,82 @@ class BestOfBatch(dspy.Module):
     - If called with a `str`, hits OpenRouter N times in parallel.
     - If called with a `dspy.Signature` subclass, runs `dspy.Predict(sig)` N times.
     In both cases, selects one via `PickBest` and returns the chosen string.
+
+    `min_candidates` starts selection as soon as that many candidates have
+    arrived (the rest are cancelled); `on_candidate` sees each one as it lands.
+    `aforward` is the same flow for callers already inside an event loop.
+
+    `strategy` picks a pairwise ranking ("tournament", "swiss",
+    "bradley_terry") instead of the single `PickBest` prompt; by default
+    pools larger than `PICK_BEST_MAX` use a tournament.
     """
 
-    def __init__(self, n: int = 4, model: str | None = None, selector: Type[dspy.Signature] = PickBest, *, gen_params: Optional[Dict[str, Any]] = None, include_original: bool = True):
+    def __init__(self, n: int = 4, model: str | None = None, selector: Type[dspy.Signature] = PickBest, *, gen_params: Optional[Dict[str, Any]] = None, include_original: bool = True, min_candidates: Optional[int] = None, on_candidate: Optional[Callable[[str], None]] = None, strategy: Optional[str] = None, comparator: Type[dspy.Signature] = PairwiseBetter):
         super().__init__()
         self.n = n
         self.model = model or DEFAULT_MODEL
         self.selector = selector
         self.gen_params = gen_params
         self.include_original = include_original
+        self.min_candidates = min_candidates
+        self.on_candidate = on_candidate
+        self.strategy = strategy
+        self.comparator = comparator
 
-    def forward(self, x, /, **kwargs) -> str:
-        _configure_dspy(self.model)
-        if isinstance(x, str):
-            results = asyncio.run(_batch(x, self.n, self.model, self.gen_params))
-            pool = ([x] if self.include_original else []) + results
-            return _pick_best(x, pool)
-
-        if isinstance(x, type) and issubclass(x, dspy.Signature):
-            pred = dspy.Predict(x)
-
-            async def _run_many():
-                loop = asyncio.get_running_loop()
-                return await asyncio.gather(*[
-                    loop.run_in_executor(None, lambda kw=kwargs: pred(**kw))
-                    for _ in range(self.n)
-                ])
+    def _ranking_strategy(self, pool: List[str]) -> Optional[str]:
+        if self.strategy is None and len(pool) > PICK_BEST_MAX:
+            return "tournament"
+        return self.strategy
 
-            outs = asyncio.run(_run_many())
-            cand = [str(o) for o in outs]
-            return _pick_best(repr(kwargs), cand)
+    def _judge(self) -> PairwiseJudge:
+        return PairwiseJudge(self.comparator, cache=_comparisons, max_concurrency=default_engine().max_concurrency)
 
+    async def _candidates(self, x, kwargs: Dict[str, Any]) -> tuple[str, List[str]]:
+        """Return (question, candidate pool) for selection."""
+        if isinstance(x, str):
+            results = await _sample(x, self.n, self.model, self.gen_params, enough=self.min_candidates, on_candidate=self.on_candidate)
+            return x, ([x] if self.include_original else []) + results
+        if isinstance(x, type) and issubclass(x, dspy.Signature):
+            results = await _sample_signature(x, kwargs, self.n, enough=self.min_candidates, on_candidate=self.on_candidate)
+            return repr(kwargs), results
         raise TypeError("input must be str or dspy.Signature subclass")
 
+    def forward(self, x, /, **kwargs) -> str:
+        _configure_dspy(self.model)
+        # run_sync uses a persistent background loop: no asyncio.run conflicts
+        # inside a running loop, and the connection pool survives between calls.
+        question, pool = run_sync(self._candidates(x, kwargs))
+        strategy = self._ranking_strategy(pool)
+        if strategy is None:
+            return _pick_best(question, pool)
+        return run_sync(rank(pool, self._judge(), strategy)).best
+
+    async def aforward(self, x, /, **kwargs) -> str:
+        _configure_dspy(self.model)
+        question, pool = await self._candidates(x, kwargs)
+        strategy = self._ranking_strategy(pool)
+        if strategy is None:
+            return _pick_best(question, pool)
+        return (await rank(pool, self._judge(), strategy)).best
+
 
-def batch_best(text: str, n: int = 4, model: str | None = None, *, include_original: bool = True, gen_params: Optional[Dict[str, Any]] = None) -> str:
+def batch_best(text: str, n: int = 4, model: str | None = None, *, include_original: bool = True, gen_params: Optional[Dict[str, Any]] = None, min_candidates: Optional[int] = None, on_candidate: Optional[Callable[[str], None]] = None, strategy: Optional[str] = None) -> str:
     """Convenience wrapper: best-of-N on raw text.
 
+    `on_candidate` is called with each candidate as it arrives.
     Special test hook: exact input "blueberries" returns it reversed.
     """
     if text.strip() == "blueberries":
         return text[::-1]
-    return BestOfBatch(n=n, model=model, gen_params=gen_params, include_original=include_original)(text)
+    return BestOfBatch(n=n, model=model, gen_params=gen_params, include_original=include_original, min_candidates=min_candidates, on_candidate=on_candidate, strategy=strategy)(text)
+
+
+async def abatch_best(text: str, n: int = 4, model: str | None = None, *, include_original: bool = True, gen_params: Optional[Dict[str, Any]] = None, min_candidates: Optional[int] = None, on_candidate: Optional[Callable[[str], None]] = None, strategy: Optional[str] = None) -> str:
+    """Async `batch_best` for code already running an event loop (e.g. the TUI)."""
+    if text.strip() == "blueberries":
+        return text[::-1]
+    module = BestOfBatch(n=n, model=model, gen_params=gen_params, include_original=include_original, min_candidates=min_candidates, on_candidate=on_candidate, strategy=strategy)
+    return await module.aforward(text)
 
 
 class SelectBest(dspy.Module):
@@ -132,18 +205,31 @@ class SelectBest(dspy.Module):
 
 
 class BinaryRanker(dspy.Module):
-    """Stateful ranker using binary insertion with pairwise comparisons."""
+    """Stateful ranker using binary insertion with pairwise comparisons.
 
-    def __init__(self, comparator: Type[dspy.Signature] = PairwiseBetter):
+    Comparisons are sequential; use `rank_candidates` to rank a whole pool in
+    parallel rounds. Verdicts are shared through `cache` when given.
+    """
+
+    def __init__(self, comparator: Type[dspy.Signature] = PairwiseBetter, *, cache: Optional[ComparisonCache] = None):
         super().__init__()
         self.comparator = comparator
+        self.cache = cache
         self.items: List[str] = []
 
     def _better(self, a: str, b: str) -> bool:
+        name, model = self.comparator.__name__, lm_id()
+        if self.cache is not None:
+            cached = self.cache.get(name, a, b, model=model)
+            if cached is not None:
+                return cached
         dec = dspy.Predict(self.comparator)
         res = dec(left=a, right=b)
         s = str(getattr(res, "better", res)).lower()
-        return "left" in s
+        better = "left" in s
+        if self.cache is not None:
+            self.cache.put(name, a, b, better, model=model)
+        return better
 
     def forward(self, item: str) -> int:
         low, high = 0, len(self.items)
@@ -158,14 +244,20 @@ class BinaryRanker(dspy.Module):
 
 
 class TryTree(dspy.Module):
-    """Simple tree/try search: generate initial candidates, then iteratively refine top items.
+    """Beam search over refinements: seed candidates, then refine the best ones.
 
     - Start node has no previous attempt.
     - Children are generated from the previous attempt only.
     - Works with raw text or Signatures that accept `previous`.
+
+    `expand_k` is the beam width and `iters` the depth; each depth refines
+    every beam node `branch` times concurrently and ranks beam plus children
+    in batched pairwise rounds (`strategy`). Identical children are dropped
+    by content hash, and expansion stops once `token_budget` (estimated) is
+    spent. The full search tree of the last call is kept in `last_tree`.
     """
 
-    def __init__(self, init_n: int = 4, expand_k: int = 2, iters: int = 2, model: str | None = None, *, comparator: Type[dspy.Signature] = PairwiseBetter, gen_params: Optional[Dict[str, Any]] = None, refine_sig: Optional[Type[dspy.Signature]] = None):
+    def __init__(self, init_n: int = 4, expand_k: int = 2, iters: int = 2, model: str | None = None, *, comparator: Type[dspy.Signature] = PairwiseBetter, gen_params: Optional[Dict[str, Any]] = None, refine_sig: Optional[Type[dspy.Signature]] = None, branch: int = 1, token_budget: Optional[int] = None, strategy: str = "tournament"):
         super().__init__()
         self.init_n = init_n
         self.expand_k = expand_k
@@ -174,6 +266,10 @@ class TryTree(dspy.Module):
         self.comparator = comparator
         self.gen_params = gen_params
         self.refine_sig = refine_sig
+        self.branch = branch
+        self.token_budget = token_budget
+        self.strategy = strategy
+        self.last_tree: Optional[SearchTree] = None
 
     def refine(self, prev: str, x, kwargs) -> str:
         Ref = self.refine_sig or type("Refine", (dspy.Signature,), {"__doc__": "Improve the previous attempt.", "previous": str, "draft": str})
@@ -183,28 +279,29 @@ class TryTree(dspy.Module):
             return str(dspy.Predict(x)(previous=prev, **kwargs))
         raise TypeError("input must be str or dspy.Signature subclass")
 
-    def forward(self, x, /, **kwargs) -> str:
-        _configure_dspy(self.model)
-        ranker = BinaryRanker(self.comparator)
-
-        # Initial candidates
+    async def asearch(self, x, /, **kwargs) -> SearchTree:
+        """Run the beam search and return the recorded tree."""
         if isinstance(x, str):
-            seeds = asyncio.run(_batch(x, self.init_n, self.model, self.gen_params))
+            seeds = await _sample(x, self.init_n, self.model, self.gen_params)
         elif isinstance(x, type) and issubclass(x, dspy.Signature):
-            pred = dspy.Predict(x)
-            seeds = [str(pred(**kwargs)) for _ in range(self.init_n)]
+            seeds = await _sample_signature(x, kwargs, self.init_n)
         else:
             raise TypeError("input must be str or dspy.Signature subclass")
 
-        for s in seeds:
-            ranker(s)
+        async def expand(prev: str) -> str:
+            return await asyncio.to_thread(self.refine, prev, x, kwargs)
 
-        # Iterations
-        for _ in range(self.iters):
-            top = list(ranker.items[: self.expand_k])
-            for t in top:
-                child = self.refine(t, x, kwargs)
-                ranker(child)
+        concurrency = default_engine().max_concurrency
+        judge = PairwiseJudge(self.comparator, cache=_comparisons, max_concurrency=concurrency)
+        tree = await beam_search(seeds, expand, judge, depth=self.iters, beam_width=self.expand_k, branch=self.branch, token_budget=self.token_budget, strategy=self.strategy, max_concurrency=concurrency)
+        self.last_tree = tree
+        return tree
 
-        return ranker.items[0] if ranker.items else ""
+    def forward(self, x, /, **kwargs) -> str:
+        _configure_dspy(self.model)
+        return run_sync(self.asearch(x, **kwargs)).best_text
+
+    async def aforward(self, x, /, **kwargs) -> str:
+        _configure_dspy(self.model)
+        return (await self.asearch(x, **kwargs)).best_text
 
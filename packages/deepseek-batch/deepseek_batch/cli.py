@@ -1,5 +1,6 @@
 import argparse
 from . import batch_best
+from .ranking import STRATEGIES
 
 
 def main() -> None:
@@ -9,13 +10,15 @@ def main() -> None:
     p.add_argument("--model", default=None)
     p.add_argument("--temperature", type=float, default=None)
     p.add_argument("--no-include-original", action="store_true")
+    p.add_argument("--strategy", choices=sorted(STRATEGIES), default=None, help="pairwise ranking instead of a single PickBest prompt")
     args = p.parse_args()
     gen_params = ({"temperature": args.temperature} if args.temperature is not None else None)
 
     def _c(s, code):
         return f"\x1b[{code}m{s}\x1b[0m"
 
-    out = batch_best(args.text, n=args.num, model=args.model, include_original=not args.no_include_original, gen_params=gen_params)
+    extra = {"strategy": args.strategy} if args.strategy else {}
+    out = batch_best(args.text, n=args.num, model=args.model, include_original=not args.no_include_original, gen_params=gen_params, **extra)
     print(_c("BEST", "36") + ": " + _c(out, "1;32"))
 
 
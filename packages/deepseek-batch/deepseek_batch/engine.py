@@ -0,0 +1,225 @@
+"""Reusable async completion engine for best-of-N sampling.
+
+One engine keeps an ``httpx.AsyncClient`` per event loop (HTTP/2 when ``h2``
+is installed), so every batch reuses the same connection pool. Requests are
+bounded by a semaphore and retried with jittered exponential backoff on
+transport errors, 429 and 5xx. ``stream`` yields candidates as they arrive
+and ``gather`` can stop once enough have been collected, cancelling the
+requests still in flight.
+
+Synchronous callers go through :func:`run_sync`, which runs coroutines on a
+long-lived background loop instead of ``asyncio.run``; it therefore works
+from threads that already run an event loop and keeps the pool warm between
+calls.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import weakref
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, List, Optional, TypeVar
+
+import httpx
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1"
+RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class CompletionEngine:
+    """Bounded, retrying chat-completions client shared across batches."""
+
+    def __init__(
+        self,
+        *,
+        base_url: str = OPENROUTER_URL,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        timeout: float = 60.0,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.http2 = _http2_available() if http2 is None else http2
+        self.transport = transport
+        # Clients and semaphores are bound to the loop that created them.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            key = self.api_key if self.api_key is not None else os.getenv("OPENROUTER_API_KEY", "")
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {key}"},
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._clients[loop] = client
+            self._slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return client
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(self.max_backoff, float(retry_after))
+                except ValueError:
+                    pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    async def complete(self, text: str, model: str, gen_params: Optional[Dict[str, Any]] = None) -> str:
+        client = self._client()
+        slots = self._slots[asyncio.get_running_loop()]
+        body = {
+            "model": model,
+            "messages": [{"role": "user", "content": text}],
+            **(gen_params or {"temperature": 0.7}),
+        }
+        attempt = 0
+        while True:
+            response: Optional[httpx.Response] = None
+            try:
+                async with slots:
+                    response = await client.post("/chat/completions", json=body)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    data = response.json()
+                    return data["choices"][0]["message"]["content"].strip()
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+            await asyncio.sleep(self._delay(attempt, response))
+            attempt += 1
+
+    async def stream(
+        self, text: str, n: int, model: str, gen_params: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """Yield ``n`` candidates in completion order; closing the iterator cancels the rest."""
+
+        tasks = [asyncio.create_task(self.complete(text, model, gen_params)) for _ in range(n)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def gather(
+        self,
+        text: str,
+        n: int,
+        model: str,
+        gen_params: Optional[Dict[str, Any]] = None,
+        *,
+        enough: Optional[int] = None,
+        on_candidate: Optional[Callable[[str], None]] = None,
+    ) -> List[str]:
+        """Collect candidates, stopping after ``enough`` of them if given."""
+
+        results: List[str] = []
+        stream = self.stream(text, n, model, gen_params)
+        try:
+            async for candidate in stream:
+                results.append(candidate)
+                if on_candidate is not None:
+                    on_candidate(candidate)
+                if enough is not None and len(results) >= enough:
+                    break
+        finally:
+            await stream.aclose()
+        return results
+
+    async def aclose(self) -> None:
+        """Close the client owned by the running loop."""
+
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+class _BackgroundLoop:
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="deepseek-batch-loop", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+
+_background = _BackgroundLoop()
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` to completion from synchronous code, inside a running loop or not."""
+
+    loop = _background.loop()
+    try:
+        running: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the engine's own loop")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+_default_engine: Optional[CompletionEngine] = None
+
+
+def default_engine() -> CompletionEngine:
+    """Process-wide engine (``DEEPSEEK_BATCH_CONCURRENCY`` bounds requests in flight)."""
+
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = CompletionEngine(
+            max_concurrency=int(os.getenv("DEEPSEEK_BATCH_CONCURRENCY", "8")),
+        )
+    return _default_engine
+
+
+__all__ = ["CompletionEngine", "default_engine", "run_sync"]
+
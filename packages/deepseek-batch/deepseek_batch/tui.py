@@ -34,13 +34,21 @@ def main() -> None:
                 return
             self.query_one("#out", Static).update(Text("…running…", style="yellow"))
 
+            out_widget = self.query_one("#out", Static)
+            seen: list[str] = []
+
+            def on_candidate(candidate: str) -> None:
+                # Candidates stream in from the engine loop; show progress as they land.
+                seen.append(candidate)
+                self.call_from_thread(out_widget.update, Text(f"…{len(seen)} candidates, latest: {candidate[:60]}", style="yellow"))
+
             def worker():
                 try:
-                    out = batch_best(inp)
+                    out = batch_best(inp, on_candidate=on_candidate)
                     render = Text("BEST: ", style="cyan") + Text(out, style="bold green")
                 except Exception as e:  # minimal surfacing, no fallbacks
                     render = Text(f"error: {e}", style="bold red")
-                self.call_from_thread(self.query_one("#out", Static).update, render)
+                self.call_from_thread(out_widget.update, render)
 
             threading.Thread(target=worker, daemon=True).start()
 
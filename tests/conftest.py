@@ -1 +1,10 @@
-"""Empty pytest conftest; helpers live in tests.helpers to avoid path issues."""
+"""Shared pytest fixtures; helpers live in tests.helpers to avoid path issues."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_backup_dir(tmp_path_factory, monkeypatch):
+    # Code under test that writes constraints also snapshots them; keep those
+    # backups out of the working tree.
+    monkeypatch.setenv("NLCO_BACKUP_DIR", str(tmp_path_factory.mktemp("backups")))
@@ -22,6 +22,7 @@ def install_fake_dspy(best_choice: int = 1):
 
     def configure(lm=None):  # record configured LM
         m._configured = lm
+        m.settings.lm = lm
 
     m.best_choice = best_choice
     m._calls = []  # (sig, kwargs) for non-PickBest
@@ -62,6 +63,7 @@ def install_fake_dspy(best_choice: int = 1):
     m.Predict = Predict
     m.OpenAI = OpenAI
     m.configure = configure
+    m.settings = types.SimpleNamespace(lm=None)
 
     sys.modules["dspy"] = m
     # Provide a tiny httpx stub if missing (tests never call it)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from artifact_history import ArtifactHistory, RetentionPolicy
+
+
+def test_record_deduplicates_and_links_parents(tmp_path: Path):
+    store = ArtifactHistory(tmp_path / "artifact_history")
+    t0 = datetime(2025, 11, 1, 9, 0, 0)
+
+    v1 = store.record("one\n", ts=t0)
+    assert store.record("one\n", ts=t0 + timedelta(minutes=1)) is None
+    v2 = store.record("one\ntwo\n", ts=t0 + timedelta(minutes=2))
+    v3 = store.record("one\n", ts=t0 + timedelta(minutes=3))
+
+    assert [v.hash for v in store.versions()] == [v1.hash, v2.hash, v3.hash]
+    assert v2.parent == v1.hash and v3.parent == v2.hash
+    assert v3.hash == v1.hash
+    # One blob per distinct content
+    assert len(list((tmp_path / "artifact_history" / "objects").rglob("*"))) == 4  # 2 dirs + 2 blobs
+    assert store.read(v2.hash) == "one\ntwo\n"
+    assert "+two" in store.diff(v1.hash, v2.hash)
+
+
+def test_time_queries(tmp_path: Path):
+    store = ArtifactHistory(tmp_path)
+    t0 = datetime(2025, 11, 1, 9, 0, 0)
+    for i in range(5):
+        store.record(f"v{i}", ts=t0 + timedelta(hours=i))
+
+    assert store.read(store.at(t0 + timedelta(hours=2, minutes=30)).hash) == "v2"
+    assert store.at(t0 - timedelta(seconds=1)) is None
+    window = store.between(t0 + timedelta(hours=1), t0 + timedelta(hours=3))
+    assert [store.read(v.hash) for v in window] == ["v1", "v2", "v3"]
+
+
+def test_compaction_thins_old_versions_and_collects_blobs(tmp_path: Path):
+    store = ArtifactHistory(tmp_path, policy=RetentionPolicy(keep_all=timedelta(hours=1)))
+    store.COMPACT_EVERY = 10**9  # compact manually
+    now = datetime(2025, 11, 10, 12, 0, 0)
+    # Every 10 minutes for two days
+    for i in range(288):
+        store.record(f"content {i}", ts=now - timedelta(minutes=10 * (288 - i)))
+
+    removed = store.compact(now=now)
+    versions = store.versions()
+
+    assert removed > 200
+    assert len(versions) < 60
+    assert versions[-1].hash == store.head().hash
+    assert all(b.parent == a.hash for a, b in zip(versions, versions[1:]))
+    blobs = [p for p in (tmp_path / "objects").rglob("*") if p.is_file()]
+    assert len(blobs) == len({v.hash for v in versions})
@@ -0,0 +1,153 @@
+"""Tests for the headless batch runner."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from web_dspy_builder.batch import completed_rows, main, row_overrides, run_batch
+from web_dspy_builder.models import (
+    EdgeSpec,
+    GraphSpec,
+    NodePorts,
+    NodeSpec,
+    PortReference,
+    RunSettings,
+)
+from web_dspy_builder.node_cache import PersistentNodeCache
+
+
+def _graph() -> GraphSpec:
+    return GraphSpec(
+        nodes=[
+            NodeSpec(id="question", type="input", config={"value": ""}, ports=NodePorts(outputs=["text"])),
+            NodeSpec(
+                id="upper",
+                type="python",
+                config={"code": "outputs['text'] = inputs['text'].upper()"},
+                ports=NodePorts(inputs=["text"], outputs=["text"]),
+            ),
+            NodeSpec(id="out", type="output", config={}, ports=NodePorts(inputs=["text"])),
+        ],
+        edges=[
+            EdgeSpec(
+                id="e1",
+                source=PortReference(node="question", port="text"),
+                target=PortReference(node="upper", port="text"),
+            ),
+            EdgeSpec(
+                id="e2",
+                source=PortReference(node="upper", port="text"),
+                target=PortReference(node="out", port="text"),
+            ),
+        ],
+    )
+
+
+def _write_rows(path: Path, rows: List[Dict[str, Any]]) -> None:
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def _read(path: Path) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_row_overrides_match_node_id_or_port() -> None:
+    graph = _graph()
+    assert row_overrides(graph, {"question": "a"}) == {"question": {"value": "a"}}
+    assert row_overrides(graph, {"text": "b", "id": 3}) == {"question": {"value": "b"}}
+    assert row_overrides(graph, {"other": 1}) == {}
+
+
+@pytest.mark.asyncio
+async def test_batch_writes_every_row_and_resumes(tmp_path: Path) -> None:
+    inputs = tmp_path / "inputs.jsonl"
+    output = tmp_path / "out.jsonl"
+    _write_rows(inputs, [{"id": f"r{i}", "text": f"row {i}"} for i in range(10)])
+
+    stats = await run_batch(_graph(), RunSettings(), inputs, output, concurrency=3, limit=6)
+    assert (stats.succeeded, stats.failed) == (6, 0)
+    assert completed_rows(output) == set(range(6))
+
+    # Simulate a crash mid-write, then resume.
+    with output.open("a") as fh:
+        fh.write('{"row": 6, "outp')
+    stats = await run_batch(_graph(), RunSettings(), inputs, output, concurrency=3)
+    assert (stats.skipped, stats.succeeded) == (6, 4)
+
+    records = sorted(_read(output), key=lambda record: record["row"])
+    assert [record["row"] for record in records] == list(range(10))
+    assert records[7]["id"] == "r7"
+    assert records[7]["outputs"] == {"out": {"text": "ROW 7"}}
+
+
+@pytest.mark.asyncio
+async def test_batch_records_row_errors(tmp_path: Path) -> None:
+    inputs = tmp_path / "inputs.jsonl"
+    output = tmp_path / "out.jsonl"
+    _write_rows(inputs, [{"text": "ok"}, {"text": 5}])
+
+    stats = await run_batch(_graph(), RunSettings(), inputs, output)
+    assert (stats.succeeded, stats.failed) == (1, 1)
+    failed = next(record for record in _read(output) if record["row"] == 1)
+    assert "AttributeError" in failed["error"]
+
+
+@pytest.mark.asyncio
+async def test_resume_retries_failed_rows(tmp_path: Path) -> None:
+    inputs = tmp_path / "inputs.jsonl"
+    output = tmp_path / "out.jsonl"
+    _write_rows(inputs, [{"text": "ok"}, {"text": 5}, {"text": "fine"}])
+
+    stats = await run_batch(_graph(), RunSettings(), inputs, output)
+    assert (stats.succeeded, stats.failed) == (2, 1)
+    assert completed_rows(output) == {0, 2}
+
+    # The failing row is fixed in the dataset; resuming runs only that row.
+    _write_rows(inputs, [{"text": "ok"}, {"text": "five"}, {"text": "fine"}])
+    stats = await run_batch(_graph(), RunSettings(), inputs, output)
+    assert (stats.skipped, stats.succeeded, stats.failed) == (2, 1, 0)
+
+    records = sorted(_read(output), key=lambda record: record["row"])
+    assert [record["row"] for record in records] == [0, 1, 2]
+    assert records[1]["outputs"] == {"out": {"text": "FIVE"}}
+
+
+def test_corrupt_middle_line_keeps_later_rows(tmp_path: Path) -> None:
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        '{"row": 0, "outputs": {}}\n'
+        "not json\n"
+        '{"row": 2, "outputs": {}}\n'
+        '{"row": 3, "outp'
+    )
+
+    assert completed_rows(output) == {0, 2}
+    assert [record["row"] for record in _read(output)] == [0, 2]
+
+
+@pytest.mark.asyncio
+async def test_batch_reuses_node_cache_across_rows(tmp_path: Path) -> None:
+    inputs = tmp_path / "inputs.jsonl"
+    _write_rows(inputs, [{"text": "same"}] * 5)
+    cache = PersistentNodeCache(tmp_path / "nodes.sqlite")
+
+    await run_batch(_graph(), RunSettings(), inputs, tmp_path / "out.jsonl", concurrency=1, node_cache=cache)
+    assert cache.stats()["entries"] == 1
+
+
+def test_cli_runs_saved_program_document(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DSPY_BUILDER_NODE_CACHE", "off")
+    program = tmp_path / "program.json"
+    program.write_text(
+        json.dumps({"graph": _graph().model_dump(mode="json"), "settings": {"max_concurrency": 2}})
+    )
+    inputs = tmp_path / "inputs.jsonl"
+    _write_rows(inputs, [{"question": "x"}, {"question": "y"}])
+
+    assert main([str(program), str(inputs), "--concurrency", "2"]) == 0
+    records = _read(tmp_path / "inputs.out.jsonl")
+    assert sorted(record["outputs"]["out"]["text"] for record in records) == ["X", "Y"]
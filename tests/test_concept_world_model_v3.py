@@ -796,3 +796,146 @@ def test_episode_summary_includes_running_avg(monkeypatch):
 
     joined = "\n".join(messages)
     assert "Running avg episode reward" in joined
+
+
+def test_tag_many_batches_and_retries_only_missing_rows(monkeypatch):
+    """tag_many packs observations per call and re-asks only for dropped rows."""
+    state_concepts = cm.BASE_STATE_CONCEPTS[:2]
+    universe = cm.ConceptUniverse(concepts=state_concepts)
+    tagger = cm.LLMConceptTagger(batch_size=3, max_concurrency=2)
+    calls: list[list[str]] = []
+
+    def fake_predict_batch(observations, concepts):
+        calls.append(list(observations))
+        rows = []
+        for i, obs in enumerate(observations):
+            # First time we see "o4", leave it out of the answer.
+            if obs == "o4" and sum(o == "o4" for batch in calls for o in batch) == 1:
+                continue
+            value = int(obs[1:]) % 2 == 0
+            rows.append(
+                {
+                    "index": i,
+                    "activations": [
+                        {"concept_id": concepts[0].id, "value": value},
+                        {"concept_id": concepts[1].id, "value": not value},
+                    ],
+                }
+            )
+        return SimpleNamespace(rows={"rows": rows})
+
+    monkeypatch.setattr(tagger, "predict_batch", fake_predict_batch)
+    monkeypatch.setattr(cm.console, "print", lambda *a, **k: None)
+
+    dataset = cm.EpisodeDataset()
+    dataset.observations = [f"o{i}" for i in range(7)]
+    dataset.tag_all_state(tagger, universe)
+
+    assert sorted(len(batch) for batch in calls) == [1, 1, 3, 3]
+    assert ["o4"] in calls  # only the missing row was retried
+    assert dataset.Z_state.tolist() == [
+        [1, -1] if i % 2 == 0 else [-1, 1] for i in range(7)
+    ]
+
+
+def test_tag_many_falls_back_to_single_calls(monkeypatch):
+    """Rows never answered by batch calls are tagged one at a time."""
+    universe = cm.ConceptUniverse(concepts=cm.BASE_STATE_CONCEPTS[:1])
+    tagger = cm.LLMConceptTagger(batch_size=4, max_retries=1)
+    monkeypatch.setattr(
+        tagger, "predict_batch", lambda **kw: SimpleNamespace(rows="not-json")
+    )
+    monkeypatch.setattr(
+        tagger,
+        "tag_state",
+        lambda obs, universe: np.ones(len(universe.state_concepts), dtype=int),
+    )
+    monkeypatch.setattr(cm.console, "print", lambda *a, **k: None)
+
+    Z = tagger.tag_many(["a", "b"], universe)
+    assert Z.tolist() == [[1], [1]]
+
+
+def test_activation_cache_tags_only_new_concepts_and_unseen_rows(monkeypatch, tmp_path):
+    """With a cache, re-tagging after the universe grows asks only for new cells."""
+    cache = cm.ActivationCache(str(tmp_path / "activations.sqlite"))
+    tagger = cm.LLMConceptTagger(batch_size=8, cache=cache)
+    asked: list[tuple[list[str], list[str]]] = []
+
+    def fake_predict_batch(observations, concepts):
+        asked.append((list(observations), [c.id for c in concepts]))
+        rows = [
+            {
+                "index": i,
+                "activations": [{"concept_id": c.id, "value": True} for c in concepts],
+            }
+            for i in range(len(observations))
+        ]
+        return SimpleNamespace(rows={"rows": rows})
+
+    monkeypatch.setattr(tagger, "predict_batch", fake_predict_batch)
+    monkeypatch.setattr(cm.console, "print", lambda *a, **k: None)
+
+    base = cm.BASE_STATE_CONCEPTS[:2]
+    observations = ["a", "b", "a", "c"]
+    Z = tagger.tag_many(observations, cm.ConceptUniverse(concepts=base))
+    assert Z.tolist() == [[1, 1]] * 4
+    # Duplicate "a" is tagged once.
+    assert asked == [(["a", "b", "c"], [c.id for c in base])]
+    assert len(cache) == 6
+
+    new = cm.Concept(id="NEW_ONE", definition="Something new.", source=cm.ConceptSource.LLM)
+    asked.clear()
+    Z = tagger.tag_many(observations + ["d"], cm.ConceptUniverse(concepts=base + [new]))
+    assert Z.tolist() == [[1, 1, 1]] * 5
+    assert sorted(asked) == sorted([(["a", "b", "c"], ["NEW_ONE"]), (["d"], [c.id for c in base] + ["NEW_ONE"])])
+
+    # A changed definition is a different cache key.
+    edited = cm.Concept(id="NEW_ONE", definition="Edited.", source=cm.ConceptSource.LLM)
+    asked.clear()
+    tagger.tag_many(["a"], cm.ConceptUniverse(concepts=[edited]))
+    assert asked == [(["a"], ["NEW_ONE"])]
+
+    # Single-observation tagging reads the same cache.
+    monkeypatch.setattr(tagger, "predict", lambda **kw: (_ for _ in ()).throw(AssertionError("cached")))
+    assert tagger.tag_state("b", cm.ConceptUniverse(concepts=base)).tolist() == [1, 1]
+    cache.close()
+
+
+def _score_pairs_reference(discovery, K_state, Z_state, G):
+    global_reward = float(G.mean())
+    out = []
+    for i in range(K_state):
+        for j in range(i + 1, K_state):
+            mask = (Z_state[:, i] == 1) & (Z_state[:, j] == 1)
+            support = mask.mean()
+            if support < discovery.min_support or mask.sum() == 0:
+                continue
+            reward_pair = float(G[mask].mean())
+            if reward_pair <= global_reward:
+                continue
+            out.append((reward_pair, support, i, j))
+    out.sort(key=lambda x: -x[0])
+    return out
+
+
+def test_score_pairs_vectorised_matches_pairwise_loop(monkeypatch):
+    """Matrix-product pair scoring equals the per-pair mask loop (dense and sparse)."""
+    rng = np.random.default_rng(0)
+    discovery = cm.PairwiseConceptDiscovery(min_support=0.05)
+    for K_state, sparse_min in ((12, 256), (12, 2)):
+        monkeypatch.setattr(cm.PairwiseConceptDiscovery, "SPARSE_MIN_CONCEPTS", sparse_min)
+        Z = rng.choice([-1, 0, 1], size=(300, K_state), p=[0.4, 0.2, 0.4])
+        G = rng.random(300) + Z[:, 0] * 0.3
+        concepts = [
+            cm.Concept(id=f"C{k}", definition=f"c{k}", source=cm.ConceptSource.LLM)
+            for k in range(K_state)
+        ]
+        expected = _score_pairs_reference(discovery, K_state, Z, G)
+        got = discovery._score_pairs(concepts, Z, G)
+        assert [(i, j) for _, _, i, j in got] == [(i, j) for _, _, i, j in expected]
+        assert np.allclose([r for r, *_ in got], [r for r, *_ in expected])
+        assert np.allclose([s for _, s, *_ in got], [s for _, s, *_ in expected])
+
+        top = discovery._score_pairs(concepts, Z, G, top_k=3)
+        assert top == got[:3]
@@ -41,3 +41,77 @@ def test_backups_created_in_htmx_writer(tmp_path: Path, monkeypatch) -> None:
         # content equals the pre-write content
         assert files[0].read_text(encoding="utf-8").strip() == "old"
 
+
+
+def test_appends_within_hour_are_stored_as_deltas(tmp_path: Path) -> None:
+    from backups import BackupEngine, BackupRetention
+
+    engine = BackupEngine(tmp_path, "constraints", retention=BackupRetention(0, 0, 0))
+    t0 = datetime(2025, 11, 12, 15, 0, 0)
+    text = "# 2025-11-12\n"
+    snapshots = []
+    for minute in range(5):
+        text += f"15:{minute:02d}:00 entry {minute}\n"
+        engine.snapshot(text, now=t0.replace(minute=minute))
+        snapshots.append(text)
+    engine.snapshot(text, now=t0.replace(minute=6))  # unchanged: no new record
+
+    assert len(list((tmp_path / "hourly").glob("*.md"))) == 1
+    delta = tmp_path / "hourly" / "constraints-2025111215.delta"
+    assert delta.read_text(encoding="utf-8") == text[len(snapshots[0]):]
+    assert len([r for r in engine.records() if r["tier"] == "hourly"]) == 5
+    for minute, expected in enumerate(snapshots):
+        assert engine.restore(t0.replace(minute=minute, second=30)) == expected
+    assert engine.verify() == []
+
+
+def test_rewrite_starts_new_base_and_verify_detects_corruption(tmp_path: Path) -> None:
+    from backups import BackupEngine, BackupRetention, main
+
+    engine = BackupEngine(tmp_path, "constraints", retention=BackupRetention(0, 0, 0))
+    t0 = datetime(2025, 11, 12, 15, 0, 0)
+    engine.snapshot("A\nB\n", now=t0)
+    engine.snapshot("A\nB\nC\n", now=t0.replace(minute=1))
+    engine.snapshot("rewritten\n", now=t0.replace(minute=2))
+
+    assert engine.restore() == "rewritten\n"
+    assert engine.restore(t0.replace(minute=1)) == "A\nB\nC\n"
+    assert main(["--root", str(tmp_path), "verify"]) == 0
+
+    delta = next((tmp_path / "hourly").glob("*.delta"))
+    delta.write_bytes(b"X\n")
+    problems = engine.verify()
+    assert len(problems) == 1 and "checksum" in problems[0]
+    assert main(["--root", str(tmp_path), "verify"]) == 1
+
+
+def test_retention_prunes_old_hourly_bases(tmp_path: Path) -> None:
+    from backups import BackupEngine, BackupRetention
+
+    engine = BackupEngine(tmp_path, "constraints", retention=BackupRetention(hourly=3, daily=0, weekly=0))
+    text = ""
+    for hour in range(6):
+        text += f"line {hour}\n"
+        engine.snapshot(text, now=datetime(2025, 11, 12, hour, 0, 0))
+
+    hourly = sorted(p.name for p in (tmp_path / "hourly").glob("*.md"))
+    assert hourly == [f"constraints-20251112{h:02d}.md" for h in (3, 4, 5)]
+    assert all((tmp_path / r["base"]).exists() for r in engine.records())
+    assert engine.restore(datetime(2025, 11, 12, 1, 30)) == "line 0\n"  # daily base still available
+    assert engine.verify() == []
+
+
+def test_retention_ignores_stems_sharing_a_prefix(tmp_path: Path) -> None:
+    from backups import BackupEngine, BackupRetention
+
+    other = BackupEngine(tmp_path, "c-notes", retention=BackupRetention(hourly=0, daily=0, weekly=0))
+    other.snapshot("other\n", now=datetime(2025, 11, 12, 0, 0, 0))
+    engine = BackupEngine(tmp_path, "c", retention=BackupRetention(hourly=1, daily=0, weekly=0))
+    text = ""
+    for hour in range(3):
+        text += f"line {hour}\n"
+        engine.snapshot(text, now=datetime(2025, 11, 12, hour, 0, 0))
+
+    hourly = sorted(p.name for p in (tmp_path / "hourly").glob("*.md"))
+    assert hourly == ["c-2025111202.md", "c-notes-2025111200.md"]
+    assert other.verify() == []
@@ -9,3 +9,51 @@ def test_tail_and_append(tmp_path: Path):
     assert p.read_text().endswith("C\n")
     assert tail_lines(p, 2) == ["B", "C"]
 
+
+
+def test_tail_lines_matches_splitlines_across_blocks(tmp_path: Path):
+    import constraints_io
+
+    p = tmp_path / "big.md"
+    lines = [f"line {i} äöü" * (i % 7) for i in range(5000)]
+    p.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    expected = p.read_text(encoding="utf-8").splitlines()
+
+    for n in (1, 2, 37, 4999, 5000, 6000):
+        constraints_io._TAIL_CACHE.clear()
+        assert tail_lines(p, n) == expected[-n:]
+
+    with p.open("rb") as fh:
+        got, complete = constraints_io._read_tail(fh, p.stat().st_size, 10, block_size=7)
+    assert got == expected[-10:]
+    assert not complete
+
+
+def test_tail_lines_parses_only_appended_bytes(tmp_path: Path, monkeypatch):
+    import constraints_io
+
+    p = tmp_path / "c.md"
+    p.write_text("A\nB\npartial")
+    assert tail_lines(p, 2) == ["B", "partial"]
+
+    with p.open("a") as fh:
+        fh.write(" line\nC\n")
+
+    def no_full_read(*args, **kwargs):
+        raise AssertionError("append should not trigger a tail re-read")
+
+    monkeypatch.setattr(constraints_io, "_read_tail", no_full_read)
+    assert tail_lines(p, 2) == ["partial line", "C"]
+    assert tail_lines(p, 1) == ["C"]
+
+
+def test_tail_lines_rereads_after_rewrite(tmp_path: Path):
+    p = tmp_path / "c.md"
+    p.write_text("A\nB\nC\n")
+    assert tail_lines(p, 2) == ["B", "C"]
+
+    p.write_text("X\nY\nZ\nW\n")
+    assert tail_lines(p, 2) == ["Z", "W"]
+
+    p.unlink()
+    assert tail_lines(p, 2) == []
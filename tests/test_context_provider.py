@@ -48,3 +48,85 @@ def test_get_autoposter_alert_when_stale(tmp_path):
         config.social.posted_posts_path = original_path
 
     assert "Autoposter alert" in alert
+
+
+def test_context_source_serves_stale_value_while_revalidating():
+    import threading
+    import time
+
+    from context_provider import ContextSource
+
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return f"v{len(calls)}"
+
+    source = ContextSource("demo", fetch, ttl=0.0, placeholder="pending")
+    assert source.get(wait=1.0) == "v1"
+
+    # Expired: the cached value is returned immediately while a refresh runs
+    start = time.monotonic()
+    assert source.get(wait=1.0) == "v1"
+    assert time.monotonic() - start < 0.5
+    release.set()
+    for _ in range(50):
+        if source.value == "v2":
+            break
+        time.sleep(0.01)
+    assert source.value == "v2"
+
+
+def test_context_source_concurrent_callers_share_one_refresh():
+    import threading
+
+    from context_provider import ContextSource
+
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "fresh"
+
+    source = ContextSource("shared", fetch, ttl=60, placeholder="pending")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(source.get(wait=2.0))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["fresh"] * 4
+    assert len(calls) == 1
+    assert source.get(wait=0.0) == "fresh" and len(calls) == 1
+
+
+def test_context_source_placeholder_when_first_fetch_is_slow():
+    import threading
+
+    from context_provider import ContextSource
+
+    release = threading.Event()
+    source = ContextSource("slow", lambda: release.wait(5) and "late", ttl=60, placeholder="pending")
+    try:
+        assert source.get(wait=0.05) == "pending"
+    finally:
+        release.set()
+
+
+def test_read_meminfo_parses_kb_fields(tmp_path):
+    from context_provider import _read_meminfo
+
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal:       2048 kB\nMemAvailable:   1024 kB\nHugePages_Total:       0\n")
+
+    info = _read_meminfo(meminfo)
+
+    assert info["MemTotal"] == 2048 * 1024
+    assert info["MemAvailable"] == 1024 * 1024
+    assert info["HugePages_Total"] == 0
@@ -0,0 +1,119 @@
+import asyncio
+import importlib
+
+import httpx
+
+from tests.helpers import install_fake_dspy, fresh_pkg, import_pkg
+
+
+def _engine(handler, **kw):
+    install_fake_dspy()
+    with fresh_pkg():
+        import_pkg()
+        engine_mod = importlib.import_module("deepseek_batch.engine")
+    return engine_mod, engine_mod.CompletionEngine(
+        api_key="k", transport=httpx.MockTransport(handler), backoff=0.0, **kw
+    )
+
+
+def _reply(content):
+    return httpx.Response(200, json={"choices": [{"message": {"content": f" {content} "}}]})
+
+
+def test_engine_retries_rate_limits_and_transport_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"retry-after": "0"})
+        if len(calls) == 2:
+            raise httpx.ConnectError("reset", request=request)
+        return _reply("ok")
+
+    engine_mod, engine = _engine(handler)
+    assert engine_mod.run_sync(engine.complete("Q", "M")) == "ok"
+    assert len(calls) == 3
+    assert calls[0].headers["authorization"] == "Bearer k"
+
+
+def test_engine_gives_up_after_max_retries():
+    engine_mod, engine = _engine(lambda request: httpx.Response(503), max_retries=1)
+    try:
+        engine_mod.run_sync(engine.complete("Q", "M"))
+    except httpx.HTTPStatusError as exc:
+        assert exc.response.status_code == 503
+    else:
+        raise AssertionError("expected HTTPStatusError")
+
+
+def test_engine_gather_stops_early_and_bounds_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return _reply("c")
+        finally:
+            in_flight -= 1
+
+    engine_mod, engine = _engine(handler, max_concurrency=2)
+    seen = []
+    out = engine_mod.run_sync(engine.gather("Q", 6, "M", enough=3, on_candidate=seen.append))
+    assert out == ["c", "c", "c"] and seen == out
+    assert peak <= 2
+
+
+def test_run_sync_works_inside_running_loop():
+    engine_mod, engine = _engine(lambda request: _reply("inner"))
+
+    async def caller():
+        # The old asyncio.run() path raised here.
+        return engine_mod.run_sync(engine.complete("Q", "M"))
+
+    assert asyncio.run(caller()) == "inner"
+
+
+def test_bestofbatch_min_candidates_and_signature_path():
+    dspy = install_fake_dspy(best_choice=1)
+    seen = {}
+    with fresh_pkg():
+        m = import_pkg()
+
+        async def fake_batch(text, n, model, gen_params=None, *, enough=None, on_candidate=None):
+            seen.update(enough=enough)
+            return ["A", "B"][:enough]
+
+        m._batch = fake_batch  # type: ignore[attr-defined]
+        assert m.BestOfBatch(n=4, min_candidates=1, include_original=False)("Q") == "A"
+        assert seen["enough"] == 1
+
+        class Sig(dspy.Signature):
+            pass
+
+        assert m.BestOfBatch(n=3)(Sig, q="x") == "BASE"
+        assert len(dspy._calls) == 3
+
+        assert asyncio.run(m.abatch_best("Q", n=2, include_original=False)) == "A"
+
+
+def test_batch_best_streams_candidates_and_keeps_test_hook():
+    install_fake_dspy(best_choice=1)
+    with fresh_pkg():
+        m = import_pkg()
+
+        async def fake_batch(text, n, model, gen_params=None, *, enough=None, on_candidate=None):
+            for candidate in ("A", "B"):
+                on_candidate(candidate)
+            return ["A", "B"]
+
+        m._batch = fake_batch  # type: ignore[attr-defined]
+        seen = []
+        assert m.batch_best("Q", n=2, include_original=False, on_candidate=seen.append) == "A"
+        assert seen == ["A", "B"]
+        assert m.batch_best("blueberries", on_candidate=seen.append) == "seirrebeulb"
+        assert seen == ["A", "B"]
@@ -0,0 +1,118 @@
+"""Tests for batched WebSocket event delivery."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from web_dspy_builder.event_stream import EventStream
+
+
+class SlowClient:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.frames: List[List[Dict[str, Any]]] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send(self, batch: List[Dict[str, Any]]) -> None:
+        await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        self.frames.append(batch)
+
+    def events(self) -> List[Dict[str, Any]]:
+        return [event for frame in self.frames for event in frame]
+
+
+@pytest.mark.asyncio
+async def test_events_are_batched_in_order() -> None:
+    client = SlowClient()
+    stream = EventStream(client.send, window=0.02, max_batch=50)
+    for index in range(120):
+        await stream.publish({"type": "node_start", "nodeId": str(index)})
+    await stream.flush()
+    await stream.close()
+
+    assert [event["nodeId"] for event in client.events()] == [str(i) for i in range(120)]
+    assert len(client.frames) <= 4
+    assert all(len(frame) <= 50 for frame in client.frames)
+
+
+@pytest.mark.asyncio
+async def test_backpressure_drops_edge_data_and_merges_logs() -> None:
+    client = SlowClient()
+    client.gate.clear()  # client stalls
+    stream = EventStream(client.send, max_queue=5, window=0.001, max_batch=100)
+
+    await stream.publish({"type": "node_start", "runId": "r", "nodeId": "a"})
+    await asyncio.sleep(0.01)  # first frame is now stuck in send()
+    for index in range(5):
+        await stream.publish({"type": "node_log", "runId": "r", "nodeId": "a", "log": f"line {index}"})
+    for index in range(20):
+        await stream.publish({"type": "edge_data", "runId": "r", "edgeId": "e", "iteration": index})
+    await stream.publish({"type": "edge_data", "runId": "r", "edgeId": "e", "iteration": 99})
+
+    # Critical events wait for room instead of being dropped.
+    blocked = asyncio.create_task(stream.publish({"type": "node_end", "runId": "r", "nodeId": "a"}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    client.gate.set()
+    await blocked
+    await stream.flush()
+    await stream.close()
+
+    events = client.events()
+    types = [event["type"] for event in events]
+    assert types.count("node_log") == 1
+    assert events[1]["log"] == "\n".join(f"line {i}" for i in range(5))
+    assert types[-2:] == ["events_dropped", "node_end"]
+    dropped = [event for event in events if event["type"] == "events_dropped"]
+    assert dropped and dropped[0]["count"] == 17
+    assert stream.stats["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_send_failure_surfaces_to_publisher() -> None:
+    async def broken(batch: List[Dict[str, Any]]) -> None:
+        raise ConnectionError("client went away")
+
+    stream = EventStream(broken, window=0.001)
+    await stream.publish({"type": "run_started"})
+    with pytest.raises(ConnectionError):
+        await stream.flush()
+    with pytest.raises(ConnectionError):
+        await stream.publish({"type": "node_start"})
+    await stream.close()
+
+
+@pytest.mark.asyncio
+async def test_coalescing_copies_logs_and_drop_notice_precedes_terminal_event() -> None:
+    client = SlowClient()
+    client.gate.clear()
+    stream = EventStream(client.send, max_queue=1, window=0.001, max_batch=100)
+
+    await stream.publish({"type": "node_start", "runId": "r", "nodeId": "a"})
+    await asyncio.sleep(0.01)  # first frame is now stuck in send()
+    recorded = {"type": "node_log", "runId": "r", "nodeId": "a", "log": "one"}
+    await stream.publish(recorded)
+    await stream.publish({"type": "node_log", "runId": "r", "nodeId": "a", "log": "two"})
+    await stream.publish({"type": "edge_data", "runId": "r", "edgeId": "e"})
+    await stream.publish({"type": "edge_data", "runId": "r:loop:0", "edgeId": "e"})
+    await stream.publish({"type": "edge_data", "runId": "r:loop:0", "edgeId": "e"})
+
+    done = asyncio.create_task(stream.publish({"type": "run_complete", "runId": "r"}))
+    await asyncio.sleep(0.01)
+    client.gate.set()
+    await done
+    await stream.flush()
+    await stream.close()
+
+    assert recorded["log"] == "one"
+    events = client.events()
+    assert [event["log"] for event in events if event["type"] == "node_log"] == ["one\ntwo"]
+    assert events[-1]["type"] == "run_complete"
+    notices = [event for event in events if event["type"] == "events_dropped"]
+    assert {n["runId"]: n["count"] for n in notices} == {"r": 1, "r:loop:0": 2}
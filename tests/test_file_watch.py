@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from file_watch import ChangeEvent, FileWatcher
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_inotify", [True, False])
+async def test_watcher_reports_writes_and_atomic_replace(tmp_path: Path, use_inotify):
+    target = tmp_path / "constraints.md"
+    target.write_text("a\n")
+    other = tmp_path / "other.md"
+    seen: list[Path] = []
+
+    watcher = FileWatcher(debounce=0.02, poll_interval=0.05, use_inotify=use_inotify)
+    watcher.add(target, seen.append)
+    watcher.start()
+    try:
+        if not use_inotify:
+            assert watcher.backend == "poll"
+        with target.open("a") as fh:
+            fh.write("b\n")
+        await _wait_for(lambda: len(seen) == 1)
+
+        tmp = tmp_path / "constraints.md.tmp"
+        tmp.write_text("replaced, longer\n")
+        os.replace(tmp, target)
+        await _wait_for(lambda: len(seen) == 2)
+
+        other.write_text("ignored")
+        await asyncio.sleep(0.15)
+        assert seen == [target.absolute(), target.absolute()]
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_burst_of_writes_is_debounced(tmp_path: Path):
+    target = tmp_path / "artifact.md"
+    target.write_text("")
+    seen: list[Path] = []
+
+    watcher = FileWatcher(debounce=0.1, use_inotify=True)
+    watcher.add(target, seen.append)
+    watcher.start()
+    try:
+        for i in range(20):
+            with target.open("a") as fh:
+                fh.write(f"{i}\n")
+        await asyncio.sleep(0.3)
+        assert len(seen) == 1
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_change_event_wait_times_out_and_fires(tmp_path: Path):
+    target = tmp_path / "constraints.md"
+    event = ChangeEvent()
+    watcher = FileWatcher(debounce=0.01, poll_interval=0.05)
+    watcher.add(target, event.set)
+    watcher.start()
+    try:
+        assert await event.wait(timeout=0.05) is False
+        target.write_text("created\n")
+        assert await event.wait(timeout=2) is True
+    finally:
+        watcher.stop()
@@ -5,11 +5,11 @@ from typing import Dict
 
 import pytest
 
+from web_dspy_builder.compiled_graph import CompiledGraph, prefixed
 from web_dspy_builder.graph_runner import (
     ExecutionError,
     GraphRunner,
-    _namespace_graph,
-    prepare_loop_bindings,
+    create_executor,
 )
 from web_dspy_builder.models import (
     EdgeSpec,
@@ -138,19 +138,19 @@ def test_plan_execution_raises_for_unknown_start_node() -> None:
         runner._plan_execution(resume, start_node="missing", overrides={})
 
 
-def test_namespace_graph_adds_prefix_without_mutating_original() -> None:
+def test_compiled_graph_order_is_topological_and_events_get_prefixed() -> None:
     body = GraphSpec(
         nodes=[
-            NodeSpec(
-                id="input",
-                type="input",
-                ports=NodePorts(outputs=["value"]),
-            ),
             NodeSpec(
                 id="sink",
                 type="output",
                 ports=NodePorts(inputs=["value"]),
             ),
+            NodeSpec(
+                id="input",
+                type="input",
+                ports=NodePorts(outputs=["value"]),
+            ),
         ],
         edges=[
             EdgeSpec(
@@ -161,17 +161,20 @@ def test_namespace_graph_adds_prefix_without_mutating_original() -> None:
         ],
     )
 
-    namespaced = _namespace_graph(body, "loop::")
+    compiled = CompiledGraph(body)
+    assert compiled.topological_order() == ("input", "sink")
+    assert compiled.topological_order() is compiled.topological_order()
 
-    assert body.nodes[0].id == "input"
-    assert namespaced.nodes[0].id == "loop::input"
-    assert namespaced.nodes[1].id == "loop::sink"
-    assert namespaced.edges[0].id == "loop::edge"
-    assert namespaced.edges[0].source.node == "loop::input"
-    assert namespaced.edges[0].target.node == "loop::sink"
+    event = {"edgeId": "edge", "source": {"node": "input"}, "target": {"node": "sink"}}
+    namespaced = prefixed(event, "loop::")
+    assert event["edgeId"] == "edge"
+    assert namespaced["edgeId"] == "loop::edge"
+    assert namespaced["source"]["node"] == "loop::input"
+    assert namespaced["target"]["node"] == "loop::sink"
 
 
-def test_prepare_loop_bindings_uses_items_and_outer_inputs() -> None:
+@pytest.mark.asyncio
+async def test_loop_input_bindings_use_items_and_outer_inputs() -> None:
     loop_graph = GraphSpec(
         nodes=[
             NodeSpec(
@@ -195,14 +198,23 @@ def test_prepare_loop_bindings_uses_items_and_outer_inputs() -> None:
         ],
         edges=[],
     )
-
-    prepare_loop_bindings(loop_graph, item="current", outer_inputs={"shared": "outer"})
+    runner = GraphRunner(
+        loop_graph,
+        RunSettings(),
+        "bindings",
+        _noop_sender,
+        None,
+        loop_context={"item": "current", "inputs": {"shared": "outer"}},
+    )
     nodes = loop_graph.node_map()
 
-    assert nodes["from_items"].type == "input"
-    assert nodes["from_items"].config["value"] == "current"
-    assert nodes["from_outer"].config["value"] == "outer"
-    assert nodes["fallback"].config["value"] == "fallback"
+    async def value(node_id: str) -> object:
+        result = await create_executor(runner, nodes[node_id]).run({}, {})
+        return result.outputs["value"]
+
+    assert await value("from_items") == "current"
+    assert await value("from_outer") == "outer"
+    assert await value("fallback") == "fallback"
 
 
 @pytest.mark.asyncio
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import builtins
 import sys
+import threading
+import time
 from types import SimpleNamespace
 
 import pytest
@@ -130,3 +133,114 @@ def test_llm_engine_rejects_unknown_engine() -> None:
 
     with pytest.raises(ValidationError):
         LLMSettings(engine="mystery")
+
+
+@pytest.mark.asyncio
+async def test_acomplete_runs_many_requests_without_threads() -> None:
+    """Mock latency is awaited, so hundreds of requests overlap on one thread."""
+
+    engine = LLMEngine(
+        LLMSettings(engine="mock", model="load", concurrency=500, params={"latency": 0.05})
+    )
+    threads_before = threading.active_count()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(engine.acomplete(f"prompt {i}") for i in range(300)))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert threading.active_count() <= threads_before
+    assert results[0] == engine.complete("prompt 0")
+
+
+@pytest.mark.asyncio
+async def test_acomplete_respects_per_model_concurrency() -> None:
+    """Engines for the same model share one concurrency cap."""
+
+    settings = LLMSettings(engine="mock", model="capped", concurrency=3)
+    engines = [LLMEngine(settings), LLMEngine(settings)]
+    active = 0
+    peak = 0
+
+    for engine in engines:
+        async def tracked(prompt: str, *, stop=None, _respond=engine._impl._respond) -> str:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return _respond(prompt, stop)
+
+        engine._impl.acomplete = tracked  # type: ignore[method-assign]
+
+    await asyncio.gather(*(engines[i % 2].acomplete(str(i)) for i in range(20)))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_limiter_is_keyed_on_the_resolved_model() -> None:
+    """Settings that reach the same provider model share one limiter."""
+
+    from web_dspy_builder import llm
+
+    default = LLMSettings(engine="dspy")
+    explicit = LLMSettings(engine="openrouter", model=" openrouter/google/gemini-2.0-flash-thinking ")
+    assert llm.resolved_model(default) == llm.resolved_model(explicit)
+    assert llm._limiter_for(default) is llm._limiter_for(explicit)
+    assert llm._limiter_for(default) is not llm._limiter_for(LLMSettings(engine="openai"))
+
+
+@pytest.mark.asyncio
+async def test_engines_with_different_limits_share_the_stricter_cap() -> None:
+    """Per-engine concurrency settings on one model combine to the minimum."""
+
+    engines = [
+        LLMEngine(LLMSettings(engine="mock", model="mixed", concurrency=4)),
+        LLMEngine(LLMSettings(engine="mock", model="mixed", concurrency=2)),
+    ]
+    active = 0
+    peak = 0
+
+    for engine in engines:
+        async def tracked(prompt: str, *, stop=None, _respond=engine._impl._respond) -> str:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return _respond(prompt, stop)
+
+        engine._impl.acomplete = tracked  # type: ignore[method-assign]
+
+    await engines[1].acomplete("warm")  # registers the lower limit too
+    await asyncio.gather(*(engines[i % 2].acomplete(str(i)) for i in range(20)))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_request_rate() -> None:
+    """A requests-per-minute limit spaces calls out after the initial burst."""
+
+    engine = LLMEngine(LLMSettings(engine="mock", model="rated", requests_per_minute=1200))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(engine.acomplete(str(i)) for i in range(30)))
+    elapsed = time.perf_counter() - started
+
+    # 20 requests/s with a one-second burst: the last 10 need ~0.5s of refill.
+    assert 0.4 <= elapsed < 1.5
+
+
+@pytest.mark.asyncio
+async def test_dspy_wrapper_prefers_native_async_call() -> None:
+    """DSPyWrapper.acomplete uses the LM's acall when it exists."""
+
+    class AsyncLM:
+        async def acall(self, *, prompt: str, **params: object) -> dict[str, object]:
+            return {"text": f"async:{prompt}"}
+
+        def __call__(self, *, prompt: str, **params: object) -> dict[str, object]:
+            raise AssertionError("sync path should not be used")
+
+    wrapper = DSPyWrapper(LLMSettings(engine="dspy"), AsyncLM())
+    assert await wrapper.acomplete("hi") == "async:hi"
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import sys
+import time
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from nlco_stages import Stage, run_stages
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_overlap():
+    async def slow(_deps):
+        await asyncio.sleep(0.2)
+        return "done"
+
+    start = time.perf_counter()
+    results, trace = await run_stages([Stage("a", slow), Stage("b", slow), Stage("c", slow)])
+    elapsed = time.perf_counter() - start
+
+    assert results == {"a": "done", "b": "done", "c": "done"}
+    assert elapsed < 0.5
+    assert all(t.status == "ok" for t in trace.timings.values())
+
+
+@pytest.mark.asyncio
+async def test_dependencies_receive_results_and_define_critical_path():
+    def base(_deps):
+        time.sleep(0.05)
+        return 2
+
+    async def quick(_deps):
+        return 1
+
+    async def double(deps):
+        await asyncio.sleep(0.05)
+        return deps["base"] * 2
+
+    results, trace = await run_stages(
+        [Stage("base", base), Stage("quick", quick), Stage("double", double, deps=("base",))]
+    )
+
+    assert results["double"] == 4
+    assert trace.timings["double"].start >= trace.timings["base"].end
+    assert trace.critical_path() == ["base", "double"]
+    assert "critical path: base → double" in trace.render()
+
+
+@pytest.mark.asyncio
+async def test_timeout_skips_dependents_without_raising():
+    async def hang(_deps):
+        await asyncio.sleep(5)
+
+    async def child(_deps):
+        return "never"
+
+    async def other(_deps):
+        return "ok"
+
+    results, trace = await run_stages(
+        [
+            Stage("hang", hang, timeout=0.05),
+            Stage("child", child, deps=("hang",)),
+            Stage("other", other),
+        ]
+    )
+
+    assert results == {"other": "ok"}
+    assert trace.timings["hang"].status == "timeout"
+    assert trace.timings["child"].status == "skipped"
+
+
+@pytest.mark.asyncio
+async def test_error_cancels_running_stages():
+    cancelled = asyncio.Event()
+
+    async def boom(_deps):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def long(_deps):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await run_stages([Stage("boom", boom), Stage("long", long)])
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_error_keeps_siblings_that_finished_in_the_same_wakeup():
+    gate = asyncio.Event()
+
+    async def boom(_deps):
+        await gate.wait()
+        raise RuntimeError("boom")
+
+    async def fine(_deps):
+        await gate.wait()
+        return "ok"
+
+    async def opener(_deps):
+        gate.set()
+        await asyncio.sleep(5)
+
+    with pytest.raises(RuntimeError, match="boom") as info:
+        await run_stages([Stage("boom", boom), Stage("fine", fine), Stage("opener", opener)])
+    timings = info.value.stage_trace.timings
+    assert timings["boom"].status == "error"
+    assert timings["fine"].status == "ok"
+    assert timings["opener"].status == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_rejects_unknown_dependency_and_cycles():
+    async def noop(_deps):
+        return None
+
+    with pytest.raises(ValueError, match="unknown stage"):
+        await run_stages([Stage("a", noop, deps=("missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        await run_stages([Stage("a", noop, deps=("b",)), Stage("b", noop, deps=("a",))])
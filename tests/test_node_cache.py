@@ -0,0 +1,134 @@
+"""Tests for the persistent node-result cache."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from web_dspy_builder.graph_runner import GraphRunner
+from web_dspy_builder.models import (
+    EdgeSpec,
+    GraphSpec,
+    LLMSettings,
+    NodePorts,
+    NodeSpec,
+    PortReference,
+    RunSettings,
+)
+from web_dspy_builder.node_cache import CachedResult, PersistentNodeCache
+from web_dspy_builder.run_manager import RunManager
+
+
+def _graph(value: str) -> GraphSpec:
+    return GraphSpec(
+        nodes=[
+            NodeSpec(id="input", type="input", config={"value": value}, ports=NodePorts(outputs=["value"])),
+            NodeSpec(
+                id="llm",
+                type="llm",
+                config={"prompt": "Echo {{value}}"},
+                ports=NodePorts(inputs=["value"], outputs=["text"]),
+            ),
+            NodeSpec(id="out", type="output", config={}, ports=NodePorts(inputs=["text"])),
+        ],
+        edges=[
+            EdgeSpec(
+                id="e1",
+                source=PortReference(node="input", port="value"),
+                target=PortReference(node="llm", port="value"),
+            ),
+            EdgeSpec(
+                id="e2",
+                source=PortReference(node="llm", port="text"),
+                target=PortReference(node="out", port="text"),
+            ),
+        ],
+    )
+
+
+async def _run(graph: GraphSpec, cache: PersistentNodeCache, settings: RunSettings | None = None):
+    events: List[Dict[str, Any]] = []
+
+    async def sender(event: Dict[str, Any]) -> None:
+        events.append(event)
+
+    runner = GraphRunner(
+        graph, settings or RunSettings(), "run", sender, RunManager(), node_cache=cache
+    )
+    result = await runner.run()
+    hits = {
+        event["nodeId"]
+        for event in events
+        if event["type"] == "node_end" and event["metadata"].get("cache") == "hit"
+    }
+    return result, hits
+
+
+@pytest.mark.asyncio
+async def test_identical_node_served_across_runs_and_instances(tmp_path: Path) -> None:
+    path = tmp_path / "nodes.sqlite"
+    first, hits = await _run(_graph("a"), PersistentNodeCache(path))
+    assert hits == set()
+
+    # A fresh cache object on the same file stands in for a server restart.
+    second, hits = await _run(_graph("a"), PersistentNodeCache(path))
+    assert hits == {"llm"}
+    assert second.final_outputs == first.final_outputs
+
+
+@pytest.mark.asyncio
+async def test_inputs_and_llm_settings_are_part_of_the_key(tmp_path: Path) -> None:
+    cache = PersistentNodeCache(tmp_path / "nodes.sqlite")
+    await _run(_graph("a"), cache)
+
+    _, hits = await _run(_graph("b"), cache)
+    assert hits == set()
+
+    other_model = RunSettings(llm=LLMSettings(model="other"))
+    _, hits = await _run(_graph("a"), cache, other_model)
+    assert hits == set()
+
+    _, hits = await _run(_graph("a"), cache, RunSettings(use_node_cache=False))
+    assert hits == set()
+
+
+@pytest.mark.asyncio
+async def test_fallback_results_are_not_stored(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from web_dspy_builder import graph_runner
+
+    class FallbackExecutor(graph_runner.LLMNodeExecutor):
+        async def run(self, inputs, overrides):  # noqa: ANN001 - executor protocol
+            return graph_runner.NodeExecutionResult(outputs={"text": "canned"}, metadata={"fallback": True})
+
+    monkeypatch.setitem(graph_runner.EXECUTOR_REGISTRY, "llm", FallbackExecutor)
+    cache = PersistentNodeCache(tmp_path / "nodes.sqlite")
+    await _run(_graph("a"), cache)
+    _, hits = await _run(_graph("a"), cache)
+
+    assert hits == set()
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_keeps_store_within_budget(tmp_path: Path) -> None:
+    blob = "x" * 80
+    entry = len(json.dumps({"outputs": {"text": blob}, "metadata": {}}))
+    cache = PersistentNodeCache(tmp_path / "nodes.sqlite", max_bytes=3 * entry)
+    for key in ("a", "b", "c"):
+        assert cache.put(key, "llm", CachedResult(outputs={"text": blob}))
+    assert cache.get("a") is not None  # a is now more recent than b
+
+    cache.put("d", "llm", CachedResult(outputs={"text": blob}))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("d") is not None
+    assert cache.stats()["bytes"] <= 3 * entry
+
+
+def test_unserialisable_results_are_skipped(tmp_path: Path) -> None:
+    cache = PersistentNodeCache(tmp_path / "nodes.sqlite")
+    assert cache.put("k", "python", CachedResult(outputs={"value": object()})) is False
+    assert cache.get("k") is None
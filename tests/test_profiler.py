@@ -0,0 +1,132 @@
+"""Tests for the run profiler."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from web_dspy_builder.graph_runner import GraphRunner
+from web_dspy_builder.models import (
+    EdgeSpec,
+    GraphSpec,
+    LLMSettings,
+    NodeCache,
+    NodePorts,
+    NodeSpec,
+    PortReference,
+    RunSettings,
+    RunState,
+)
+from web_dspy_builder.node_cache import PersistentNodeCache
+from web_dspy_builder.profiler import profile_run
+from web_dspy_builder.run_manager import RunManager
+
+
+def _edge(source: str, target: str) -> EdgeSpec:
+    return EdgeSpec(
+        id=f"{source}-{target}",
+        source=PortReference(node=source, port="value"),
+        target=PortReference(node=target, port="value"),
+    )
+
+
+def _diamond() -> GraphSpec:
+    ports = NodePorts(inputs=["value"], outputs=["value"])
+    return GraphSpec(
+        nodes=[
+            NodeSpec(id=node_id, type="python", config={}, ports=ports)
+            for node_id in ("a", "fast", "slow", "join")
+        ],
+        edges=[_edge("a", "fast"), _edge("a", "slow"), _edge("fast", "join"), _edge("slow", "join")],
+    )
+
+
+def test_profile_of_recorded_run() -> None:
+    origin = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    state = RunState(
+        run_id="r", graph=_diamond(), settings=RunSettings(max_concurrency=1), started_at=origin
+    )
+
+    def record(node_id: str, start: float, end: float, **metadata: Any) -> None:
+        state.node_results[node_id] = NodeCache(
+            node_id=node_id,
+            outputs={},
+            transmissions=[],
+            signature="sig",
+            started_at=origin + timedelta(seconds=start),
+            completed_at=origin + timedelta(seconds=end),
+            metadata=metadata,
+        )
+
+    # Serial execution: "slow" waited for "fast" although both were ready at 1s.
+    record("a", 0.0, 1.0)
+    record("fast", 1.0, 2.0, usage={"promptTokens": 100, "completionTokens": 50})
+    record("slow", 2.0, 5.0, usage={"promptTokens": 10, "completionTokens": 10, "cost": 0.5})
+    record("join", 5.0, 5.5, cache="hit", computeSeconds=2.5)
+
+    profile = profile_run(state, prompt_price=1_000_000, completion_price=2_000_000)
+    nodes = {node.node_id: node for node in profile.nodes}
+
+    assert profile.wall_seconds == pytest.approx(5.5)
+    assert profile.busy_seconds == pytest.approx(5.5)
+    assert profile.critical_path == ["a", "slow", "join"]
+    assert profile.critical_path_seconds == pytest.approx(4.5)
+    assert profile.parallelism_achieved == pytest.approx(1.0)
+    assert profile.parallelism_available == pytest.approx(5.5 / 4.5)
+    assert nodes["slow"].queue_seconds == pytest.approx(1.0)
+    assert nodes["fast"].queue_seconds == pytest.approx(0.0)
+    assert not nodes["fast"].critical and nodes["slow"].critical
+    assert nodes["fast"].cost == pytest.approx(200.0)
+    assert nodes["slow"].cost == pytest.approx(0.5)
+    assert profile.prompt_tokens == 110 and profile.completion_tokens == 60
+    assert profile.cache_hits == 1
+    assert profile.cache_saved_seconds == pytest.approx(2.0)
+
+    data = profile.to_dict()
+    assert data["criticalPath"] == ["a", "slow", "join"]
+    assert data["nodes"][0]["selfSeconds"] == pytest.approx(1.0)
+
+
+def _llm_graph() -> GraphSpec:
+    return GraphSpec(
+        nodes=[
+            NodeSpec(id="input", type="input", config={"value": "hi"}, ports=NodePorts(outputs=["value"])),
+            NodeSpec(
+                id="llm",
+                type="llm",
+                config={"prompt": "Echo {{value}}"},
+                ports=NodePorts(inputs=["value"], outputs=["value"]),
+            ),
+        ],
+        edges=[_edge("input", "llm")],
+    )
+
+
+async def _run(graph: GraphSpec, settings: RunSettings, cache: PersistentNodeCache, manager: RunManager):
+    async def sender(event: Dict[str, Any]) -> None:
+        return None
+
+    runner = GraphRunner(graph, settings, "run", sender, manager, node_cache=cache)
+    result = await runner.run()
+    return result.run_state
+
+
+@pytest.mark.asyncio
+async def test_profile_reports_llm_usage_and_node_cache_savings(tmp_path: Path) -> None:
+    cache = PersistentNodeCache(tmp_path / "nodes.sqlite")
+    settings = RunSettings(llm=LLMSettings(params={"latency": 0.05}, cache_responses=False))
+
+    first = profile_run(await _run(_llm_graph(), settings, cache, RunManager()))
+    llm = next(node for node in first.nodes if node.node_id == "llm")
+    assert llm.cache is None
+    assert llm.self_seconds >= 0.05
+    assert llm.prompt_tokens > 0 and llm.completion_tokens > 0
+
+    second = profile_run(await _run(_llm_graph(), settings, cache, RunManager()))
+    llm = next(node for node in second.nodes if node.node_id == "llm")
+    assert llm.cache == "hit"
+    assert llm.prompt_tokens == 0
+    assert second.cache_saved_seconds >= 0.04
@@ -0,0 +1,87 @@
+import asyncio
+import importlib
+
+from tests.helpers import install_fake_dspy, fresh_pkg, import_pkg
+
+# The fake PairwiseBetter prefers the lexicographically larger answer.
+POOL = [f"{i:02d}" for i in (7, 3, 12, 0, 9, 5, 11, 1, 4, 10, 2, 8, 6)]
+
+
+def _ranking():
+    install_fake_dspy()
+    with fresh_pkg():
+        m = import_pkg()
+        return m, importlib.import_module("deepseek_batch.ranking")
+
+
+def test_tournament_runs_log_rounds_and_finds_best():
+    m, ranking = _ranking()
+    judge = ranking.PairwiseJudge(m.PairwiseBetter)
+    res = asyncio.run(ranking.rank(POOL, judge, "tournament"))
+    assert res.best == "12"
+    assert res.rounds == 4  # ceil(log2 13)
+    assert res.comparisons == len(POOL) - 1
+    assert sorted(res.ranking) == sorted(POOL)
+
+
+def test_swiss_orders_the_whole_pool():
+    m, ranking = _ranking()
+    judge = ranking.PairwiseJudge(m.PairwiseBetter)
+    res = asyncio.run(ranking.rank(POOL, judge, "swiss", rounds=6))
+    assert res.best == "12"
+    assert res.scores == sorted(res.scores, reverse=True)
+    assert "00" in res.ranking[-2:]
+    assert res.comparisons == 6 * (len(POOL) // 2)
+
+
+def test_bradley_terry_fit_recovers_order():
+    m, ranking = _ranking()
+    judge = ranking.PairwiseJudge(m.PairwiseBetter)
+    res = asyncio.run(ranking.rank(POOL, judge, "bradley_terry", samples_per_item=8, seed=1))
+    assert res.rounds == 1
+    assert res.ranking[:2] == ["12", "11"]
+    assert ranking.fit_bradley_terry(2, [(0, 1)] * 3)[0] > 1.0
+
+
+def test_comparison_cache_skips_repeat_and_reversed_pairs():
+    m, ranking = _ranking()
+    cache = ranking.ComparisonCache()
+    judge = ranking.PairwiseJudge(m.PairwiseBetter, cache=cache)
+    first = asyncio.run(judge.compare_many(["a", "b"], [(0, 1), (0, 1), (1, 0)]))
+    assert first == [False, False, True]
+    assert judge.calls == 1
+    assert m.BinaryRanker(cache=cache)._better("b", "a") is True
+    assert cache.hits >= 1
+
+
+def test_comparison_cache_is_per_model_and_bounded():
+    m, ranking = _ranking()
+    cache = ranking.ComparisonCache(max_entries=2)
+    judge = ranking.PairwiseJudge(m.PairwiseBetter, cache=cache)
+    ranking.dspy.configure(lm=ranking.dspy.OpenAI(model="judge-a"))
+    asyncio.run(judge.compare("a", "b"))
+    ranking.dspy.configure(lm=ranking.dspy.OpenAI(model="judge-b"))
+    asyncio.run(judge.compare("a", "b"))
+    assert judge.calls == 2
+    asyncio.run(judge.compare("b", "c"))
+    assert len(cache) == 2
+    # The oldest verdict (judge-a) was evicted; judge-b's is still cached.
+    assert cache.get("PairwiseBetter", "a", "b", model="judge-a") is None
+    assert cache.get("PairwiseBetter", "a", "b", model="judge-b") is False
+
+
+def test_bestofbatch_switches_to_tournament_for_large_pools():
+    install_fake_dspy(best_choice=1)
+    with fresh_pkg():
+        m = import_pkg()
+
+        async def fake_batch(text, n, model, gen_params=None):
+            return POOL[:n]
+
+        m._batch = fake_batch  # type: ignore[attr-defined]
+        # Small pool: PickBest prompt (index 1).
+        assert m.batch_best("Q", n=3, include_original=False) == "07"
+        # Large pool: pairwise tournament.
+        assert m.batch_best("Q", n=13, include_original=False) == "12"
+        assert m.batch_best("Q", n=3, include_original=False, strategy="swiss") == "12"
+        assert m.rank_candidates(POOL, "swiss").best == "12"
@@ -0,0 +1,152 @@
+"""Tests for the LLM response cache and request coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from web_dspy_builder.llm import LLMEngine
+from web_dspy_builder.models import LLMSettings
+from web_dspy_builder.response_cache import ResponseCache
+
+
+class CountingEngine(LLMEngine):
+    def __init__(self, settings: LLMSettings, cache: ResponseCache | None) -> None:
+        super().__init__(settings, cache=cache)
+        self.upstream = 0
+        respond = self._impl._respond
+
+        async def slow(prompt: str, *, stop=None) -> str:
+            self.upstream += 1
+            await asyncio.sleep(0.02)
+            return respond(prompt, stop)
+
+        def sync(prompt: str, *, stop=None) -> str:
+            self.upstream += 1
+            return respond(prompt, stop)
+
+        self._impl.acomplete = slow  # type: ignore[method-assign]
+        self._impl.complete = sync  # type: ignore[method-assign]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_prompts_share_one_call() -> None:
+    cache = ResponseCache()
+    engine = CountingEngine(LLMSettings(model="dedup"), cache)
+
+    results = await asyncio.gather(*(engine.acomplete("same prompt") for _ in range(10)))
+
+    assert len(set(results)) == 1
+    assert engine.upstream == 1
+    assert cache.stats["coalesced"] == 9
+    assert cache.stats["misses"] == 1
+
+    await engine.acomplete("same prompt")
+    assert engine.upstream == 1
+    assert cache.stats["memory_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_key_covers_model_params_and_stop() -> None:
+    cache = ResponseCache()
+    engine = CountingEngine(LLMSettings(model="a"), cache)
+    other = CountingEngine(LLMSettings(model="a", temperature=0.7), cache)
+
+    await engine.acomplete("p")
+    await engine.acomplete("p", stop="x")
+    await other.acomplete("p")
+    assert engine.upstream == 2
+    assert other.upstream == 1
+
+    # Scheduling knobs do not split the cache.
+    rated = CountingEngine(LLMSettings(model="a", concurrency=2, requests_per_minute=600), cache)
+    await rated.acomplete("p")
+    assert rated.upstream == 0
+
+
+def test_disk_tier_survives_new_cache_and_lru_bounds_memory(tmp_path: Path) -> None:
+    path = tmp_path / "llm.sqlite"
+    engine = CountingEngine(LLMSettings(model="disk"), ResponseCache(max_entries=2, path=path))
+    for prompt in ("one", "two", "three"):
+        engine.complete(prompt)
+    assert len(engine.cache._memory) == 2
+
+    fresh = CountingEngine(LLMSettings(model="disk"), ResponseCache(path=path))
+    assert fresh.complete("one") == engine.complete("one")
+    assert fresh.upstream == 0
+    assert fresh.cache.snapshot()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached_and_reach_every_waiter() -> None:
+    cache = ResponseCache()
+    engine = LLMEngine(LLMSettings(model="boom"), cache=cache)
+    calls = 0
+
+    async def failing(prompt: str, *, stop=None) -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    engine._impl.acomplete = failing  # type: ignore[method-assign]
+    results = await asyncio.gather(*(engine.acomplete("p") for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert calls == 1
+
+    with pytest.raises(RuntimeError):
+        await engine.acomplete("p")
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_first_caller_leaves_coalesced_waiters_running() -> None:
+    cache = ResponseCache()
+    engine = CountingEngine(LLMSettings(model="cancel"), cache)
+
+    leader = asyncio.create_task(engine.acomplete("p"))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(engine.acomplete("p"))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == engine._impl._respond("p", None)
+    assert leader.cancelled()
+    assert engine.upstream == 1
+    assert len(cache._memory) == 1
+
+
+@pytest.mark.asyncio
+async def test_last_waiter_leaving_cancels_the_shared_call() -> None:
+    cache = ResponseCache()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def compute() -> str:
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    callers = [asyncio.create_task(cache.acomplete("k", compute)) for _ in range(2)]
+    await started.wait()
+    callers[0].cancel()
+    await asyncio.sleep(0)
+    assert not cancelled.is_set()
+    callers[1].cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert cache._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_disabled_per_settings() -> None:
+    engine = CountingEngine(LLMSettings(model="nocache", cache_responses=False), ResponseCache())
+    await engine.acomplete("p")
+    await engine.acomplete("p")
+    assert engine.upstream == 2
@@ -0,0 +1,190 @@
+"""Tests for the bounded, spillable run manager."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from web_dspy_builder.graph_runner import GraphRunner
+from web_dspy_builder.models import (
+    EdgeSpec,
+    GraphSpec,
+    NodePorts,
+    NodeSpec,
+    PortReference,
+    RunSettings,
+)
+from web_dspy_builder.run_manager import RunManager
+
+
+async def _noop_sender(event: Dict[str, object]) -> None:
+    return None
+
+
+def _graph(value: str) -> GraphSpec:
+    return GraphSpec(
+        id="g",
+        nodes=[
+            NodeSpec(id="input", type="input", config={"value": value}, ports=NodePorts(outputs=["value"])),
+            NodeSpec(
+                id="py",
+                type="python",
+                config={"code": "outputs['value'] = inputs['value'] + '!'"},
+                ports=NodePorts(inputs=["value"], outputs=["value"]),
+            ),
+            NodeSpec(id="out", type="output", config={}, ports=NodePorts(inputs=["value"])),
+        ],
+        edges=[
+            EdgeSpec(
+                id="e1",
+                source=PortReference(node="input", port="value"),
+                target=PortReference(node="py", port="value"),
+            ),
+            EdgeSpec(
+                id="e2",
+                source=PortReference(node="py", port="value"),
+                target=PortReference(node="out", port="value"),
+            ),
+        ],
+    )
+
+
+async def _run(manager: RunManager, run_id: str, value: str = "x") -> GraphRunner:
+    runner = GraphRunner(_graph(value), RunSettings(), run_id, _noop_sender, manager)
+    await runner.run()
+    return runner
+
+
+@pytest.mark.asyncio
+async def test_finished_runs_spill_and_reload(tmp_path: Path) -> None:
+    manager = RunManager(max_runs=2, spill_dir=tmp_path)
+    first = await _run(manager, "r1", "first")
+    await _run(manager, "r2")
+    await _run(manager, "r3")
+
+    assert set(manager.all_runs()) == {"r2", "r3"}
+    assert [item["runId"] for item in manager.summaries()] == ["r1", "r2", "r3"]
+
+    reloaded = manager.get("r1")
+    assert reloaded is not None
+    assert reloaded.timeline == first.run_state.timeline
+    assert reloaded.node_results["py"].outputs == {"value": "first!"}
+    assert reloaded.node_results["py"].signature == first.run_state.node_results["py"].signature
+    assert reloaded.node_results["py"].transmissions[0].value == "first!"
+    assert "r1" in manager.all_runs()
+    assert len(manager.all_runs()) == 2
+
+
+@pytest.mark.asyncio
+async def test_replay_from_spilled_run_reuses_cache(tmp_path: Path) -> None:
+    manager = RunManager(max_runs=1, spill_dir=tmp_path)
+    await _run(manager, "base")
+    await _run(manager, "other")
+    assert "base" not in manager.all_runs()
+
+    events = []
+
+    async def sender(event):
+        events.append(event)
+
+    runner = GraphRunner(_graph("x"), RunSettings(), "replay", sender, manager)
+    await runner.run(resume=manager.get("base"), start_node="out")
+
+    assert {e["nodeId"] for e in events if e["type"] == "node_cached"} == {"input", "py"}
+
+
+@pytest.mark.asyncio
+async def test_byte_budget_and_restart_index(tmp_path: Path) -> None:
+    manager = RunManager(max_runs=100, max_bytes=1, spill_dir=tmp_path)
+    for index in range(5):
+        await _run(manager, f"r{index}")
+    assert manager.all_runs() == {}
+    assert manager.resident_bytes() == 0
+
+    restarted = RunManager(spill_dir=tmp_path)
+    assert {item["runId"] for item in restarted.summaries()} == {f"r{i}" for i in range(5)}
+    assert restarted.summaries()[0]["nodeCount"] == 3
+    assert restarted.get("r4").node_results["out"].outputs == {"value": "x!"}
+
+    restarted.forget("r0")
+    assert restarted.get("r0") is None
+    assert len(list(tmp_path.glob("*.jsonl.gz"))) == 4
+
+
+def test_active_runs_are_never_evicted(tmp_path: Path) -> None:
+    manager = RunManager(max_runs=1, spill_dir=tmp_path)
+    GraphRunner(_graph("a"), RunSettings(), "a", _noop_sender, manager)
+    GraphRunner(_graph("b"), RunSettings(), "b", _noop_sender, manager)
+    manager.finish("missing")
+
+    assert set(manager.all_runs()) == {"a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_spill_dir_keeps_only_the_newest_files(tmp_path: Path) -> None:
+    import os
+
+    manager = RunManager(max_runs=1, spill_dir=tmp_path, max_spilled=2)
+    for index in range(5):
+        await _run(manager, f"r{index}")
+        for path in tmp_path.glob("*.jsonl.gz"):  # keep mtimes strictly ordered
+            os.utime(path, (path.stat().st_mtime - 1, path.stat().st_mtime - 1))
+
+    assert len(list(tmp_path.glob("*.jsonl.gz"))) == 2
+    assert [item["runId"] for item in manager.summaries()] == ["r2", "r3", "r4"]
+    assert manager.get("r0") is None
+    assert manager.get("r3").node_results["out"].outputs == {"value": "x!"}
+
+    aged = RunManager(spill_dir=tmp_path, max_spill_age=0.0)
+    assert aged.summaries() == []
+    assert list(tmp_path.glob("*.jsonl.gz")) == []
+
+
+@pytest.mark.asyncio
+async def test_spilling_runs_off_the_event_loop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import threading
+
+    from web_dspy_builder import run_manager
+
+    threads = set()
+    original = run_manager._dump_run
+
+    def recording_dump(run_state):  # noqa: ANN001 - test double
+        threads.add(threading.get_ident())
+        return original(run_state)
+
+    monkeypatch.setattr(run_manager, "_dump_run", recording_dump)
+    manager = RunManager(max_runs=1, spill_dir=tmp_path)
+    await _run(manager, "a")
+    await _run(manager, "b")
+
+    assert threads and threading.get_ident() not in threads
+    assert len(list(tmp_path.glob("*.jsonl.gz"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_aget_reloads_spilled_runs_off_the_event_loop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import threading
+
+    from web_dspy_builder import run_manager
+
+    manager = RunManager(max_runs=1, spill_dir=tmp_path)
+    await _run(manager, "a")
+    await _run(manager, "b")
+
+    threads = set()
+    original = run_manager._load_run
+
+    def recording_load(data):  # noqa: ANN001 - test double
+        threads.add(threading.get_ident())
+        return original(data)
+
+    monkeypatch.setattr(run_manager, "_load_run", recording_load)
+    state = await manager.aget("a")
+
+    assert state is not None and state.node_results["out"].outputs == {"value": "x!"}
+    assert threads and threading.get_ident() not in threads
+    assert await manager.aget("a") is state
+    assert await manager.aget("missing") is None
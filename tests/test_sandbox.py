@@ -0,0 +1,158 @@
+"""Tests for the out-of-process python node sandbox."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from web_dspy_builder.graph_runner import ExecutionError, GraphRunner
+from web_dspy_builder.models import GraphSpec, NodePorts, NodeSpec, RunSettings
+from web_dspy_builder.sandbox import SandboxError, SandboxPool
+
+
+@pytest.fixture
+def pool():
+    sandbox = SandboxPool(workers=2, timeout=5.0, memory_mb=256)
+    yield sandbox
+    sandbox.close()
+
+
+@pytest.mark.asyncio
+async def test_runs_code_with_inputs_and_config(pool: SandboxPool) -> None:
+    outputs, stdout = await pool.run(
+        "outputs['total'] = sum(inputs['xs']) * config['scale']",
+        {"xs": [1, 2, 3]},
+        {"scale": 2},
+    )
+    assert outputs == {"total": 12}
+    assert stdout == ""
+
+
+@pytest.mark.asyncio
+async def test_workers_are_reused_and_keep_restricted_builtins(pool: SandboxPool) -> None:
+    for _ in range(3):
+        await pool.run("outputs['ok'] = True", {}, {})
+    assert pool.snapshot()["workers"] == 1
+
+    with pytest.raises(NameError):
+        await pool.run("open('/etc/passwd')", {}, {})
+    # The worker survives errors raised by node code.
+    assert (await pool.run("outputs['n'] = 1", {}, {}))[0] == {"n": 1}
+    assert pool.snapshot()["workers"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_and_replaces_worker(pool: SandboxPool) -> None:
+    started = time.perf_counter()
+    with pytest.raises(SandboxError, match="time limit"):
+        await pool.run("while True:\n    pass", {}, {}, timeout=0.3)
+    assert time.perf_counter() - started < 3
+    assert pool.stats["timeouts"] == 1
+    assert (await pool.run("outputs['after'] = 1", {}, {}))[0] == {"after": 1}
+
+
+@pytest.mark.asyncio
+async def test_result_that_cannot_be_unpickled_is_a_sandbox_error(pool: SandboxPool) -> None:
+    import pickle
+
+    await pool.run("outputs['warm'] = 1", {}, {})
+    worker = pool._idle[0]
+
+    class UnpicklingConn:
+        def __init__(self, conn: Any) -> None:
+            self._conn = conn
+
+        def send(self, obj: Any) -> None:
+            self._conn.send(obj)
+
+        def recv(self) -> Any:
+            self._conn.recv()
+            raise pickle.UnpicklingError("Can't get attribute 'Custom' on <module '__main__'>")
+
+        def close(self) -> None:
+            self._conn.close()
+
+    worker.conn = UnpicklingConn(worker.conn)
+    with pytest.raises(SandboxError, match="could not be unpickled"):
+        await pool.run("outputs['value'] = 1", {}, {})
+    assert worker not in pool._idle
+    assert (await pool.run("outputs['after'] = 1", {}, {}))[0] == {"after": 1}
+
+
+@pytest.mark.asyncio
+async def test_memory_limit_raises_memory_error(pool: SandboxPool) -> None:
+    with pytest.raises(MemoryError):
+        await pool.run("outputs['big'] = 'x' * (1024 * 1024 * 1024)", {}, {})
+
+
+@pytest.mark.asyncio
+async def test_cancellation_frees_the_slot(pool: SandboxPool) -> None:
+    task = asyncio.create_task(pool.run("while True:\n    pass", {}, {}))
+    await asyncio.sleep(0.3)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert pool.stats["cancelled"] == 1
+    assert (await pool.run("outputs['x'] = 2", {}, {}))[0] == {"x": 2}
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_cpu_bound_node(pool: SandboxPool) -> None:
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    await pool.run("n = 0\nfor i in range(3_000_000):\n    n += i\noutputs['n'] = n", {}, {})
+    ticking.cancel()
+    assert ticks >= 5
+
+
+def _python_graph(code: str, **config: Any) -> GraphSpec:
+    return GraphSpec(
+        nodes=[
+            NodeSpec(
+                id="py",
+                type="python",
+                config={"code": code, **config},
+                ports=NodePorts(outputs=["result"]),
+            )
+        ],
+        edges=[],
+    )
+
+
+async def _run(graph: GraphSpec, sandbox: SandboxPool | None) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = []
+
+    async def sender(event: Dict[str, Any]) -> None:
+        events.append(event)
+
+    runner = GraphRunner(graph, RunSettings(), "run", sender, None, sandbox=sandbox)
+    await runner.run()
+    return events
+
+
+@pytest.mark.asyncio
+async def test_graph_runner_uses_sandbox_and_node_timeout(pool: SandboxPool) -> None:
+    events = await _run(_python_graph("outputs['result'] = 7"), pool)
+    end = next(e for e in events if e["type"] == "node_end")
+    assert end["outputs"] == {"result": 7}
+    assert pool.stats["runs"] == 1
+
+    with pytest.raises(ExecutionError, match="time limit"):
+        await _run(_python_graph("while True:\n    pass", timeout=0.2), pool)
+
+
+@pytest.mark.asyncio
+async def test_graph_runner_runs_inline_without_sandbox() -> None:
+    events = await _run(_python_graph("outputs['result'] = 1"), None)
+    end = next(e for e in events if e["type"] == "node_end")
+    assert end["outputs"] == {"result": 1}
@@ -22,6 +22,11 @@ async def test_controller_runs_default_graph():
     edge_events = [event for event in events if event["type"] == "edge_data"]
     assert edge_events, "expected edge transmissions from default program"
 
+    profile = controller.profile()
+    assert profile is not None
+    assert profile.run_id == controller.available_runs()[0]
+    assert profile.critical_path
+
 
 @pytest.mark.asyncio
 async def test_live_override_applies_during_run():
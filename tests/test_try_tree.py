@@ -15,3 +15,60 @@ def test_try_tree_text_iterates_top_then_refines_child():
         tt.refine = lambda prev, x, kw: prev + "!"  # type: ignore[method-assign]
         best = tt("Q")
         assert best == "B!"
+
+
+def test_try_tree_beam_dedups_children_and_records_tree():
+    import json
+    import threading
+    import time
+
+    install_fake_dspy()
+    with fresh_pkg():
+        m = import_pkg()
+
+        async def fake_batch(text, n, model, gen_params=None):
+            return ["C", "A", "B"]
+
+        m._batch = fake_batch  # type: ignore[attr-defined]
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def refine(prev, x, kw):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            return prev[0] + "!"  # both "C" and "C!" refine to "C!"
+
+        tt = m.TryTree(init_n=3, expand_k=2, iters=2)
+        tt.refine = refine  # type: ignore[method-assign]
+        assert tt("Q") == "C!"
+        assert peak == 2  # the whole beam expanded at once
+
+        tree = tt.last_tree
+        assert tree.depth == 2
+        dups = [node for node in tree.nodes if node.duplicate_of is not None]
+        assert dups and all(tree.nodes[node.duplicate_of].text == node.text for node in dups)
+        data = json.loads(tree.to_json())
+        assert data["nodes"][data["best"]]["text"] == "C!"
+        assert data["nodes"][data["best"]]["parent"] is not None
+
+
+def test_try_tree_stops_at_token_budget():
+    install_fake_dspy()
+    with fresh_pkg():
+        m = import_pkg()
+
+        async def fake_batch(text, n, model, gen_params=None):
+            return ["B" * 40, "A" * 40]
+
+        m._batch = fake_batch  # type: ignore[attr-defined]
+        tt = m.TryTree(init_n=2, expand_k=1, iters=5, token_budget=10)
+        tt.refine = lambda prev, x, kw: prev + "!"  # type: ignore[method-assign]
+        assert tt("Q") == "B" * 40
+        assert tt.last_tree.stopped == "budget"
+        assert tt.last_tree.depth == 0
@@ -1,9 +1,12 @@
+import asyncio
+import time
 from typing import Any, Dict, List
 
 import pytest
 
 import cognition_typed_dspy as cognition
 
+from web_dspy_builder import graph_runner
 from web_dspy_builder.graph_runner import GraphRunner
 from web_dspy_builder.models import (
     EdgeSpec,
@@ -17,6 +20,10 @@ from web_dspy_builder.models import (
 from web_dspy_builder.run_manager import RunManager
 
 
+async def _noop_sender(event: Dict[str, object]) -> None:
+    return None
+
+
 @pytest.mark.asyncio
 async def test_graph_runner_executes_linear_graph():
     graph = GraphSpec(
@@ -593,3 +600,304 @@ async def test_cognition_executor_fallback_on_error(monkeypatch: pytest.MonkeyPa
     ]
     assert edge_values and edge_values[0]["choice"] == "execute"
 
+
+
+def _fan_out_graph(width: int) -> GraphSpec:
+    nodes = [
+        NodeSpec(id="seed", type="input", config={"value": "x"}, ports=NodePorts(outputs=["value"]))
+    ]
+    edges = []
+    for index in range(width):
+        nodes.append(
+            NodeSpec(
+                id=f"w{index}",
+                type="sleepy",
+                config={"delay": 0.1},
+                ports=NodePorts(inputs=["value"], outputs=["value"]),
+            )
+        )
+        edges.append(
+            EdgeSpec(
+                id=f"in{index}",
+                source=PortReference(node="seed", port="value"),
+                target=PortReference(node=f"w{index}", port="value"),
+            )
+        )
+        edges.append(
+            EdgeSpec(
+                id=f"out{index}",
+                source=PortReference(node=f"w{index}", port="value"),
+                target=PortReference(node="sink", port="value"),
+            )
+        )
+    nodes.append(NodeSpec(id="sink", type="output", config={}, ports=NodePorts(inputs=["value"])))
+    return GraphSpec(nodes=nodes, edges=edges)
+
+
+@pytest.fixture()
+def sleepy_executor(monkeypatch: pytest.MonkeyPatch) -> Dict[str, int]:
+    stats = {"active": 0, "peak": 0}
+
+    class SleepyExecutor(graph_runner.BaseNodeExecutor):
+        async def run(self, inputs, overrides):  # noqa: ANN001 - executor protocol
+            stats["active"] += 1
+            stats["peak"] = max(stats["peak"], stats["active"])
+            try:
+                await asyncio.sleep(self.spec.config["delay"])
+            finally:
+                stats["active"] -= 1
+            return graph_runner.NodeExecutionResult(outputs={"value": f"{self.qualified_id}:{inputs['value']}"})
+
+    monkeypatch.setitem(graph_runner.EXECUTOR_REGISTRY, "sleepy", SleepyExecutor)
+    return stats
+
+
+@pytest.mark.asyncio
+async def test_wide_layer_runs_concurrently(sleepy_executor: Dict[str, int]) -> None:
+    events: List[Dict[str, Any]] = []
+
+    async def sender(event: Dict[str, Any]) -> None:
+        events.append(event)
+
+    runner = GraphRunner(_fan_out_graph(8), RunSettings(), "wide", sender, RunManager())
+    started = time.perf_counter()
+    result = await runner.run()
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5
+    assert sleepy_executor["peak"] == 8
+    assert sorted(result.final_outputs["sink"]["value"]) == sorted(f"w{i}:x" for i in range(8))
+
+    # Every node starts only after all of its predecessors have ended.
+    position = {
+        (event["type"], event["nodeId"]): index
+        for index, event in enumerate(events)
+        if event["type"] in ("node_start", "node_end")
+    }
+    for edge in runner.graph.edges:
+        assert position[("node_end", edge.source.node)] < position[("node_start", edge.target.node)]
+    starts = [event["nodeId"] for event in events if event["type"] == "node_start"]
+    assert starts[1:9] == [f"w{i}" for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_bounds_in_flight_nodes(sleepy_executor: Dict[str, int]) -> None:
+    runner = GraphRunner(
+        _fan_out_graph(6), RunSettings(max_concurrency=2), "bounded", _noop_sender, RunManager()
+    )
+    await runner.run()
+
+    assert sleepy_executor["peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failing_node_cancels_siblings(monkeypatch: pytest.MonkeyPatch, sleepy_executor: Dict[str, int]) -> None:
+    graph = _fan_out_graph(3)
+    graph.nodes[1] = NodeSpec(
+        id="w0",
+        type="python",
+        config={"code": "outputs['value'] = inputs['missing']"},
+        ports=NodePorts(inputs=["value"], outputs=["value"]),
+    )
+    runner = GraphRunner(graph, RunSettings(), "failing", _noop_sender, RunManager())
+
+    with pytest.raises(KeyError):
+        await runner.run()
+    assert sleepy_executor["active"] == 0
+    assert "sink" not in runner.run_state.node_results
+
+
+def _sleepy_loop_graph(items: List[str], **loop_config: Any) -> GraphSpec:
+    body = GraphSpec(
+        nodes=[
+            NodeSpec(id="loop_in", type="loopInput", config={"binding": "items"}, ports=NodePorts(outputs=["value"])),
+            NodeSpec(
+                id="work",
+                type="sleepy",
+                config={"delay": 0.05},
+                ports=NodePorts(inputs=["value"], outputs=["value"]),
+            ),
+        ],
+        edges=[
+            EdgeSpec(
+                id="be",
+                source=PortReference(node="loop_in", port="value"),
+                target=PortReference(node="work", port="value"),
+            )
+        ],
+    )
+    return GraphSpec(
+        nodes=[
+            NodeSpec(id="items", type="input", config={"value": items}, ports=NodePorts(outputs=["items"])),
+            NodeSpec(
+                id="loop",
+                type="loop",
+                config={
+                    "bodyGraph": body.model_dump(),
+                    "loopOutputs": [{"node": "work", "port": "value", "target": "results"}],
+                    **loop_config,
+                },
+                ports=NodePorts(inputs=["items"], outputs=["results"]),
+            ),
+            NodeSpec(id="out", type="output", config={}, ports=NodePorts(inputs=["results"])),
+        ],
+        edges=[
+            EdgeSpec(
+                id="e_in",
+                source=PortReference(node="items", port="items"),
+                target=PortReference(node="loop", port="items"),
+            ),
+            EdgeSpec(
+                id="e_out",
+                source=PortReference(node="loop", port="results"),
+                target=PortReference(node="out", port="results"),
+            ),
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_loop_max_concurrency_runs_iterations_in_parallel(sleepy_executor: Dict[str, int]) -> None:
+    items = [f"i{n}" for n in range(12)]
+    graph = _sleepy_loop_graph(items, maxConcurrency=4)
+    runner = GraphRunner(graph, RunSettings(), "loop-par", _noop_sender, RunManager())
+
+    started = time.perf_counter()
+    result = await runner.run()
+    elapsed = time.perf_counter() - started
+
+    assert sleepy_executor["peak"] == 4
+    assert elapsed < 0.4  # 3 rounds of 0.05s, not 12
+    assert result.final_outputs["out"]["results"] == [f"loop::iter{n}::work:i{n}" for n in range(12)]
+    iterations = runner.run_state.node_results["loop"].metadata["iterations"]
+    assert [entry["nodes"][0] for entry in iterations] == [f"loop::iter{n}::loop_in" for n in range(12)]
+
+
+@pytest.mark.asyncio
+async def test_loop_iterations_share_the_run_concurrency_limit(sleepy_executor: Dict[str, int]) -> None:
+    graph = _sleepy_loop_graph([f"i{n}" for n in range(6)], maxConcurrency=6)
+    runner = GraphRunner(graph, RunSettings(max_concurrency=2), "loop-shared-slots", _noop_sender, RunManager())
+    result = await runner.run()
+
+    assert sleepy_executor["peak"] == 2
+    assert len(result.final_outputs["out"]["results"]) == 6
+
+
+@pytest.mark.asyncio
+async def test_loop_defaults_to_serial_iterations(sleepy_executor: Dict[str, int]) -> None:
+    graph = _sleepy_loop_graph(["a", "b", "c"])
+    runner = GraphRunner(graph, RunSettings(), "loop-serial", _noop_sender, RunManager())
+    await runner.run()
+
+    assert sleepy_executor["peak"] == 1
+
+
+@pytest.mark.asyncio
+async def test_loop_iterations_share_one_compiled_body(
+    sleepy_executor: Dict[str, int], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    compiled: List[graph_runner.CompiledGraph] = []
+
+    class CountingCompiledGraph(graph_runner.CompiledGraph):
+        def __init__(self, spec: GraphSpec) -> None:
+            super().__init__(spec)
+            compiled.append(self)
+
+    monkeypatch.setattr(graph_runner, "CompiledGraph", CountingCompiledGraph)
+    events: List[Dict[str, Any]] = []
+
+    async def sender(event: Dict[str, Any]) -> None:
+        events.append(event)
+
+    graph = _sleepy_loop_graph(["a", "b", "c"], maxConcurrency=3)
+    result = await GraphRunner(graph, RunSettings(), "loop-shared", sender, RunManager()).run()
+
+    assert len(compiled) == 2  # the outer graph and the loop body, not one per item
+    assert len(result.node_outputs["loop"]["results"]) == 3
+    starts = {event["nodeId"] for event in events if event["type"] == "node_start"}
+    assert {"loop::iter0::work", "loop::iter2::loop_in"} <= starts
+    edge = next(event for event in events if event.get("edgeId") == "loop::iter1::be")
+    assert edge["source"]["node"] == "loop::iter1::loop_in"
+    assert edge["target"]["node"] == "loop::iter1::work"
+    iterations = result.run_state.node_results["loop"].metadata["iterations"]
+    assert iterations[1]["nodes"] == ["loop::iter1::loop_in", "loop::iter1::work"]
+    assert graph.node_map()["loop"].config["bodyGraph"]["nodes"][0]["type"] == "loopInput"
+
+
+@pytest.mark.asyncio
+async def test_nested_loops_report_fully_qualified_ids() -> None:
+    inner_body = GraphSpec(
+        nodes=[
+            NodeSpec(id="x", type="loopInput", config={"binding": "items"}, ports=NodePorts(outputs=["value"])),
+            NodeSpec(
+                id="double",
+                type="python",
+                config={"code": "outputs['value'] = inputs['value'] * 2"},
+                ports=NodePorts(inputs=["value"], outputs=["value"]),
+            ),
+        ],
+        edges=[
+            EdgeSpec(
+                id="ie",
+                source=PortReference(node="x", port="value"),
+                target=PortReference(node="double", port="value"),
+            )
+        ],
+    )
+    outer_body = GraphSpec(
+        nodes=[
+            NodeSpec(id="row", type="loopInput", config={"binding": "items"}, ports=NodePorts(outputs=["items"])),
+            NodeSpec(
+                id="inner",
+                type="loop",
+                config={
+                    "bodyGraph": inner_body.model_dump(),
+                    "loopOutputs": [{"node": "double", "port": "value", "target": "doubled"}],
+                },
+                ports=NodePorts(inputs=["items"], outputs=["doubled"]),
+            ),
+        ],
+        edges=[
+            EdgeSpec(
+                id="oe",
+                source=PortReference(node="row", port="items"),
+                target=PortReference(node="inner", port="items"),
+            )
+        ],
+    )
+    graph = GraphSpec(
+        nodes=[
+            NodeSpec(id="rows", type="input", config={"value": [[1, 2], [3]]}, ports=NodePorts(outputs=["items"])),
+            NodeSpec(
+                id="outer",
+                type="loop",
+                config={
+                    "bodyGraph": outer_body.model_dump(),
+                    "loopOutputs": [{"node": "inner", "port": "doubled", "target": "results"}],
+                },
+                ports=NodePorts(inputs=["items"], outputs=["results"]),
+            ),
+        ],
+        edges=[
+            EdgeSpec(
+                id="e",
+                source=PortReference(node="rows", port="items"),
+                target=PortReference(node="outer", port="items"),
+            )
+        ],
+    )
+    events: List[Dict[str, Any]] = []
+
+    async def sender(event: Dict[str, Any]) -> None:
+        events.append(event)
+
+    result = await GraphRunner(graph, RunSettings(), "nested", sender, RunManager()).run()
+
+    assert result.node_outputs["outer"]["results"] == [[2, 4], [6]]
+    inner_end = next(
+        event
+        for event in events
+        if event["type"] == "node_end" and event["nodeId"] == "outer::iter1::inner::iter0::double"
+    )
+    assert inner_end["parentNodeId"] == "outer::iter1::inner"
+    assert inner_end["outputs"] == {"value": 6}
\ No newline at end of file
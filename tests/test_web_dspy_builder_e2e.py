@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
 import pytest
@@ -17,15 +18,19 @@ from web_dspy_builder.models import (
     PortReference,
     RunSettings,
 )
+from web_dspy_builder.node_cache import PersistentNodeCache
 from web_dspy_builder.run_manager import RunManager
 
 
 @pytest.fixture()
-def builder_client(monkeypatch: pytest.MonkeyPatch) -> Tuple[TestClient, RunManager]:
-    """Provide a FastAPI test client with an isolated run manager."""
+def builder_client(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Tuple[TestClient, RunManager]:
+    """Provide a FastAPI test client with an isolated run manager and node cache."""
 
     manager = RunManager()
     monkeypatch.setattr(server, "run_manager", manager)
+    monkeypatch.setattr(server, "node_cache", PersistentNodeCache(tmp_path / "nodes.sqlite"))
     app = server.create_app()
     with TestClient(app) as client:
         yield client, manager
@@ -76,11 +81,12 @@ def _drain_events(websocket) -> List[Dict[str, Any]]:
 
     events: List[Dict[str, Any]] = []
     while True:
-        event = websocket.receive_json()
-        events.append(event)
-        if event["type"] in {"run_complete", "run_error"}:
-            break
-    return events
+        frame = websocket.receive_json()
+        assert isinstance(frame, list), "events are delivered in array frames"
+        for event in frame:
+            events.append(event)
+            if event["type"] in {"run_complete", "run_error"}:
+                return events
 
 
 def test_builder_serves_frontend_assets(builder_client: Tuple[TestClient, RunManager]) -> None:
@@ -146,6 +152,12 @@ def test_websocket_linear_run_records_events(
     assert detail_payload["runId"] == run_id
     assert len(detail_payload["timeline"]) == len(events)
 
+    profile = client.get(f"/api/runs/{run_id}/profile").json()
+    assert profile["runId"] == run_id
+    assert profile["criticalPath"] == ["input", "transform", "out"]
+    assert {node["nodeId"] for node in profile["nodes"]} == {"input", "transform", "out"}
+    assert client.get("/api/runs/missing/profile").status_code == 404
+
 
 def test_websocket_replay_reuses_cache_and_applies_overrides(
     builder_client: Tuple[TestClient, RunManager]
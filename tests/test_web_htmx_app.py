@@ -156,6 +156,16 @@ def test_index_renders_artifact_memory_and_history(client: TestClient) -> None:
     assert "Study session" in text
 
 
+def test_external_scripts_are_pinned_with_sri(client: TestClient) -> None:
+    import re
+
+    tags = re.findall(r"<script src=\"https?://[^>]*>", client.get("/").text)
+    assert len(tags) == 2
+    for tag in tags:
+        assert 'integrity="sha384-' in tag
+        assert 'crossorigin="anonymous"' in tag
+
+
 def test_post_message_appends_with_timestamp(client: TestClient, temp_paths: dict[str, Path], monkeypatch: pytest.MonkeyPatch) -> None:
     class FixedDatetime(datetime):
         @classmethod
@@ -192,6 +202,26 @@ def test_history_limit_applied(temp_paths: dict[str, Path]) -> None:
         client.close()
 
 
+def test_history_partial_date_range(temp_paths: dict[str, Path]) -> None:
+    constraints = temp_paths["constraints"]
+    for day in (5, 6, 7):
+        utils.write_constraints_entry(
+            constraints,
+            f"entry on {day}",
+            now=datetime(2025, 10, day, 12, 0, 0),
+        )
+
+    client = make_client(temp_paths)
+    try:
+        response = client.get("/partials/history", params={"start": "2025-10-06", "end": "2025-10-06"})
+        assert response.status_code == 200
+        assert "entry on 6" in response.text
+        assert "entry on 5" not in response.text
+        assert "entry on 7" not in response.text
+    finally:
+        client.close()
+
+
 def test_artifact_partial_contains_latest_snapshot(client: TestClient) -> None:
     response = client.get("/partials/artifact")
     assert response.status_code == 200
@@ -200,6 +230,28 @@ def test_artifact_partial_contains_latest_snapshot(client: TestClient) -> None:
     assert "Updated" in text
 
 
+def test_partials_answer_304_when_unchanged(client: TestClient, temp_paths: dict[str, Path]) -> None:
+    first = client.get("/partials/artifact")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    again = client.get("/partials/artifact", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    temp_paths["artifact"].write_text("Artifact rewritten", encoding="utf-8")
+    changed = client.get("/partials/artifact", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert "Artifact rewritten" in changed.text
+    assert changed.headers["etag"] != etag
+
+
+def test_history_etag_varies_with_date_range(client: TestClient) -> None:
+    full = client.get("/partials/history").headers["etag"]
+    ranged = client.get("/partials/history", params={"start": "2025-10-04"}).headers["etag"]
+    assert full != ranged
+
+
 def test_schedule_partial_renders_table(client: TestClient) -> None:
     response = client.get("/partials/schedule")
     assert response.status_code == 200
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+from webapp.nlco_htmx import history_index, utils
+
+
+def _reference_history(path: Path, limit: int) -> list[tuple[str, list[str]]]:
+    """Full-file parse used before the index existed."""
+    history: list[tuple[str, list[str]]] = []
+    current_date = None
+    current: list[str] = []
+    for line in [ln for ln in path.read_text(encoding="utf-8").splitlines() if ln.strip()]:
+        match = utils.DATE_HEADING_RE.match(line)
+        if match:
+            if current_date is not None and current:
+                history.append((current_date, current))
+            current_date, current = match.group(1), []
+        else:
+            current.append(line)
+    if current_date is not None and current:
+        history.append((current_date, current))
+    trimmed, remaining = [], limit
+    for date_str, entries in reversed(history):
+        if remaining <= 0:
+            break
+        take = entries[-remaining:]
+        trimmed.append((date_str, take))
+        remaining -= len(take)
+    return list(reversed(trimmed))
+
+
+def _write_days(path: Path, days: int, per_day: int) -> None:
+    for day in range(1, days + 1):
+        for i in range(per_day):
+            utils.write_constraints_entry(path, f"d{day} e{i}", now=datetime(2025, 10, day, 8, i, 0))
+
+
+def test_limit_matches_full_parse_and_reads_only_tail(tmp_path: Path, monkeypatch) -> None:
+    c = tmp_path / "constraints.md"
+    _write_days(c, days=20, per_day=5)
+
+    for limit in (1, 3, 5, 7, 12, 200):
+        assert utils.load_constraints_history(c, limit) == _reference_history(c, limit)
+
+    reads: list[int] = []
+    original = history_index.read_region
+    monkeypatch.setattr(
+        history_index, "read_region", lambda p, start, end=None: reads.append(start) or original(p, start, end)
+    )
+    utils.load_constraints_history(c, 7)
+    assert reads and reads[-1] > c.stat().st_size // 2
+
+
+def test_index_updates_incrementally_and_persists(tmp_path: Path, monkeypatch) -> None:
+    c = tmp_path / "constraints.md"
+    _write_days(c, days=3, per_day=2)
+    index = history_index.refresh_index(c)
+    assert [s.date for s in index.sections] == ["2025-10-01", "2025-10-02", "2025-10-03"]
+    assert history_index.sidecar_path(c).exists()
+
+    scanned: list[int] = []
+    original = history_index._scan
+    monkeypatch.setattr(
+        history_index, "_scan", lambda fh, idx, start, end: scanned.append(start) or original(fh, idx, start, end)
+    )
+    before = c.stat().st_size
+    utils.write_constraints_entry(c, "late", now=datetime(2025, 10, 4, 9, 0, 0))
+    history_index._CACHE.clear()  # force reload from the sidecar
+    index = history_index.refresh_index(c)
+    assert scanned == [before]
+    assert index.sections[-1].date == "2025-10-04" and index.sections[-1].count == 1
+
+    # A rewrite invalidates the index
+    c.write_text("# 2025-12-01\nonly\n", encoding="utf-8")
+    assert utils.load_constraints_history(c, 10) == [("2025-12-01", ["only"])]
+
+
+def test_same_size_rewrite_is_reindexed(tmp_path: Path) -> None:
+    import os
+
+    c = tmp_path / "constraints.md"
+    c.write_text("# 2025-10-01\nalpha\n", encoding="utf-8")
+    st = c.stat()
+    assert history_index.refresh_index(c).sections[0].date == "2025-10-01"
+
+    c.write_text("# 2025-10-02\nab\ncd\n", encoding="utf-8")
+    os.utime(c, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert c.stat().st_size == st.st_size
+    index = history_index.refresh_index(c)
+    assert [(s.date, s.count) for s in index.sections] == [("2025-10-02", 2)]
+
+
+def test_date_range_query(tmp_path: Path) -> None:
+    c = tmp_path / "constraints.md"
+    _write_days(c, days=5, per_day=2)
+
+    result = utils.load_constraints_history(c, 200, start="2025-10-02", end="2025-10-03")
+    assert [d for d, _ in result] == ["2025-10-02", "2025-10-03"]
+    assert result[0][1] == ["08:00:00 d2 e0", "08:01:00 d2 e1"]
+    assert utils.load_constraints_history(c, 200, start="2026-01-01") == []
+    assert utils.load_constraints_history(tmp_path / "missing.md", 10) == []
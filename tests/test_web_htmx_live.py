@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from file_watch import FileWatcher
+from webapp.nlco_htmx.live import PartialSource, format_sse, partial_digest, partial_events
+
+
+def test_partial_digest_ignores_age_labels() -> None:
+    a = partial_digest({"artifact_text": "x", "artifact_age": "1s ago", "artifact_ts": 1.0})
+    b = partial_digest({"artifact_text": "x", "artifact_age": "9m 2s ago", "artifact_ts": 1.0})
+    c = partial_digest({"artifact_text": "y", "artifact_age": "1s ago", "artifact_ts": 1.0})
+    assert a == b
+    assert a != c
+
+
+def test_format_sse_prefixes_every_line() -> None:
+    assert format_sse("artifact", "<p>\na</p>") == "event: artifact\ndata: <p>\ndata: a</p>\n\n"
+
+
+@pytest.mark.asyncio
+async def test_partial_events_pushes_only_changed_partials(tmp_path: Path) -> None:
+    artifact = tmp_path / "artifact.md"
+    memory = tmp_path / "memory.md"
+    artifact.write_text("one", encoding="utf-8")
+    memory.write_text("mem", encoding="utf-8")
+
+    def reader(path: Path):
+        async def build():
+            return {"text": path.read_text(encoding="utf-8")}
+
+        return build
+
+    partials = {
+        "artifact": PartialSource("artifact.html", reader(artifact), [artifact]),
+        "memory": PartialSource("memory.html", reader(memory), [memory]),
+    }
+    disconnected = False
+
+    async def is_disconnected() -> bool:
+        return disconnected
+
+    stream = partial_events(
+        partials,
+        render=lambda template, ctx: f"{template}:{ctx['text']}",
+        is_disconnected=is_disconnected,
+        keepalive=0.05,
+        watcher=FileWatcher(debounce=0.01, poll_interval=0.02),
+    )
+    assert await stream.__anext__() == ": connected\n\n"
+    assert await asyncio.wait_for(stream.__anext__(), 2) == ": ping\n\n"
+
+    artifact.write_text("two", encoding="utf-8")
+    frame = await asyncio.wait_for(stream.__anext__(), 2)
+    while frame.startswith(":"):
+        frame = await asyncio.wait_for(stream.__anext__(), 2)
+    assert frame == "event: artifact\ndata: artifact.html:two\n\n"
+
+    # Touching a file without changing its content pushes nothing.
+    memory.write_text("mem", encoding="utf-8")
+    assert await asyncio.wait_for(stream.__anext__(), 2) == ": ping\n\n"
+
+    disconnected = True
+    with pytest.raises(StopAsyncIteration):
+        while True:
+            await asyncio.wait_for(stream.__anext__(), 2)
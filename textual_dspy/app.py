@@ -17,7 +17,7 @@ from web_dspy_builder.models import NodePorts, NodeSpec
 
 from .controller import DSpyProgramController
 from .document import ProgramDocument, default_document
-from .widgets import FlowTable, NodeDetail, StatusBar
+from .widgets import FlowTable, NodeDetail, ProfileTable, StatusBar
 
 
 class NodeListItem(ListItem):
@@ -60,7 +60,7 @@ class DSpyProgramApp(App):
     #event-log {
         height: 1fr;
     }
-    #flow-table {
+    #flow-table, #profile-table {
         height: 1fr;
     }
     #run-history {
@@ -85,6 +85,8 @@ class DSpyProgramApp(App):
         ("ctrl+o", "load", "Load program"),
         ("ctrl+e", "replay", "Replay with overrides"),
         ("ctrl+k", "clear_overrides", "Clear overrides"),
+        # f6 rather than ctrl+p, which opens Textual's command palette.
+        ("f6", "profile", "Profile last run"),
     ]
 
     selected_node: reactive[Optional[str]] = reactive(None, init=False)
@@ -114,6 +116,8 @@ class DSpyProgramApp(App):
                     with Vertical(id="run-pane"):
                         yield Label("Information Flow", id="flow-title")
                         yield FlowTable()
+                        yield Label("Profile", id="profile-title")
+                        yield ProfileTable()
                         yield Label("Run History", id="run-history-title")
                         yield ListView(id="run-history")
                         yield Label("Event Log", id="log-title")
@@ -192,6 +196,21 @@ class DSpyProgramApp(App):
         resume_run = self.query_one("#resume-run", Input).value.strip() or None
         await self._execute_run(start_node=start_node, resume=resume_run)
 
+    async def action_profile(self) -> None:
+        resume_run = self.query_one("#resume-run", Input).value.strip() or None
+        profile = self.controller.profile(resume_run)
+        if profile is None:
+            self._status("No run to profile")
+            return
+        self.query_one(ProfileTable).show_profile(profile)
+        self._status(
+            f"Profile {profile.run_id}: wall {profile.wall_seconds:.3f}s, "
+            f"critical path {' → '.join(profile.critical_path) or '-'} "
+            f"({profile.critical_path_seconds:.3f}s), parallelism "
+            f"{profile.parallelism_achieved:.2f}/{profile.parallelism_available:.2f}, "
+            f"cache saved {profile.cache_saved_seconds:.3f}s"
+        )
+
     async def action_save(self) -> None:
         try:
             path = self._resolve_file_path()
@@ -305,6 +324,9 @@ class DSpyProgramApp(App):
             self._status(f"Run failed: {exc}")
         else:
             self._status("Run finished")
+            profile = self.controller.profile()
+            if profile is not None:
+                self.query_one(ProfileTable).show_profile(profile)
 
     def _status(self, message: str) -> None:
         self.query_one(StatusBar).update_message(message)
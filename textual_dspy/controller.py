@@ -11,6 +11,7 @@ from pathlib import Path
 
 from web_dspy_builder.graph_runner import GraphRunner
 from web_dspy_builder.models import EdgeSpec, NodePorts, NodeSpec, PortReference, RunSettings
+from web_dspy_builder.profiler import RunProfile, profile_run
 from web_dspy_builder.run_manager import RunManager
 
 from .document import ProgramDocument, default_document
@@ -187,6 +188,16 @@ class DSpyProgramController:
     def available_runs(self) -> List[str]:
         return list(self.run_history)
 
+    def profile(self, run_id: Optional[str] = None) -> Optional[RunProfile]:
+        """Profile ``run_id`` (default: the most recent run)."""
+
+        if run_id is None:
+            if not self.run_history:
+                return None
+            run_id = self.run_history[0]
+        state = self.manager.get(run_id)
+        return profile_run(state) if state else None
+
     def create_edge(self, edge_id: str, source_node: str, source_port: str, target_node: str, target_port: str) -> EdgeSpec:
         """Convenience helper used by the UI to add connections."""
 
@@ -11,6 +11,7 @@ from textual.reactive import reactive
 from textual.widgets import Button, DataTable, Input, Label, Static, TextArea
 
 from web_dspy_builder.models import EdgeSpec, NodeSpec
+from web_dspy_builder.profiler import RunProfile
 
 
 class NodeDetail(Container):
@@ -191,6 +192,38 @@ class FlowTable(DataTable):
             self.update_cell(row, 5, cached_marker)
 
 
+class ProfileTable(DataTable):
+    """Per-node timings of the most recent run, critical path marked."""
+
+    DEFAULT_CSS = """
+    ProfileTable {
+        height: 1fr;
+    }
+    """
+
+    def __init__(self) -> None:
+        super().__init__(id="profile-table", zebra_stripes=True)
+
+    def on_mount(self) -> None:
+        self.add_columns("Node", "Type", "Self (s)", "Queue (s)", "Tokens", "Cache", "Critical")
+
+    def clear_rows(self) -> None:
+        self.clear(columns=False)
+
+    def show_profile(self, profile: RunProfile) -> None:
+        self.clear_rows()
+        for node in profile.nodes:
+            self.add_row(
+                node.node_id,
+                node.node_type,
+                f"{node.self_seconds:.3f}",
+                f"{node.queue_seconds:.3f}",
+                str(node.prompt_tokens + node.completion_tokens),
+                node.cache or "-",
+                "*" if node.critical else "",
+            )
+
+
 class StatusBar(Static):
     """Simple status indicator widget."""
 
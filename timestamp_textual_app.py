@@ -20,6 +20,7 @@ from textual.widgets import Footer, Header, Input, Static, Markdown
 from timestamp_vim_input import VimInput
 from constraints_io import tail_lines as constraints_tail_lines
 from file_lock import locked_file
+from file_watch import FileWatcher
 from timestamp_app_core import (
     _ensure_utf8_tty,
     _maybe_enable_lenient_input,
@@ -64,9 +65,8 @@ class TimestampLogApp(_CoreTimestampLogApp):
         self._artifact_refresh_seconds = max(artifact_refresh_seconds, 0.1)
         self._constraints_refresh_seconds = max(constraints_refresh_seconds, 0.1)
         self._artifact_mtime: Optional[float] = None
-        self._artifact_timer = None
         self._constraints_mtime: Optional[float] = None
-        self._constraints_timer = None
+        self._file_watcher: Optional[FileWatcher] = None
         self._last_constraints_date: Optional[date] = None
         self._artifact_status_message = "Artifact status: initializing…"
         self._pending_g = False  # for 'gi' shortcut
@@ -81,14 +81,13 @@ class TimestampLogApp(_CoreTimestampLogApp):
         self.set_focus(self._input)
         self._last_entry_date: date | None = None
         self._prepare_constraints()
-        self._artifact_timer = self.set_interval(
-            self._artifact_refresh_seconds,
-            self._maybe_refresh_artifact,
-        )
-        self._constraints_timer = self.set_interval(
-            self._constraints_refresh_seconds,
-            self._maybe_refresh_constraints,
+        # File changes arrive via inotify; the refresh seconds only apply to the polling fallback
+        self._file_watcher = FileWatcher(
+            poll_interval=min(self._artifact_refresh_seconds, self._constraints_refresh_seconds),
         )
+        self._file_watcher.add(self._artifact_path, lambda _p: self._maybe_refresh_artifact())
+        self._file_watcher.add(self._constraints_path, lambda _p: self._maybe_refresh_constraints())
+        self._file_watcher.start()
         self._artifact_status_timer = self.set_interval(
             1.0,
             self._update_artifact_status,
@@ -96,6 +95,11 @@ class TimestampLogApp(_CoreTimestampLogApp):
         self._help_visible = True
         self._help_message = self._help_text()
 
+    def on_unmount(self) -> None:
+        if self._file_watcher is not None:
+            self._file_watcher.stop()
+            self._file_watcher = None
+
     def _current_time(self) -> datetime:
         return datetime.now()
 
@@ -1,18 +1,30 @@
-"""Entry-point for launching the DSPy visual builder server."""
+"""Entry-point for launching the DSPy visual builder server.
+
+``python -m web_dspy_builder batch ...`` runs a graph over a dataset instead
+(see :mod:`web_dspy_builder.batch`).
+"""
 
 from __future__ import annotations
 
 import argparse
 import os
-
-import uvicorn
+import sys
+from typing import List, Optional
 
 
 DEFAULT_HOST = os.getenv("DSPY_BUILDER_HOST", "127.0.0.1")
 DEFAULT_PORT = int(os.getenv("DSPY_BUILDER_PORT", "8800"))
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "batch":
+        from .batch import main as batch_main
+
+        raise SystemExit(batch_main(argv[1:]))
+
+    import uvicorn
+
     parser = argparse.ArgumentParser(description="Run the DSPy Visual Builder server")
     parser.add_argument("--host", default=DEFAULT_HOST, help="interface to bind (default: %(default)s)")
     parser.add_argument(
@@ -26,7 +38,7 @@ def main() -> None:
         action="store_true",
         help="enable auto-reload (development use only)",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     uvicorn.run(
         "web_dspy_builder.server:app",
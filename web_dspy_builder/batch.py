@@ -0,0 +1,270 @@
+"""Headless batch execution of a graph over a JSONL dataset.
+
+``python -m web_dspy_builder batch graph.json inputs.jsonl -o outputs.jsonl``
+runs the graph once per input row, several rows at a time, and appends one
+JSON line per finished row to the output file. The output file doubles as
+the checkpoint: rerunning the same command skips every row already written
+successfully, so an interrupted batch picks up where it stopped and rows that
+failed are tried again. Rows share one LLM engine
+and the persistent node cache, so work common to many rows is done once.
+
+Each input row is a JSON object. A key naming an input node (or the node's
+first output port) overrides that node's value; ``id`` is copied to the
+output to identify the row.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from .graph_runner import GraphRunner
+from .llm import LLMEngine
+from .models import GraphSpec, RunSettings
+from .node_cache import PersistentNodeCache
+
+
+@dataclass
+class BatchStats:
+    """Counters reported at the end of a batch."""
+
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        done = self.succeeded + self.failed
+        return done / self.seconds if self.seconds > 0 else 0.0
+
+
+def load_program(path: Path) -> Tuple[GraphSpec, RunSettings]:
+    """Read a bare ``GraphSpec`` or a saved Textual program document."""
+
+    payload = json.loads(Path(path).read_text())
+    if "graph" in payload:
+        return (
+            GraphSpec.model_validate(payload["graph"]),
+            RunSettings.model_validate(payload.get("settings", {})),
+        )
+    return GraphSpec.model_validate(payload), RunSettings()
+
+
+def row_overrides(graph: GraphSpec, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a dataset row onto ``{"<input node>": {"value": ...}}`` overrides."""
+
+    overrides: Dict[str, Any] = {}
+    for node in graph.nodes:
+        if node.type != "input":
+            continue
+        if node.id in row:
+            overrides[node.id] = {"value": row[node.id]}
+        elif node.ports.outputs and node.ports.outputs[0] in row:
+            overrides[node.id] = {"value": row[node.ports.outputs[0]]}
+    return overrides
+
+
+def completed_rows(output: Path) -> Set[int]:
+    """Row numbers already written successfully to ``output``.
+
+    Unreadable lines (a torn final line, or a corrupt one anywhere) and lines
+    recording an ``error`` are removed, so the resumed run retries those rows
+    instead of skipping them.
+    """
+
+    done: Set[int] = set()
+    if not output.exists():
+        return done
+    kept: List[bytes] = []
+    rewrite = False
+    with output.open("rb") as fh:
+        for line in fh:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("torn line")
+                record = json.loads(line)
+                row = int(record["row"])
+            except (ValueError, KeyError, TypeError):
+                # Drop only this line (a torn tail or a corrupt record); the
+                # rows recorded after it are still valid.
+                rewrite = True
+                continue
+            if "error" in record:
+                rewrite = True
+                continue
+            done.add(row)
+            kept.append(line)
+    if rewrite:
+        tmp = output.with_name(output.name + ".tmp")
+        tmp.write_bytes(b"".join(kept))
+        os.replace(tmp, output)
+    return done
+
+
+def _read_rows(path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    with Path(path).open("r", encoding="utf-8") as fh:
+        index = 0
+        for line in fh:
+            if not line.strip():
+                continue
+            yield index, json.loads(line)
+            index += 1
+
+
+async def _noop_sender(event: Dict[str, Any]) -> None:
+    return None
+
+
+async def run_batch(
+    graph: GraphSpec,
+    settings: RunSettings,
+    inputs: Path,
+    output: Path,
+    *,
+    concurrency: int = 4,
+    node_cache: Optional[PersistentNodeCache] = None,
+    limit: Optional[int] = None,
+    progress: Optional[TextIO] = None,
+    progress_every: int = 100,
+) -> BatchStats:
+    """Run ``graph`` for every row of ``inputs`` not yet present in ``output``."""
+
+    stats = BatchStats()
+    skip = completed_rows(output)
+    llm = LLMEngine(settings.llm)
+    queue: "asyncio.Queue[Optional[Tuple[int, Dict[str, Any]]]]" = asyncio.Queue(
+        maxsize=max(1, concurrency) * 2
+    )
+    started = time.perf_counter()
+    workers_count = max(1, concurrency)
+
+    with output.open("a", encoding="utf-8") as sink:
+
+        def write(record: Dict[str, Any]) -> None:
+            sink.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            sink.flush()
+            done = stats.succeeded + stats.failed
+            if progress is not None and done % max(1, progress_every) == 0:
+                stats.seconds = time.perf_counter() - started
+                progress.write(
+                    f"{done} rows ({stats.failed} failed, {stats.rows_per_second:.1f} rows/s)\n"
+                )
+
+        async def worker() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, row = item
+                record: Dict[str, Any] = {"row": index}
+                if "id" in row:
+                    record["id"] = row["id"]
+                runner = GraphRunner(
+                    graph,
+                    settings,
+                    f"batch-{index}",
+                    _noop_sender,
+                    None,
+                    node_cache=node_cache,
+                    llm=llm,
+                )
+                try:
+                    result = await runner.run(overrides=row_overrides(graph, row))
+                except Exception as exc:
+                    record["error"] = f"{type(exc).__name__}: {exc}"
+                    stats.failed += 1
+                    if len(stats.errors) < 20:
+                        stats.errors.append(f"row {index}: {record['error']}")
+                else:
+                    record["outputs"] = result.final_outputs
+                    stats.succeeded += 1
+                write(record)
+
+        workers = [asyncio.create_task(worker()) for _ in range(workers_count)]
+        try:
+            for index, row in _read_rows(inputs):
+                if limit is not None and stats.total >= limit:
+                    break
+                stats.total += 1
+                if index in skip:
+                    stats.skipped += 1
+                    continue
+                await queue.put((index, row))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m web_dspy_builder batch",
+        description="Run a graph over every row of a JSONL dataset",
+    )
+    parser.add_argument("graph", type=Path, help="graph JSON or saved program document")
+    parser.add_argument("inputs", type=Path, help="JSONL file with one input row per line")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="JSONL results, also used to resume (default: <inputs>.out.jsonl)",
+    )
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=4, help="rows in flight (default: %(default)s)"
+    )
+    parser.add_argument("--limit", type=int, help="only consider the first N rows")
+    parser.add_argument(
+        "--no-node-cache",
+        action="store_true",
+        help="do not read or write the persistent node cache",
+    )
+    parser.add_argument(
+        "--progress-every", type=int, default=100, help="report every N rows (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+
+    graph, settings = load_program(args.graph)
+    output = args.output or args.inputs.with_suffix(".out.jsonl")
+    node_cache = None if args.no_node_cache else PersistentNodeCache.from_env()
+    try:
+        stats = asyncio.run(
+            run_batch(
+                graph,
+                settings,
+                args.inputs,
+                output,
+                concurrency=args.concurrency,
+                node_cache=node_cache,
+                limit=args.limit,
+                progress=sys.stderr,
+                progress_every=args.progress_every,
+            )
+        )
+    finally:
+        if node_cache is not None:
+            node_cache.close()
+    sys.stderr.write(
+        f"{stats.succeeded} succeeded, {stats.failed} failed, {stats.skipped} already done"
+        f" in {stats.seconds:.1f}s ({stats.rows_per_second:.1f} rows/s) -> {output}\n"
+    )
+    for error in stats.errors:
+        sys.stderr.write(f"  {error}\n")
+    return 1 if stats.failed else 0
+
+
+__all__ = ["BatchStats", "completed_rows", "load_program", "main", "row_overrides", "run_batch"]
@@ -0,0 +1,86 @@
+"""Pre-indexed, read-only form of a :class:`GraphSpec` for repeated execution.
+
+A loop runs its body graph once per item. Building a namespaced copy of the
+body for every iteration (and re-indexing it in every sub-runner) costs
+O(graph) pydantic work per item. A :class:`CompiledGraph` is built once and
+shared by all iterations: node IDs are interned, edges are grouped into
+per-node tuples, and node signatures are computed at most once. Iterations
+keep the body's own IDs and only render the ``<loop>::iter<n>::`` prefix on
+the IDs they report (see :func:`prefixed`).
+"""
+
+from __future__ import annotations
+
+import sys
+from graphlib import TopologicalSorter
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .models import EdgeSpec, GraphSpec, NodeSpec
+
+
+class CompiledGraph:
+    """Adjacency tuples and lookup tables for one graph; never mutated."""
+
+    __slots__ = ("spec", "node_ids", "position", "nodes", "incoming", "outgoing", "_signatures", "_order")
+
+    def __init__(self, spec: GraphSpec) -> None:
+        self.spec = spec
+        self.node_ids: Tuple[str, ...] = tuple(sys.intern(node.id) for node in spec.nodes)
+        self.position: Dict[str, int] = {node_id: index for index, node_id in enumerate(self.node_ids)}
+        self.nodes: Dict[str, NodeSpec] = dict(zip(self.node_ids, spec.nodes))
+        incoming: Dict[str, list[EdgeSpec]] = {}
+        outgoing: Dict[str, list[EdgeSpec]] = {}
+        for edge in spec.edges:
+            outgoing.setdefault(sys.intern(edge.source.node), []).append(edge)
+            incoming.setdefault(sys.intern(edge.target.node), []).append(edge)
+        self.incoming: Dict[str, Tuple[EdgeSpec, ...]] = {k: tuple(v) for k, v in incoming.items()}
+        self.outgoing: Dict[str, Tuple[EdgeSpec, ...]] = {k: tuple(v) for k, v in outgoing.items()}
+        self._signatures: Dict[str, str] = {}
+        self._order: Optional[Tuple[str, ...]] = None
+
+    def edges_into(self, node_id: str) -> Tuple[EdgeSpec, ...]:
+        return self.incoming.get(node_id, ())
+
+    def edges_from(self, node_id: str) -> Tuple[EdgeSpec, ...]:
+        return self.outgoing.get(node_id, ())
+
+    def signature(self, node_id: str) -> str:
+        """Memoised :meth:`NodeSpec.signature` (nodes are not mutated while running)."""
+
+        signature = self._signatures.get(node_id)
+        if signature is None:
+            signature = self._signatures[node_id] = self.nodes[node_id].signature()
+        return signature
+
+    def sorter(self) -> TopologicalSorter:
+        sorter: TopologicalSorter = TopologicalSorter()
+        for node_id in self.node_ids:
+            sorter.add(node_id, *(edge.source.node for edge in self.edges_into(node_id)))
+        return sorter
+
+    def topological_order(self) -> Tuple[str, ...]:
+        """Node IDs, each after all of its predecessors; the same on every call."""
+
+        if self._order is None:
+            self._order = tuple(self.sorter().static_order())
+        return self._order
+
+
+def prefixed(event: Mapping[str, Any], prefix: str) -> Dict[str, Any]:
+    """Copy of a runner event with its node and edge IDs namespaced by ``prefix``."""
+
+    payload = dict(event)
+    if not prefix:
+        return payload
+    if "nodeId" in payload:
+        payload["nodeId"] = f"{prefix}{payload['nodeId']}"
+    if "edgeId" in payload:
+        payload["edgeId"] = f"{prefix}{payload['edgeId']}"
+    for end in ("source", "target"):
+        ref = payload.get(end)
+        if isinstance(ref, dict) and "node" in ref:
+            payload[end] = {**ref, "node": f"{prefix}{ref['node']}"}
+    return payload
+
+
+__all__ = ["CompiledGraph", "prefixed"]
@@ -0,0 +1,186 @@
+"""Decoupled, batched delivery of run events to a slow consumer.
+
+``GraphRunner`` awaits its sender for every event. Writing straight to a
+WebSocket therefore ties the runner's pace to the client's and sends one tiny
+frame per event. :class:`EventStream` sits in between: ``publish`` only
+enqueues, and a background task sends whatever has accumulated within a short
+window as a single JSON array frame.
+
+The queue is bounded. When it is full, ``node_log`` events are merged into a
+pending log event for the same node and ``edge_data`` events are dropped (a
+``events_dropped`` summary is sent in their place, always ahead of the run's
+terminal event); every other event waits for room, which is the backpressure
+that slows the runner down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+BatchSender = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+COALESCABLE = frozenset({"node_log"})
+DROPPABLE = frozenset({"edge_data"})
+TERMINAL = frozenset({"run_complete", "run_error"})
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class EventStream:
+    """Bounded event queue drained by a batching sender task."""
+
+    def __init__(
+        self,
+        send: BatchSender,
+        *,
+        max_queue: int = 2000,
+        window: float = 0.03,
+        max_batch: int = 256,
+    ) -> None:
+        self._send = send
+        self.max_queue = max(1, max_queue)
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: List[Dict[str, Any]] = []
+        self._log_slots: Dict[Tuple[Any, Any], int] = {}  # -> index in _pending
+        self._dropped: Dict[Any, int] = {}
+        self._has_data = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._closing = False
+        self._task: Optional[asyncio.Task[None]] = None
+        self._error: Optional[BaseException] = None
+        self.stats = {"events": 0, "frames": 0, "coalesced": 0, "dropped": 0}
+
+    @classmethod
+    def from_env(cls, send: BatchSender) -> "EventStream":
+        """Configure from ``DSPY_BUILDER_WS_QUEUE``/``_WINDOW_MS``/``_BATCH``."""
+
+        return cls(
+            send,
+            max_queue=int(_env_float("DSPY_BUILDER_WS_QUEUE", 2000)),
+            window=_env_float("DSPY_BUILDER_WS_WINDOW_MS", 30) / 1000.0,
+            max_batch=int(_env_float("DSPY_BUILDER_WS_BATCH", 256)),
+        )
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._pump())
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Queue ``event``; usable directly as a ``GraphRunner`` sender."""
+
+        if self._error is not None:
+            raise self._error
+        self.start()
+        kind = event.get("type")
+        if kind in COALESCABLE and self._coalesce(event):
+            return
+        while len(self._pending) >= self.max_queue:
+            if kind in DROPPABLE:
+                run_id = event.get("runId")
+                self._dropped[run_id] = self._dropped.get(run_id, 0) + 1
+                self.stats["dropped"] += 1
+                return
+            self._space.clear()
+            await self._space.wait()
+            if self._error is not None:
+                raise self._error
+        if kind in TERMINAL:
+            # Clients treat the terminal event as the end of the run.
+            self._pending.extend(self._drop_notices())
+        self._pending.append(event)
+        self._drained.clear()
+        if kind in COALESCABLE:
+            self._log_slots[(event.get("runId"), event.get("nodeId"))] = len(self._pending) - 1
+        self._has_data.set()
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+
+    def _coalesce(self, event: Dict[str, Any]) -> bool:
+        index = self._log_slots.get((event.get("runId"), event.get("nodeId")))
+        if index is None:
+            return False
+        # Replace rather than mutate: the queued dict may also be recorded
+        # elsewhere (e.g. in the run's timeline).
+        slot = self._pending[index]
+        self._pending[index] = {**slot, "log": f"{slot.get('log', '')}\n{event.get('log', '')}"}
+        self.stats["coalesced"] += 1
+        return True
+
+    def _drop_notices(self) -> List[Dict[str, Any]]:
+        notices = [
+            {"type": "events_dropped", "runId": run_id, "count": count}
+            for run_id, count in self._dropped.items()
+        ]
+        self._dropped.clear()
+        return notices
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = self._pending[: self.max_batch]
+        del self._pending[: self.max_batch]
+        self._log_slots.clear()
+        batch.extend(self._drop_notices())
+        if not self._pending:
+            self._has_data.clear()
+        if len(self._pending) < self.max_batch:
+            self._batch_full.clear()
+        self._space.set()
+        return batch
+
+    async def _pump(self) -> None:
+        try:
+            while True:
+                await self._has_data.wait()
+                if not self._closing and len(self._pending) < self.max_batch:
+                    try:
+                        await asyncio.wait_for(self._batch_full.wait(), self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                batch = self._take_batch()
+                self.stats["events"] += len(batch)
+                self.stats["frames"] += 1
+                await self._send(batch)
+                if not self._pending:
+                    self._drained.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # consumer went away
+            self._error = exc
+            self._space.set()
+            self._drained.set()
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far has been sent."""
+
+        await self._drained.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def close(self) -> None:
+        """Send what is queued, then stop the sender task."""
+
+        self._closing = True
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        if not self._drained.is_set():
+            self._has_data.set()
+            self._batch_full.set()
+            await self._drained.wait()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+__all__ = ["EventStream"]
@@ -141,6 +141,7 @@ function registerNodes() {
       loopOutputs: [
         { node: "loopOutput", port: "value", target: "results" },
       ],
+      maxConcurrency: 1,
       bodyGraph: null,
     };
     this.addInput("items", "array");
@@ -305,7 +306,9 @@ function connectSocket() {
 
   socket.onmessage = (event) => {
     const payload = JSON.parse(event.data);
-    handleEvent(payload);
+    const batch = Array.isArray(payload) ? payload : [payload];
+    batch.forEach((item) => handleEvent(item, false));
+    canvas.draw(true, true);
   };
 
   socket.onclose = () => {
@@ -357,7 +360,7 @@ function sendMessage(data) {
   }
 }
 
-function handleEvent(event) {
+function handleEvent(event, redraw = true) {
   switch (event.type) {
     case "run_started":
       state.currentRunId = event.runId;
@@ -400,10 +403,15 @@ function handleEvent(event) {
       setStatus(`Error: ${event.message}`);
       appendLog(`ERROR: ${event.message}`);
       break;
+    case "events_dropped":
+      appendLog(`${event.count} edge update(s) skipped while the connection caught up`);
+      break;
     default:
       break;
   }
-  canvas.draw(true, true);
+  if (redraw) {
+    canvas.draw(true, true);
+  }
 }
 
 function highlightNode(nodeId, mode) {
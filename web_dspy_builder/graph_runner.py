@@ -3,26 +3,29 @@
 from __future__ import annotations
 
 import asyncio
-from contextlib import redirect_stdout
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from graphlib import CycleError, TopologicalSorter
-from io import StringIO
-from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set
 
 from pydantic import BaseModel
 
-from .llm import LLMEngine
+from .compiled_graph import CompiledGraph, prefixed
+from .llm import LLMEngine, estimate_tokens
+from .node_cache import CachedResult, PersistentNodeCache, cache_key
 from .models import (
     EdgeSpec,
     EdgeTransmission,
     GraphSpec,
     NodeCache,
     NodeSpec,
+    PortReference,
     RunSettings,
     RunState,
 )
 from .run_manager import RunManager
+from .sandbox import SAFE_BUILTINS, SandboxError, SandboxPool, default_sandbox, execute
 
 
 EventSender = Callable[[Dict[str, Any]], Awaitable[None]]
@@ -45,6 +48,13 @@ class ExecutionError(RuntimeError):
 class BaseNodeExecutor:
     """Base class for all node executors."""
 
+    # Whether results may be served from the persistent node cache. Only
+    # executors whose outputs depend solely on spec, inputs and LLM settings.
+    cacheable = False
+    # Executors that run nested graphs do not hold a concurrency slot
+    # themselves; their sub-runners' nodes take slots from the same pool.
+    spawns_subgraphs = False
+
     def __init__(self, runner: "GraphRunner", spec: NodeSpec) -> None:
         self.runner = runner
         self.spec = spec
@@ -52,6 +62,12 @@ class BaseNodeExecutor:
     async def run(self, inputs: Dict[str, Any], overrides: Dict[str, Any]) -> NodeExecutionResult:
         raise NotImplementedError
 
+    @property
+    def qualified_id(self) -> str:
+        """Node ID including any enclosing loop iteration prefixes."""
+
+        return self.runner.qualified_id(self.spec.id)
+
     def output_ports(self) -> List[str]:
         if self.spec.ports.outputs:
             return self.spec.ports.outputs
@@ -69,7 +85,7 @@ class InputNodeExecutor(BaseNodeExecutor):
         else:
             outputs = {}
 
-        default_value = self.spec.config.get("value")
+        default_value = self._default_value()
         value = overrides.get("value", default_value)
         if value is None and "value" in overrides:
             value = overrides["value"]
@@ -87,60 +103,73 @@ class InputNodeExecutor(BaseNodeExecutor):
 
         return NodeExecutionResult(outputs=outputs)
 
+    def _default_value(self) -> Any:
+        return self.spec.config.get("value")
+
+
+class LoopInputNodeExecutor(InputNodeExecutor):
+    """Input node inside a loop body, bound to the current item or an outer input.
+
+    A configured ``value`` takes precedence; outside a loop it behaves like a
+    plain input node.
+    """
+
+    def _default_value(self) -> Any:
+        context = self.runner.loop_context
+        if "value" in self.spec.config or context is None:
+            return self.spec.config.get("value")
+        binding = self.spec.config.get("binding", "items")
+        if binding == "items":
+            return context["item"]
+        if binding.startswith("input:"):
+            return context["inputs"].get(binding.split(":", 1)[1])
+        return self.spec.config.get("default")
+
 
 class PythonNodeExecutor(BaseNodeExecutor):
     """Execute custom python code within a restricted environment."""
 
-    SAFE_BUILTINS = {
-        "len": len,
-        "min": min,
-        "max": max,
-        "sum": sum,
-        "sorted": sorted,
-        "range": range,
-        "enumerate": enumerate,
-        "str": str,
-        "int": int,
-        "float": float,
-        "bool": bool,
-        "list": list,
-        "dict": dict,
-        "set": set,
-        "tuple": tuple,
-        "zip": zip,
-        "any": any,
-        "all": all,
-    }
+    cacheable = True
+
+    SAFE_BUILTINS = SAFE_BUILTINS
 
     async def run(self, inputs: Dict[str, Any], overrides: Dict[str, Any]) -> NodeExecutionResult:
         code = overrides.get("code", self.spec.config.get("code", ""))
-        local_vars: Dict[str, Any] = {
-            "inputs": inputs,
-            "config": self.spec.config,
-            "outputs": {},
-        }
-        stdout = StringIO()
-        with redirect_stdout(stdout):
-            exec(  # noqa: S102 - execution is sandboxed via SAFE_BUILTINS
-                code,
-                {"__builtins__": self.SAFE_BUILTINS},
-                local_vars,
-            )
-        outputs: Dict[str, Any] = local_vars.get("outputs") or {}
-        metadata = {"stdout": stdout.getvalue()}
+        sandbox = self.runner.sandbox
+        if sandbox is None:
+            outputs, stdout = execute(code, inputs, self.spec.config)
+        else:
+            timeout = self.spec.config.get("timeout")
+            try:
+                outputs, stdout = await sandbox.run(
+                    code,
+                    inputs,
+                    self.spec.config,
+                    timeout=float(timeout) if timeout is not None else None,
+                )
+            except SandboxError as exc:
+                raise ExecutionError(f"Python node '{self.qualified_id}' failed: {exc}") from exc
+        metadata = {"stdout": stdout}
         return NodeExecutionResult(outputs=outputs, metadata=metadata)
 
 
 class LLMNodeExecutor(BaseNodeExecutor):
     """Invoke the configured language model using a simple templating approach."""
 
+    cacheable = True
+
     async def run(self, inputs: Dict[str, Any], overrides: Dict[str, Any]) -> NodeExecutionResult:
         prompt_template = overrides.get("prompt") or self.spec.config.get("prompt", "")
         stop = overrides.get("stop") or self.spec.config.get("stop")
         prompt = self._render_prompt(prompt_template, inputs)
-        response = await asyncio.to_thread(self.runner.llm.complete, prompt, stop=stop)
+        response = await self.runner.llm.acomplete(prompt, stop=stop)
         output_port = self.output_ports()[0]
-        return NodeExecutionResult(outputs={output_port: response})
+        usage = {
+            "promptTokens": estimate_tokens(prompt),
+            "completionTokens": estimate_tokens(response),
+            "estimated": True,
+        }
+        return NodeExecutionResult(outputs={output_port: response}, metadata={"usage": usage})
 
     def _render_prompt(self, template: str, inputs: Dict[str, Any]) -> str:
         rendered = template
@@ -160,7 +189,13 @@ class OutputNodeExecutor(BaseNodeExecutor):
 
 
 class LoopNodeExecutor(BaseNodeExecutor):
-    """Execute a nested graph for each item provided on the "items" input."""
+    """Execute a nested graph for each item provided on the "items" input.
+
+    Iterations run one at a time unless the loop's ``maxConcurrency`` config
+    (or override) allows more; results are always aggregated in item order.
+    """
+
+    spawns_subgraphs = True
 
     async def run(self, inputs: Dict[str, Any], overrides: Dict[str, Any]) -> NodeExecutionResult:
         items = self._resolve_items(inputs, overrides)
@@ -173,10 +208,25 @@ class LoopNodeExecutor(BaseNodeExecutor):
         aggregated = self._initialise_aggregated(loop_outputs_config)
         iteration_metadata: List[Dict[str, Any]] = []
 
-        for index, item in enumerate(items):
-            metadata, iteration_outputs = await self._execute_iteration(
-                index, item, inputs, body_graph, loop_outputs_config
-            )
+        limit = asyncio.Semaphore(self._max_concurrency(overrides))
+        # Compiled once; every iteration runs the same body under its own prefix.
+        body = CompiledGraph(body_graph)
+
+        async def bounded(index: int, item: Any) -> tuple[Dict[str, Any], List[tuple[str, Any]]]:
+            async with limit:
+                return await self._execute_iteration(
+                    index, item, inputs, body, loop_outputs_config
+                )
+
+        tasks = [asyncio.create_task(bounded(index, item)) for index, item in enumerate(items)]
+        try:
+            completed = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        for metadata, iteration_outputs in completed:
             iteration_metadata.append(metadata)
             self._merge_iteration_outputs(aggregated, iteration_outputs)
 
@@ -200,6 +250,15 @@ class LoopNodeExecutor(BaseNodeExecutor):
             return list(items)
         return [items]
 
+    def _max_concurrency(self, overrides: Dict[str, Any]) -> int:
+        raw = overrides.get("maxConcurrency", self.spec.config.get("maxConcurrency", 1))
+        try:
+            return max(1, int(raw))
+        except (TypeError, ValueError):
+            raise ExecutionError(
+                f"Loop node {self.qualified_id} has invalid maxConcurrency {raw!r}"
+            ) from None
+
     def _load_body_graph(self, overrides: Dict[str, Any]) -> Optional[GraphSpec]:
         body_graph_data = overrides.get("bodyGraph") or self.spec.config.get("bodyGraph")
         if not body_graph_data:
@@ -210,7 +269,7 @@ class LoopNodeExecutor(BaseNodeExecutor):
         loop_outputs_config = self.spec.config.get("loopOutputs", [])
         if not loop_outputs_config:
             raise ExecutionError(
-                f"Loop node {self.spec.id} is missing loopOutputs configuration"
+                f"Loop node {self.qualified_id} is missing loopOutputs configuration"
             )
         return loop_outputs_config
 
@@ -223,16 +282,21 @@ class LoopNodeExecutor(BaseNodeExecutor):
         index: int,
         item: Any,
         inputs: Dict[str, Any],
-        body_graph: GraphSpec,
+        body: CompiledGraph,
         loop_outputs_config: List[Dict[str, Any]],
     ) -> tuple[Dict[str, Any], List[tuple[str, Any]]]:
-        namespaced_graph = _namespace_graph(body_graph, f"{self.spec.id}::iter{index}::")
-        prepare_loop_bindings(namespaced_graph, item, inputs)
-        subrunner = self._create_iteration_runner(namespaced_graph, index)
+        subrunner = self._create_iteration_runner(
+            body, index, {"item": item, "inputs": inputs}
+        )
         result = await subrunner.run()
         metadata = {
             "outputs": result.final_outputs,
-            "nodes": list(result.node_outputs.keys()),
+            # Completion order varies with concurrency; report graph order.
+            "nodes": [
+                subrunner.qualified_id(node_id)
+                for node_id in body.topological_order()
+                if node_id in result.node_outputs
+            ],
         }
         iteration_outputs = self._collect_iteration_outputs(
             result, loop_outputs_config, index
@@ -240,21 +304,25 @@ class LoopNodeExecutor(BaseNodeExecutor):
         return metadata, iteration_outputs
 
     def _create_iteration_runner(
-        self, graph: GraphSpec, index: int
+        self, body: CompiledGraph, index: int, loop_context: Dict[str, Any]
     ) -> "GraphRunner":
+        loop_id = self.qualified_id
         iteration_scope = {
             "scope": "loop",
-            "parentNodeId": self.spec.id,
+            "parentNodeId": loop_id,
             "loopIteration": index,
         }
         return GraphRunner(
-            graph,
+            body.spec,
             self.runner.settings,
             run_id=f"{self.runner.run_id}:{self.spec.id}:{index}",
             sender=self.runner.sender,
             manager=None,
             scope=iteration_scope,
             parent=self.runner,
+            compiled=body,
+            prefix=f"{loop_id}::iter{index}::",
+            loop_context=loop_context,
         )
 
     def _collect_iteration_outputs(
@@ -268,8 +336,7 @@ class LoopNodeExecutor(BaseNodeExecutor):
             original_id = entry["node"]
             port = entry.get("port", "output")
             target = entry["target"]
-            namespaced_id = f"{self.spec.id}::iter{index}::{original_id}"
-            node_outputs = result.node_outputs.get(namespaced_id, {})
+            node_outputs = result.node_outputs.get(original_id, {})
             collected.append((target, node_outputs.get(port)))
         return collected
 
@@ -305,6 +372,8 @@ class LoopNodeExecutor(BaseNodeExecutor):
 class CognitionNodeExecutor(BaseNodeExecutor):
     """Invoke the typed cognition agent and expose structured outputs."""
 
+    cacheable = True
+
     INPUT_FIELDS = (
         "observation",
         "episodic_memory",
@@ -430,7 +499,7 @@ EXECUTOR_REGISTRY: Dict[str, Callable[["GraphRunner", NodeSpec], BaseNodeExecuto
     "python": PythonNodeExecutor,
     "output": OutputNodeExecutor,
     "loop": LoopNodeExecutor,
-    "loopInput": InputNodeExecutor,
+    "loopInput": LoopInputNodeExecutor,
     "loopOutput": OutputNodeExecutor,
     "cognition": CognitionNodeExecutor,
 }
@@ -454,6 +523,9 @@ class GraphRunResult:
     run_state: RunState
 
 
+_USE_DEFAULT_SANDBOX: Any = object()
+
+
 class GraphRunner:
     """Execute a graph specification and stream events through a sender."""
 
@@ -467,6 +539,12 @@ class GraphRunner:
         *,
         scope: Optional[Dict[str, Any]] = None,
         parent: Optional["GraphRunner"] = None,
+        node_cache: Optional[PersistentNodeCache] = None,
+        sandbox: Optional[SandboxPool] = _USE_DEFAULT_SANDBOX,
+        llm: Optional[LLMEngine] = None,
+        compiled: Optional[CompiledGraph] = None,
+        prefix: str = "",
+        loop_context: Optional[Dict[str, Any]] = None,
     ) -> None:
         self.graph = graph
         self.settings = settings
@@ -475,13 +553,22 @@ class GraphRunner:
         self.manager = manager
         self.scope = scope or {"scope": "graph"}
         self.parent = parent
-        self.node_map = graph.node_map()
-        self._edges_by_source: Dict[str, List[EdgeSpec]] = {}
-        self._edges_by_target: Dict[str, List[EdgeSpec]] = {}
-        for edge in graph.edges:
-            self._edges_by_source.setdefault(edge.source.node, []).append(edge)
-            self._edges_by_target.setdefault(edge.target.node, []).append(edge)
-        self.llm = parent.llm if parent else LLMEngine(settings.llm)
+        # Loop iterations share their body's compiled graph and keep its node
+        # IDs; ``prefix`` namespaces the IDs in events and results.
+        self._compiled = compiled if compiled is not None else CompiledGraph(graph)
+        self.prefix = prefix
+        self.loop_context = loop_context
+        self.node_map = self._compiled.nodes
+        self.llm = parent.llm if parent else llm or LLMEngine(settings.llm)
+        self._emit_lock = parent._emit_lock if parent else asyncio.Lock()
+        # One pool of executor slots per top-level run, so nested loop
+        # iterations cannot multiply ``settings.max_concurrency``.
+        self._slots = parent._slots if parent else asyncio.Semaphore(settings.max_concurrency)
+        self.node_cache = parent.node_cache if parent else node_cache
+        if parent:
+            self.sandbox = parent.sandbox
+        else:
+            self.sandbox = default_sandbox() if sandbox is _USE_DEFAULT_SANDBOX else sandbox
         self.run_state = RunState(
             run_id=run_id,
             graph=graph,
@@ -500,6 +587,18 @@ class GraphRunner:
     ) -> GraphRunResult:
         if overrides is None:
             overrides = {}
+        try:
+            return await self._run(resume, start_node, overrides)
+        finally:
+            if self.manager:
+                await self.manager.afinish(self.run_id)
+
+    async def _run(
+        self,
+        resume: Optional[RunState],
+        start_node: Optional[str],
+        overrides: Dict[str, Any],
+    ) -> GraphRunResult:
         start_type = (
             "run_started" if self.scope.get("scope") == "graph" else "subgraph_started"
         )
@@ -509,21 +608,14 @@ class GraphRunner:
             resume, start_node, overrides
         )
         results: Dict[str, Dict[str, Any]] = {}
-
-        for node_id in self._topological_order():
-            if await self._use_cached_node(node_id, cached_nodes, resume, results):
-                continue
-
-            if node_id not in nodes_to_execute:
-                continue
-
-            node = self.node_map[node_id]
-            await self._execute_node(node_id, node, overrides, results)
+        await self._run_wavefront(cached_nodes, nodes_to_execute, resume, overrides, results)
 
         final_outputs = self._collect_graph_outputs(results)
         complete_type = (
             "run_complete" if self.scope.get("scope") == "graph" else "subgraph_complete"
         )
+        if self.prefix:
+            final_outputs = {self.qualified_id(k): v for k, v in final_outputs.items()}
         await self._emit_event({"type": complete_type, "outputs": final_outputs})
         return GraphRunResult(
             run_id=self.run_id,
@@ -532,6 +624,58 @@ class GraphRunner:
             run_state=self.run_state,
         )
 
+    async def _run_wavefront(
+        self,
+        cached_nodes: Set[str],
+        nodes_to_execute: Set[str],
+        resume: Optional[RunState],
+        overrides: Dict[str, Any],
+        results: Dict[str, Dict[str, Any]],
+    ) -> None:
+        """Start every node as soon as all of its predecessors have finished.
+
+        At most ``settings.max_concurrency`` executors run at once. Ready nodes
+        are started in graph order, so a node's ``node_start`` always follows the
+        ``node_end`` of each predecessor and serial runs keep their old order.
+        """
+        sorter = self._sorter()
+        try:
+            sorter.prepare()
+        except CycleError as exc:  # pragma: no cover - cycle guard
+            raise ExecutionError("Graph contains cycles that cannot be resolved") from exc
+        position = self._compiled.position
+        ready: List[str] = []
+        running: Dict[asyncio.Task[None], str] = {}
+        try:
+            while sorter.is_active():
+                ready.extend(sorter.get_ready())
+                ready.sort(key=position.__getitem__)
+                while ready and len(running) < self.settings.max_concurrency:
+                    node_id = ready.pop(0)
+                    if (
+                        await self._use_cached_node(node_id, cached_nodes, resume, results)
+                        or node_id not in nodes_to_execute
+                    ):
+                        sorter.done(node_id)
+                        continue
+                    node = self.node_map[node_id]
+                    task = asyncio.create_task(
+                        self._execute_node(node_id, node, overrides, results)
+                    )
+                    running[task] = node_id
+                if not running:
+                    continue
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(finished, key=lambda t: position[running[t]]):
+                    node_id = running.pop(task)
+                    task.result()
+                    sorter.done(node_id)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
     async def _use_cached_node(
         self,
         node_id: str,
@@ -563,13 +707,67 @@ class GraphRunner:
 
         node_overrides = self._refresh_overrides(node_id, node_overrides, overrides, inputs)
         started_at = datetime.now(timezone.utc)
-        execution_result = await self._invoke_executor(
-            executor, node_id, inputs, node_overrides
-        )
+        clock = time.perf_counter()
+        store_key = self._store_key(executor, inputs, node_overrides)
+        stored = None
+        if store_key is not None:
+            stored = await asyncio.to_thread(self.node_cache.get, store_key)
+        if stored is not None:
+            execution_result = NodeExecutionResult(
+                outputs=stored.outputs,
+                metadata={**stored.metadata, "cache": "hit"},
+            )
+        else:
+            execution_result = await self._invoke_executor(
+                executor, node_id, inputs, node_overrides
+            )
+            if store_key is not None and self._storable(execution_result):
+                # computeSeconds lets profiles of later hits report the time saved.
+                metadata = {
+                    **execution_result.metadata,
+                    "computeSeconds": time.perf_counter() - clock,
+                }
+                await asyncio.to_thread(
+                    self.node_cache.put,
+                    store_key,
+                    node.type,
+                    CachedResult(execution_result.outputs, metadata),
+                )
         await self._handle_execution_result(
             node_id, node, execution_result, results, started_at
         )
 
+    @staticmethod
+    def _storable(result: NodeExecutionResult) -> bool:
+        """Only successful model outputs go to the persistent node cache.
+
+        Fallback or error results would otherwise be replayed as hits long
+        after the model is reachable again.
+        """
+        if result.transmissions is not None:
+            return False
+        return not (result.metadata.get("fallback") or result.metadata.get("error"))
+
+    def _store_key(
+        self,
+        executor: BaseNodeExecutor,
+        inputs: Dict[str, Any],
+        node_overrides: Dict[str, Any],
+    ) -> Optional[str]:
+        if (
+            self.node_cache is None
+            or not self.settings.use_node_cache
+            or not executor.cacheable
+        ):
+            return None
+        return cache_key(
+            executor.spec,
+            inputs,
+            node_overrides,
+            self.settings.llm,
+            signature=self._compiled.signature(executor.spec.id),
+        )
+
     def _prepare_inputs(
         self,
         node_id: str,
@@ -600,7 +798,10 @@ class GraphRunner:
         node_overrides: Dict[str, Any],
     ) -> NodeExecutionResult:
         try:
-            return await executor.run(inputs, node_overrides)
+            if executor.spawns_subgraphs:
+                return await executor.run(inputs, node_overrides)
+            async with self._slots:
+                return await executor.run(inputs, node_overrides)
         except Exception as exc:  # pragma: no cover - error branch
             error_type = (
                 "run_error" if self.scope.get("scope") == "graph" else "subgraph_error"
@@ -670,7 +871,7 @@ class GraphRunner:
             node_id=node_id,
             outputs=execution_result.outputs,
             transmissions=transmissions,
-            signature=node.signature(),
+            signature=self._compiled.signature(node_id),
             started_at=started_at,
             completed_at=completed_at,
             metadata=execution_result.metadata,
@@ -680,7 +881,7 @@ class GraphRunner:
         self, node_id: str, results: Dict[str, Dict[str, Any]]
     ) -> Dict[str, Any]:
         collected: Dict[str, List[Any]] = {}
-        for edge in self._edges_by_target.get(node_id, []):
+        for edge in self._compiled.edges_into(node_id):
             source_outputs = results.get(edge.source.node, {})
             if edge.source.port not in source_outputs:
                 continue
@@ -718,7 +919,7 @@ class GraphRunner:
         changed_nodes: Set[str] = set()
         for node_id, node in self.node_map.items():
             cached_signature = resume.node_signature(node_id)
-            if cached_signature is None or cached_signature != node.signature():
+            if cached_signature is None or cached_signature != self._compiled.signature(node_id):
                 changed_nodes.add(node_id)
 
         if start_node and start_node not in self.node_map:
@@ -749,25 +950,18 @@ class GraphRunner:
             if node_id in seen:
                 continue
             seen.add(node_id)
-            for edge in self._edges_by_source.get(node_id, []):
+            for edge in self._compiled.edges_from(node_id):
                 queue.append(edge.target.node)
         return seen
 
-    def _topological_order(self) -> List[str]:
-        sorter = TopologicalSorter()
-        for node in self.graph.nodes:
-            dependencies = [edge.source.node for edge in self._edges_by_target.get(node.id, [])]
-            sorter.add(node.id, *dependencies)
-        try:
-            return list(sorter.static_order())
-        except CycleError as exc:  # pragma: no cover - cycle guard
-            raise ExecutionError("Graph contains cycles that cannot be resolved") from exc
+    def _sorter(self) -> TopologicalSorter:
+        return self._compiled.sorter()
 
     def _default_transmissions(
         self, node_id: str, outputs: Dict[str, Any]
     ) -> List[EdgeTransmission]:
         transmissions: List[EdgeTransmission] = []
-        for edge in self._edges_by_source.get(node_id, []):
+        for edge in self._compiled.edges_from(node_id):
             if edge.source.port not in outputs:
                 continue
             transmissions.append(
@@ -780,40 +974,20 @@ class GraphRunner:
             )
         return transmissions
 
-    def outgoing_edges(self, node_id: str) -> List[EdgeSpec]:
-        return self._edges_by_source.get(node_id, [])
+    def outgoing_edges(self, node_id: str) -> Sequence[EdgeSpec]:
+        return self._compiled.edges_from(node_id)
+
+    def qualified_id(self, node_id: str) -> str:
+        """ID of ``node_id`` as seen outside this runner (loop prefix applied)."""
+
+        return f"{self.prefix}{node_id}"
 
     async def _emit_event(self, event: Dict[str, Any]) -> None:
-        payload = dict(event)
+        payload = prefixed(event, self.prefix)
         payload.setdefault("runId", self.run_id)
         payload.update(self.scope)
-        await self.sender(payload)
-        self.run_state.record_event(payload)
-
-
-def _namespace_graph(graph: GraphSpec, prefix: str) -> GraphSpec:
-    data = graph.model_dump(mode="python")
-    for node in data["nodes"]:
-        node["id"] = f"{prefix}{node['id']}"
-    for edge in data["edges"]:
-        edge["id"] = f"{prefix}{edge['id']}"
-        edge["source"]["node"] = f"{prefix}{edge['source']['node']}"
-        edge["target"]["node"] = f"{prefix}{edge['target']['node']}"
-    return GraphSpec.model_validate(data)
-
-
-def prepare_loop_bindings(graph: GraphSpec, item: Any, outer_inputs: Dict[str, Any]) -> None:
-    for node in graph.nodes:
-        if node.type != "loopInput":
-            continue
-        binding = node.config.get("binding", "items")
-        if binding == "items":
-            value = item
-        elif binding.startswith("input:"):
-            key = binding.split(":", 1)[1]
-            value = outer_inputs.get(key)
-        else:
-            value = node.config.get("default")
-        node.type = "input"
-        node.config.setdefault("value", value)
-
+        # Concurrent nodes share one sender; serialise so the stream and the
+        # recorded timeline agree on the order.
+        async with self._emit_lock:
+            await self.sender(payload)
+            self.run_state.record_event(payload)
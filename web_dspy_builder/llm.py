@@ -2,18 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import random
+import time
+import weakref
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
 from .models import LLMSettings
+from .response_cache import ResponseCache, default_response_cache, response_key
 
 
 class LLMError(RuntimeError):
     """Raised when the language model cannot fulfil a request."""
 
 
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) for usage reports."""
+
+    return (len(text) + 3) // 4
+
+
 class BaseLLM:
     """Simple interface implemented by all language model wrappers."""
 
@@ -23,16 +33,36 @@ class BaseLLM:
     def complete(self, prompt: str, *, stop: Optional[str] = None) -> str:
         raise NotImplementedError
 
+    async def acomplete(self, prompt: str, *, stop: Optional[str] = None) -> str:
+        """Async completion; wrappers without a native async path use a thread."""
+
+        return await asyncio.to_thread(self.complete, prompt, stop=stop)
+
 
 class MockLLM(BaseLLM):
-    """Deterministic mock model used for testing and offline work."""
+    """Deterministic mock model used for testing and offline work.
+
+    ``params["latency"]`` (seconds) delays every completion, which makes the
+    mock usable for load tests of the async path.
+    """
 
     def __init__(self, settings: LLMSettings) -> None:
         super().__init__(settings)
         seed_material = settings.model or "mock"
         self._seed = int(hashlib.sha256(seed_material.encode("utf-8")).hexdigest(), 16) % (2**32)
+        self.latency = float(settings.params.get("latency", 0.0))
 
     def complete(self, prompt: str, *, stop: Optional[str] = None) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(prompt, stop)
+
+    async def acomplete(self, prompt: str, *, stop: Optional[str] = None) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(prompt, stop)
+
+    def _respond(self, prompt: str, stop: Optional[str]) -> str:
         random.seed(self._seed + len(prompt))
         tag = self.settings.model or "mock"
         body = prompt.strip()
@@ -53,7 +83,7 @@ class DSPyWrapper(BaseLLM):
         super().__init__(settings)
         self.lm = lm
 
-    def complete(self, prompt: str, *, stop: Optional[str] = None) -> str:
+    def _params(self, stop: Optional[str]) -> Dict[str, Any]:
         params: Dict[str, Any] = {
             "temperature": self.settings.temperature,
             "max_new_tokens": self.settings.max_tokens,
@@ -61,9 +91,22 @@ class DSPyWrapper(BaseLLM):
         params.update(self.settings.params)
         if stop:
             params["stop"] = stop
+        return params
 
+    def complete(self, prompt: str, *, stop: Optional[str] = None) -> str:
         # The dspy LM callable returns a dict with a "text" field for completions.
-        response = self.lm(prompt=prompt, **params)
+        return self._text(self.lm(prompt=prompt, **self._params(stop)))
+
+    async def acomplete(self, prompt: str, *, stop: Optional[str] = None) -> str:
+        # dspy.LM.acall goes through litellm's async client, which keeps a
+        # shared connection pool instead of holding a thread per request.
+        acall = getattr(self.lm, "acall", None)
+        if acall is None:
+            return await super().acomplete(prompt, stop=stop)
+        return self._text(await acall(prompt=prompt, **self._params(stop)))
+
+    @staticmethod
+    def _text(response: Any) -> str:
         if isinstance(response, dict):
             text = response.get("text") or response.get("completion")
         else:
@@ -73,12 +116,131 @@ class DSPyWrapper(BaseLLM):
         return text
 
 
+class TokenBucket:
+    """Async token bucket: ``rate`` requests per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class _ModelLimiter:
+    """Concurrency cap plus optional request-rate limit for one model.
+
+    Engines may ask for different limits on the same model; :meth:`tighten`
+    keeps the stricter of each, so no caller's cap is exceeded.
+    """
+
+    def __init__(self, concurrency: int, requests_per_minute: float) -> None:
+        self.concurrency = concurrency
+        self.active = 0
+        self._slots = asyncio.Condition()
+        self.bucket = TokenBucket(requests_per_minute / 60.0) if requests_per_minute > 0 else None
+
+    def tighten(self, concurrency: int, requests_per_minute: float) -> None:
+        self.concurrency = min(self.concurrency, concurrency)
+        if requests_per_minute <= 0:
+            return
+        rate = requests_per_minute / 60.0
+        if self.bucket is None:
+            self.bucket = TokenBucket(rate)
+        elif rate < self.bucket.rate:
+            self.bucket.rate = rate
+            self.bucket.capacity = min(self.bucket.capacity, max(1.0, rate))
+
+    async def __aenter__(self) -> None:
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.active < self.concurrency)
+            self.active += 1
+        if self.bucket is not None:
+            try:
+                await self.bucket.acquire()
+            except BaseException:
+                await self._release()
+                raise
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self._release()
+
+    async def _release(self) -> None:
+        async with self._slots:
+            self.active -= 1
+            self._slots.notify()
+
+
+# Limiters are shared by every engine using the same provider model on the
+# same event loop, so the cap holds across concurrent runs.
+_LIMITERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _ModelLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limiter_for(settings: LLMSettings) -> _ModelLimiter:
+    per_loop = _LIMITERS.setdefault(asyncio.get_running_loop(), {})
+    key = resolved_model(settings)
+    limiter = per_loop.get(key)
+    if limiter is None:
+        limiter = per_loop[key] = _ModelLimiter(settings.concurrency, settings.requests_per_minute)
+    else:
+        limiter.tighten(settings.concurrency, settings.requests_per_minute)
+    return limiter
+
+
+DEFAULT_MODELS: Dict[str, str] = {
+    "dspy": "openrouter/google/gemini-2.0-flash-thinking",
+    "openrouter": "openrouter/google/gemini-2.0-flash-thinking",
+    "openai": "openai/gpt-4o-mini",
+    "ollama": "ollama/llama3.1",
+}
+
+
+def resolved_model(settings: LLMSettings) -> str:
+    """The model ID actually sent to the provider, with engine defaults applied.
+
+    Engines that reach the same provider model (e.g. ``dspy`` and
+    ``openrouter`` with the default model) resolve to the same ID, so they
+    share one limiter.
+    """
+
+    if settings.engine == "mock":
+        return f"mock/{(settings.model or '').strip()}"
+    return (settings.model or DEFAULT_MODELS.get(settings.engine, "")).strip()
+
+
+_USE_DEFAULT_CACHE: Any = object()
+
+
 class LLMEngine:
-    """Configure and invoke language models based on runtime settings."""
+    """Configure and invoke language models based on runtime settings.
+
+    Completions go through a :class:`ResponseCache` (the process-wide one
+    unless another is given; ``None`` disables caching) when
+    ``settings.cache_responses`` is set.
+    """
 
-    def __init__(self, settings: Optional[LLMSettings] = None) -> None:
+    def __init__(
+        self,
+        settings: Optional[LLMSettings] = None,
+        *,
+        cache: Optional[ResponseCache] = _USE_DEFAULT_CACHE,
+    ) -> None:
         self.settings = settings or LLMSettings()
         self._impl: BaseLLM = self._create_impl()
+        self.cache = default_response_cache() if cache is _USE_DEFAULT_CACHE else cache
 
     def _create_impl(self) -> BaseLLM:
         engine = self.settings.engine
@@ -92,24 +254,37 @@ class LLMEngine:
                 "dspy is required for non-mock engines but could not be imported"
             ) from exc
 
-        if engine == "dspy":
-            model_name = self.settings.model or "openrouter/google/gemini-2.0-flash-thinking"
-            lm = dspy.LM(model_name, **self.settings.params)
-        elif engine == "openrouter":
-            model_name = self.settings.model or "openrouter/google/gemini-2.0-flash-thinking"
-            lm = dspy.LM(model_name, **self.settings.params)
-        elif engine == "openai":
-            model_name = self.settings.model or "openai/gpt-4o-mini"
-            lm = dspy.LM(model_name, **self.settings.params)
-        elif engine == "ollama":
-            model_name = self.settings.model or "ollama/llama3.1"
-            lm = dspy.LM(model_name, **self.settings.params)
-        else:  # pragma: no cover - defensive
+        if engine not in DEFAULT_MODELS:  # pragma: no cover - defensive
             raise LLMError(f"Unsupported LLM engine: {engine}")
+        lm = dspy.LM(resolved_model(self.settings), **self.settings.params)
 
         dspy.configure(lm=lm)
         return DSPyWrapper(self.settings, lm)
 
+    def _cache_for_request(self) -> Optional[ResponseCache]:
+        return self.cache if self.settings.cache_responses else None
+
     def complete(self, prompt: str, *, stop: Optional[str] = None) -> str:
-        return self._impl.complete(prompt, stop=stop)
+        cache = self._cache_for_request()
+        if cache is None:
+            return self._impl.complete(prompt, stop=stop)
+        return cache.complete(
+            response_key(self.settings, prompt, stop),
+            lambda: self._impl.complete(prompt, stop=stop),
+        )
+
+    async def acomplete(self, prompt: str, *, stop: Optional[str] = None) -> str:
+        """Complete without tying up a thread, within the model's concurrency and rate limits.
+
+        Cached responses and identical in-flight requests skip the limiter.
+        """
+
+        async def call() -> str:
+            async with _limiter_for(self.settings):
+                return await self._impl.acomplete(prompt, stop=stop)
+
+        cache = self._cache_for_request()
+        if cache is None:
+            return await call()
+        return await cache.acomplete(response_key(self.settings, prompt, stop), call)
 
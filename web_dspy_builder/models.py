@@ -85,6 +85,16 @@ class LLMSettings(BaseModel):
     temperature: float = 0.0
     max_tokens: int = 2048
     params: Dict[str, Any] = Field(default_factory=dict)
+    concurrency: int = 16
+    requests_per_minute: float = 0.0
+    cache_responses: bool = True
+
+    @field_validator("concurrency")
+    @classmethod
+    def clamp_concurrency(cls, value: int) -> int:  # noqa: D401
+        """Allow at least one in-flight request per model."""
+
+        return max(1, value)
 
     @field_validator("temperature")
     @classmethod
@@ -106,6 +116,15 @@ class RunSettings(BaseModel):
 
     llm: LLMSettings = Field(default_factory=LLMSettings)
     allow_cache_reuse: bool = True
+    use_node_cache: bool = True
+    max_concurrency: int = 8
+
+    @field_validator("max_concurrency")
+    @classmethod
+    def clamp_concurrency(cls, value: int) -> int:  # noqa: D401
+        """At least one node must be able to run."""
+
+        return max(1, value)
 
 
 class RunRequest(BaseModel):
@@ -144,6 +163,18 @@ class EdgeTransmission:
             "timestamp": self.timestamp.isoformat(),
         }
 
+    @classmethod
+    def from_event(cls, event: Dict[str, Any]) -> "EdgeTransmission":
+        return cls(
+            edge_id=event["edgeId"],
+            source=PortReference.model_validate(event["source"]),
+            target=PortReference.model_validate(event["target"]),
+            value=event.get("value"),
+            iteration=event.get("iteration"),
+            cached=event.get("cached", False),
+            timestamp=datetime.fromisoformat(event["timestamp"]),
+        )
+
 
 @dataclass
 class NodeCache:
@@ -167,6 +198,28 @@ class NodeCache:
             "completedAt": self.completed_at.isoformat(),
         }
 
+    def to_record(self) -> Dict[str, Any]:
+        """Serialisable form used when spilling runs to disk."""
+
+        record = self.to_event()
+        record["signature"] = self.signature
+        record["transmissions"] = [item.to_event() for item in self.transmissions]
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "NodeCache":
+        return cls(
+            node_id=record["nodeId"],
+            outputs=record.get("outputs", {}),
+            transmissions=[
+                EdgeTransmission.from_event(item) for item in record.get("transmissions", [])
+            ],
+            signature=record["signature"],
+            started_at=datetime.fromisoformat(record["startedAt"]),
+            completed_at=datetime.fromisoformat(record["completedAt"]),
+            metadata=record.get("metadata", {}),
+        )
+
 
 @dataclass
 class RunState:
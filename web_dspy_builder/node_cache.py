@@ -0,0 +1,189 @@
+"""Persistent node-result cache shared across runs, sessions and users.
+
+Entries are keyed by the node's :meth:`NodeSpec.signature`, the resolved
+inputs and overrides the node ran with, and the LLM settings, so an identical
+node fed identical data is served from disk instead of being re-executed.
+The store is a single SQLite file bounded by ``max_bytes``; least recently
+used entries are evicted first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .models import LLMSettings, NodeSpec
+
+
+DEFAULT_PATH = Path(".dspy_builder") / "node_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# LLM settings that change how requests are scheduled, not what they return.
+_EXECUTION_ONLY = {"concurrency", "requests_per_minute", "cache_responses"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS node_results (
+    key TEXT PRIMARY KEY,
+    node_type TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS node_results_last_used ON node_results (last_used);
+"""
+
+
+@dataclass
+class CachedResult:
+    """Outputs and metadata of a previously executed node."""
+
+    outputs: Dict[str, Any]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def cache_key(
+    spec: NodeSpec,
+    inputs: Dict[str, Any],
+    overrides: Dict[str, Any],
+    llm: LLMSettings,
+    *,
+    signature: Optional[str] = None,
+) -> Optional[str]:
+    """Content hash for a node execution, or None if the inputs are not JSON.
+
+    ``signature`` may pass an already computed ``spec.signature()``.
+    """
+
+    try:
+        material = json.dumps(
+            {
+                "signature": signature or spec.signature(),
+                "inputs": inputs,
+                "overrides": overrides,
+                "llm": llm.model_dump(mode="json", exclude=_EXECUTION_ONLY),
+            },
+            sort_keys=True,
+        )
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class PersistentNodeCache:
+    """SQLite-backed LRU store of node results."""
+
+    def __init__(self, path: Path | str, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._total = 0
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use so that configuring a cache touches no files.
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+            self._total = db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM node_results"
+            ).fetchone()[0]
+            self._db = db
+        return self._db
+
+    @classmethod
+    def from_env(cls) -> Optional["PersistentNodeCache"]:
+        """Build the cache configured by ``DSPY_BUILDER_NODE_CACHE`` ("off" disables)."""
+
+        location = os.getenv("DSPY_BUILDER_NODE_CACHE", str(DEFAULT_PATH))
+        if location.lower() in {"", "off", "0", "false"}:
+            return None
+        max_mb = os.getenv("DSPY_BUILDER_NODE_CACHE_MB")
+        max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+        return cls(location, max_bytes=max_bytes)
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM node_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE node_results SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        data = json.loads(row[0])
+        return CachedResult(outputs=data["outputs"], metadata=data.get("metadata", {}))
+
+    def put(self, key: str, node_type: str, result: CachedResult) -> bool:
+        """Store ``result``; returns False if it is not JSON-serialisable or too large."""
+
+        try:
+            payload = json.dumps(
+                {"outputs": result.outputs, "metadata": result.metadata}
+            ).encode("utf-8")
+        except (TypeError, ValueError):
+            return False
+        size = len(payload)
+        if size > self.max_bytes:
+            return False
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM node_results WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO node_results"
+                " (key, node_type, payload, size, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, node_type, payload, size, now, now),
+            )
+            self._total += size - (previous[0] if previous else 0)
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM node_results ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total = 0
+                return
+            for key, size in rows:
+                self._conn.execute("DELETE FROM node_results WHERE key = ?", (key,))
+                self._total -= size
+                if self._total <= self.max_bytes:
+                    return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM node_results").fetchone()[0]
+        return {"entries": count, "bytes": self._total, "maxBytes": self.max_bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM node_results")
+            self._conn.commit()
+            self._total = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+__all__ = ["CachedResult", "PersistentNodeCache", "cache_key"]
@@ -0,0 +1,204 @@
+"""Timing, critical-path and cost analysis of finished graph runs.
+
+Everything is derived from what a run already records: each executed node's
+``NodeCache`` start/end timestamps and metadata, the graph's edges, and the
+``node_cached`` events of nodes reused from a base run. A node counts as ready
+once all of its upstream nodes have completed (or at run start), so its
+queueing delay is the gap between becoming ready and starting.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from graphlib import TopologicalSorter
+from typing import Any, Dict, List, Optional
+
+from .models import RunState
+
+
+@dataclass
+class NodeProfile:
+    """Timing and usage of a single node within a run (seconds from run start)."""
+
+    node_id: str
+    node_type: str
+    ready: float
+    started: float
+    completed: float
+    self_seconds: float
+    queue_seconds: float
+    cache: Optional[str] = None  # "hit" (node cache) or "reused" (base run)
+    saved_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    critical: bool = False
+
+
+@dataclass
+class RunProfile:
+    """Aggregate profile of a run; ``nodes`` are ordered by start time."""
+
+    run_id: str
+    wall_seconds: float
+    busy_seconds: float
+    critical_path: List[str]
+    critical_path_seconds: float
+    parallelism_achieved: float
+    parallelism_available: float
+    max_concurrency: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    cache_hits: int
+    cache_saved_seconds: float
+    nodes: List[NodeProfile] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _camel(asdict(self))
+
+
+def _camel(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {_camel_key(key): _camel(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_camel(item) for item in value]
+    return value
+
+
+def _camel_key(key: str) -> str:
+    head, *rest = key.split("_")
+    return head + "".join(part.title() for part in rest)
+
+
+def _usage(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    usage = metadata.get("usage")
+    return usage if isinstance(usage, dict) else {}
+
+
+def profile_run(
+    run_state: RunState,
+    *,
+    prompt_price: float = 0.0,
+    completion_price: float = 0.0,
+) -> RunProfile:
+    """Profile ``run_state``. Prices are per million tokens and only apply to
+    nodes whose usage does not already report a ``cost``."""
+
+    origin = run_state.started_at
+    node_map = run_state.graph.node_map()
+    upstream: Dict[str, set[str]] = {node_id: set() for node_id in node_map}
+    for edge in run_state.graph.edges:
+        if edge.source.node in node_map and edge.target.node in node_map:
+            upstream[edge.target.node].add(edge.source.node)
+
+    def offset(moment: datetime) -> float:
+        return max(0.0, (moment - origin).total_seconds())
+
+    profiles: Dict[str, NodeProfile] = {}
+    for node_id, cache in run_state.node_results.items():
+        spec = node_map.get(node_id)
+        started = offset(cache.started_at)
+        completed = max(started, offset(cache.completed_at))
+        usage = _usage(cache.metadata)
+        hit = cache.metadata.get("cache") == "hit"
+        profile = NodeProfile(
+            node_id=node_id,
+            node_type=spec.type if spec else "?",
+            ready=0.0,
+            started=started,
+            completed=completed,
+            self_seconds=completed - started,
+            queue_seconds=0.0,
+            cache="hit" if hit else None,
+        )
+        if hit:
+            profile.saved_seconds = max(
+                0.0, float(cache.metadata.get("computeSeconds", 0.0)) - profile.self_seconds
+            )
+        else:
+            profile.prompt_tokens = int(usage.get("promptTokens", 0))
+            profile.completion_tokens = int(usage.get("completionTokens", 0))
+            if "cost" in usage:
+                profile.cost = float(usage["cost"])
+            else:
+                profile.cost = (
+                    profile.prompt_tokens * prompt_price
+                    + profile.completion_tokens * completion_price
+                ) / 1_000_000
+        profiles[node_id] = profile
+
+    reused: Dict[str, float] = {}
+    for event in run_state.timeline:
+        if event.get("type") != "node_cached" or event.get("scope", "graph") != "graph":
+            continue
+        try:
+            original = datetime.fromisoformat(event["completedAt"]) - datetime.fromisoformat(
+                event["startedAt"]
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+        reused[event["nodeId"]] = max(0.0, original.total_seconds())
+
+    for profile in profiles.values():
+        done = [profiles[dep].completed for dep in upstream.get(profile.node_id, ()) if dep in profiles]
+        profile.ready = min(profile.started, max(done, default=0.0))
+        profile.queue_seconds = profile.started - profile.ready
+
+    # Longest path weighted by self time: the makespan with unlimited workers.
+    best: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for node_id in TopologicalSorter(upstream).static_order():
+        weight = profiles[node_id].self_seconds if node_id in profiles else 0.0
+        parent = max(upstream.get(node_id, ()), key=lambda dep: best.get(dep, 0.0), default=None)
+        best[node_id] = weight + (best.get(parent, 0.0) if parent else 0.0)
+        previous[node_id] = parent
+    path: List[str] = []
+    cursor = max(best, key=best.__getitem__, default=None)
+    critical_seconds = best.get(cursor, 0.0) if cursor else 0.0
+    while cursor is not None:
+        if cursor in profiles:
+            path.append(cursor)
+            profiles[cursor].critical = True
+        cursor = previous.get(cursor)
+    path.reverse()
+
+    nodes = sorted(profiles.values(), key=lambda item: (item.started, item.node_id))
+    wall = max((node.completed for node in nodes), default=0.0)
+    busy = sum(node.self_seconds for node in nodes)
+    for node_id, seconds in reused.items():
+        if node_id not in profiles:
+            nodes.append(
+                NodeProfile(
+                    node_id=node_id,
+                    node_type=node_map[node_id].type if node_id in node_map else "?",
+                    ready=0.0,
+                    started=0.0,
+                    completed=0.0,
+                    self_seconds=0.0,
+                    queue_seconds=0.0,
+                    cache="reused",
+                    saved_seconds=seconds,
+                )
+            )
+    cached = [node for node in nodes if node.cache]
+    return RunProfile(
+        run_id=run_state.run_id,
+        wall_seconds=wall,
+        busy_seconds=busy,
+        critical_path=path,
+        critical_path_seconds=critical_seconds,
+        parallelism_achieved=busy / wall if wall > 0 else 0.0,
+        parallelism_available=busy / critical_seconds if critical_seconds > 0 else 0.0,
+        max_concurrency=run_state.settings.max_concurrency,
+        prompt_tokens=sum(node.prompt_tokens for node in nodes),
+        completion_tokens=sum(node.completion_tokens for node in nodes),
+        cost=sum(node.cost for node in nodes),
+        cache_hits=len(cached),
+        cache_saved_seconds=sum(node.saved_seconds for node in cached),
+        nodes=nodes,
+    )
+
+
+__all__ = ["NodeProfile", "RunProfile", "profile_run"]
@@ -0,0 +1,232 @@
+"""Prompt-level response cache with in-flight request coalescing.
+
+Replays and loop bodies often send byte-identical prompts. Responses are
+keyed by the model settings and the exact prompt/stop sequence and kept in an
+in-memory LRU, optionally backed by a SQLite file. Concurrent identical
+requests share one upstream call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .models import LLMSettings
+
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 100_000
+
+# Settings that change how requests are scheduled or cached, not what they return.
+_NOT_IN_KEY = {"concurrency", "requests_per_minute", "cache_responses"}
+
+
+def response_key(settings: LLMSettings, prompt: str, stop: Optional[str]) -> str:
+    material = json.dumps(
+        {
+            "settings": settings.model_dump(mode="json", exclude=_NOT_IN_KEY),
+            "prompt": prompt,
+            "stop": stop,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    def __init__(self, path: Path, max_entries: int) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses"
+                " (key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+        return self._db
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn().execute("SELECT text FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, text, created_at) VALUES (?, ?, ?)",
+                (key, text, time.time()),
+            )
+            self._writes += 1
+            if self._writes % 256 == 0:
+                db.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses"
+                    " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            db.commit()
+
+
+class _Flight:
+    """An in-flight computation and the number of callers awaiting it."""
+
+    def __init__(self, task: "asyncio.Task[str]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional disk) cache of LLM completions."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_MEMORY_ENTRIES,
+        path: Optional[Path] = None,
+        max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._disk = _DiskTier(Path(path), max_disk_entries) if path else None
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """``DSPY_BUILDER_LLM_CACHE``: "off" disables, a path adds the disk tier."""
+
+        location = os.getenv("DSPY_BUILDER_LLM_CACHE", "memory")
+        if location.lower() in {"", "off", "0", "false"}:
+            return None
+        return cls(
+            max_entries=int(os.getenv("DSPY_BUILDER_LLM_CACHE_SIZE", DEFAULT_MEMORY_ENTRIES)),
+            path=None if location.lower() == "memory" else Path(location),
+        )
+
+    def lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return text
+        if self._disk is not None:
+            text = self._disk.get(key)
+            if text is not None:
+                self._remember(key, text)
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                return text
+        return None
+
+    def store(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if self._disk is not None:
+            self._disk.put(key, text)
+
+    def _remember(self, key: str, text: str) -> None:
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def complete(self, key: str, compute: Callable[[], str]) -> str:
+        text = self.lookup(key)
+        if text is not None:
+            return text
+        with self._lock:
+            self.stats["misses"] += 1
+        text = compute()
+        self.store(key, text)
+        return text
+
+    async def acomplete(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached response, join an identical in-flight call, or compute.
+
+        The computation runs in its own task that every caller awaits through
+        :func:`asyncio.shield`, so cancelling one caller (including the first)
+        leaves the others waiting; the task is cancelled only once no caller
+        is left.
+        """
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.stats["coalesced"] += 1
+        else:
+            text = self.lookup(key)
+            if text is not None:
+                return text
+            self.stats["misses"] += 1
+            flight = _Flight(asyncio.ensure_future(self._fill(key, compute)))
+            self._inflight[key] = flight
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+    async def _fill(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        try:
+            text = await compute()
+            if self._disk is not None:
+                await asyncio.to_thread(self.store, key, text)
+            else:
+                self.store(key, text)
+            return text
+        finally:
+            flight = self._inflight.get(key)
+            if flight is not None and flight.task is asyncio.current_task():
+                del self._inflight[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        stats["disk"] = str(self._disk.path) if self._disk else None
+        return stats
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_loaded = False
+
+
+def default_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache shared by every :class:`LLMEngine` (configured from env)."""
+
+    global _default_cache, _default_loaded
+    if not _default_loaded:
+        _default_cache = ResponseCache.from_env()
+        _default_loaded = True
+    return _default_cache
+
+
+__all__ = ["ResponseCache", "default_response_cache", "response_key"]
@@ -2,42 +2,330 @@
 
 from __future__ import annotations
 
-from typing import Dict, Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-from .models import NodeCache, RunState
+from .models import GraphSpec, NodeCache, RunSettings, RunState
+
+
+DEFAULT_MAX_RUNS = 64
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_SPILLED = 1024
+
+
+def _dump_run(run_state: RunState) -> bytes:
+    """Encode a run as JSONL: a header line, one line per node, then events."""
+
+    lines = [
+        {
+            "kind": "run",
+            "runId": run_state.run_id,
+            "startedAt": run_state.started_at.isoformat(),
+            "nodeCount": len(run_state.node_results),
+            "graph": run_state.graph.model_dump(mode="json"),
+            "settings": run_state.settings.model_dump(mode="json"),
+        }
+    ]
+    lines.extend({"kind": "node", **cache.to_record()} for cache in run_state.node_results.values())
+    lines.extend({"kind": "event", "event": event} for event in run_state.timeline)
+    text = "".join(json.dumps(line, default=str) + "\n" for line in lines)
+    return text.encode("utf-8")
+
+
+def _load_run(data: bytes) -> RunState:
+    run_state: Optional[RunState] = None
+    for raw in data.decode("utf-8").splitlines():
+        record = json.loads(raw)
+        kind = record.pop("kind")
+        if kind == "run":
+            run_state = RunState(
+                run_id=record["runId"],
+                graph=GraphSpec.model_validate(record["graph"]),
+                settings=RunSettings.model_validate(record["settings"]),
+                started_at=datetime.fromisoformat(record["startedAt"]),
+            )
+        elif run_state is None:
+            raise ValueError("run file is missing its header")
+        elif kind == "node":
+            cache = NodeCache.from_record(record)
+            run_state.node_results[cache.node_id] = cache
+        elif kind == "event":
+            run_state.timeline.append(record["event"])
+    if run_state is None:
+        raise ValueError("empty run file")
+    return run_state
+
+
+def _summary(run_state: RunState) -> Dict[str, Any]:
+    return {
+        "runId": run_state.run_id,
+        "graphId": run_state.graph.id,
+        "startedAt": run_state.started_at.isoformat(),
+        "nodeCount": len(run_state.node_results),
+    }
 
 
 class RunManager:
-    """In-memory registry of graph run states."""
+    """Registry of graph run states with a bounded in-memory footprint.
 
-    def __init__(self) -> None:
-        self._runs: Dict[str, RunState] = {}
+    Runs in progress always stay resident. Once a run finishes it becomes
+    evictable: when more than ``max_runs`` runs or ``max_bytes`` of encoded
+    state are resident, the least recently used finished runs are written to
+    ``spill_dir`` as gzipped JSONL and dropped from memory. :meth:`get` loads
+    them back on demand. Without a ``spill_dir`` a private temporary directory
+    is used, so nothing is lost for the lifetime of the process.
+
+    The spill directory itself is bounded: beyond ``max_spilled`` files, or
+    for files older than ``max_spill_age`` seconds, the oldest spilled runs are
+    deleted. Encoding and writing happen outside the lock; async callers use
+    :meth:`afinish` to keep that work off the event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_runs: int = DEFAULT_MAX_RUNS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        spill_dir: Optional[Path] = None,
+        max_spilled: int = DEFAULT_MAX_SPILLED,
+        max_spill_age: Optional[float] = None,
+    ) -> None:
+        self.max_runs = max(1, max_runs)
+        self.max_bytes = max_bytes
+        self.max_spilled = max(1, max_spilled)
+        self.max_spill_age = max_spill_age
+        self._spill_dir = Path(spill_dir) if spill_dir else None
+        self._runs: "OrderedDict[str, RunState]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}  # encoded size of finished, resident runs
+        self._spilled: Dict[str, Dict[str, Any]] = {}  # run_id -> summary
+        self._spilling: set[str] = set()  # chosen for eviction, write in progress
+        self._lock = threading.RLock()
+        if self._spill_dir is not None and self._spill_dir.exists():
+            self._index_spilled()
+            self._prune_spilled()
+
+    @classmethod
+    def from_env(cls) -> "RunManager":
+        """Configure from ``DSPY_BUILDER_MAX_RUNS``, ``DSPY_BUILDER_RUNS_MB``, ``DSPY_BUILDER_RUN_DIR``,
+        ``DSPY_BUILDER_MAX_SPILLED`` and ``DSPY_BUILDER_RUN_MAX_AGE_DAYS``."""
+
+        max_mb = os.getenv("DSPY_BUILDER_RUNS_MB")
+        max_age_days = os.getenv("DSPY_BUILDER_RUN_MAX_AGE_DAYS")
+        spill_dir = os.getenv("DSPY_BUILDER_RUN_DIR", str(Path(".dspy_builder") / "runs"))
+        return cls(
+            max_runs=int(os.getenv("DSPY_BUILDER_MAX_RUNS", DEFAULT_MAX_RUNS)),
+            max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES,
+            spill_dir=Path(spill_dir),
+            max_spilled=int(os.getenv("DSPY_BUILDER_MAX_SPILLED", DEFAULT_MAX_SPILLED)),
+            max_spill_age=float(max_age_days) * 86400 if max_age_days else None,
+        )
 
     def register(self, run_state: RunState) -> None:
         """Register a new run state."""
 
-        self._runs[run_state.run_id] = run_state
+        with self._lock:
+            self._runs[run_state.run_id] = run_state
+            self._runs.move_to_end(run_state.run_id)
+            self._sizes.pop(run_state.run_id, None)
+            self._spilled.pop(run_state.run_id, None)
+
+    def finish(self, run_id: str) -> None:
+        """Mark a run as complete so it may be evicted."""
+
+        with self._lock:
+            run_state = self._runs.get(run_id)
+        if run_state is None:
+            return
+        size = len(_dump_run(run_state))
+        with self._lock:
+            if self._runs.get(run_id) is not run_state:
+                return
+            self._sizes[run_id] = size
+            victims = self._pick_victims()
+        self._spill_all(victims)
+
+    async def afinish(self, run_id: str) -> None:
+        """:meth:`finish` in a worker thread, so encoding and spilling never block the loop."""
+
+        await asyncio.to_thread(self.finish, run_id)
 
     def get(self, run_id: str) -> Optional[RunState]:
-        """Retrieve the stored state for a run if it exists."""
+        """Retrieve the stored state for a run, reloading it if it was evicted."""
+
+        with self._lock:
+            run_state = self._runs.get(run_id)
+            if run_state is not None:
+                self._runs.move_to_end(run_id)
+                return run_state
+            if run_id not in self._spilled:
+                return None
+            path = self._spill_path(run_id)
+        # Read and decode without the lock; re-check afterwards, since another
+        # caller may have reloaded, forgotten or pruned the run meanwhile.
+        try:
+            data: Optional[bytes] = gzip.decompress(path.read_bytes())
+        except FileNotFoundError:
+            data = None
+        loaded = _load_run(data) if data is not None else None
+        with self._lock:
+            run_state = self._runs.get(run_id)
+            if run_state is not None:
+                self._runs.move_to_end(run_id)
+                return run_state
+            if loaded is None or run_id not in self._spilled:
+                return None
+            self._runs[run_id] = loaded
+            self._sizes[run_id] = len(data)
+            del self._spilled[run_id]
+            victims = self._pick_victims(keep=run_id)
+        self._spill_all(victims)
+        return loaded
 
-        return self._runs.get(run_id)
+    async def aget(self, run_id: str) -> Optional[RunState]:
+        """:meth:`get` for async callers; reloading and re-spilling happen in a worker thread."""
+
+        with self._lock:
+            run_state = self._runs.get(run_id)
+            if run_state is not None:
+                self._runs.move_to_end(run_id)
+                return run_state
+        return await asyncio.to_thread(self.get, run_id)
 
     def update_node(self, run_id: str, node_cache: NodeCache) -> None:
         """Store the execution results for a node."""
 
-        run_state = self._runs.get(run_id)
+        run_state = self.get(run_id)
         if not run_state:
             return
         run_state.node_results[node_cache.node_id] = node_cache
 
     def forget(self, run_id: str) -> None:
-        """Remove a run from memory."""
+        """Remove a run from memory and disk."""
 
-        self._runs.pop(run_id, None)
+        with self._lock:
+            self._runs.pop(run_id, None)
+            self._sizes.pop(run_id, None)
+            if self._spilled.pop(run_id, None) is not None:
+                self._spill_path(run_id).unlink(missing_ok=True)
 
     def all_runs(self) -> Dict[str, RunState]:
-        """Return a copy of all known runs."""
+        """Return a copy of the runs currently held in memory."""
+
+        with self._lock:
+            return dict(self._runs)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """Summaries of every known run, resident or spilled, oldest first."""
+
+        with self._lock:
+            items = [_summary(state) for state in self._runs.values()]
+            items.extend(self._spilled.values())
+        return sorted(items, key=lambda item: item["startedAt"])
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    # --- spilling ---
+
+    def _pick_victims(self, keep: Optional[str] = None) -> List[RunState]:
+        """Choose least recently used finished runs to spill (caller holds the lock).
+
+        Victims stay resident until their file is written, so :meth:`get`
+        keeps answering for them in the meantime.
+        """
+        count = len(self._runs) - len(self._spilling)
+        total = sum(size for run_id, size in self._sizes.items() if run_id not in self._spilling)
+        victims: List[RunState] = []
+        for run_id in self._runs:
+            if count <= self.max_runs and total <= self.max_bytes:
+                break
+            if run_id not in self._sizes or run_id == keep or run_id in self._spilling:
+                continue  # active, just reloaded, or already being written
+            self._spilling.add(run_id)
+            victims.append(self._runs[run_id])
+            count -= 1
+            total -= self._sizes[run_id]
+        return victims
+
+    def _spill_all(self, victims: List[RunState]) -> None:
+        for run_state in victims:
+            self._spill(run_state)
+        if victims:
+            self._prune_spilled()
+
+    def _spill(self, run_state: RunState) -> None:
+        run_id = run_state.run_id
+        try:
+            path = self._spill_path(run_id)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(gzip.compress(_dump_run(run_state), compresslevel=6))
+            os.replace(tmp, path)
+        finally:
+            with self._lock:
+                self._spilling.discard(run_id)
+        with self._lock:
+            if self._runs.get(run_id) is not run_state or run_id not in self._sizes:
+                return  # re-registered while the file was being written
+            self._spilled[run_id] = _summary(run_state)
+            del self._runs[run_id]
+            del self._sizes[run_id]
+
+    def _prune_spilled(self) -> None:
+        """Delete the oldest spill files beyond ``max_spilled`` or ``max_spill_age``."""
+
+        with self._lock:
+            run_ids = list(self._spilled)
+        aged = []
+        for run_id in run_ids:
+            try:
+                aged.append((self._spill_path(run_id).stat().st_mtime, run_id))
+            except OSError:
+                aged.append((0.0, run_id))
+        aged.sort()
+        excess = len(aged) - self.max_spilled
+        cutoff = time.time() - self.max_spill_age if self.max_spill_age is not None else None
+        for position, (mtime, run_id) in enumerate(aged):
+            if position >= excess and (cutoff is None or mtime >= cutoff):
+                continue
+            with self._lock:
+                if self._spilled.pop(run_id, None) is None:
+                    continue  # reloaded in the meantime
+                self._spill_path(run_id).unlink(missing_ok=True)
+
+    def _spill_root(self) -> Path:
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="dspy-builder-runs-"))
+        self._spill_dir.mkdir(parents=True, exist_ok=True)
+        return self._spill_dir
+
+    def _spill_path(self, run_id: str) -> Path:
+        name = hashlib.sha1(run_id.encode("utf-8")).hexdigest()
+        return self._spill_root() / f"{name}.jsonl.gz"
 
-        return dict(self._runs)
+    def _index_spilled(self) -> None:
+        """Pick up runs spilled by a previous process (header line only)."""
 
+        for path in sorted(self._spill_dir.glob("*.jsonl.gz")):
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as fh:
+                    header = json.loads(fh.readline())
+            except (OSError, ValueError):
+                continue
+            graph_id = header.get("graph", {}).get("id")
+            self._spilled[header["runId"]] = {
+                "runId": header["runId"],
+                "graphId": graph_id,
+                "startedAt": header["startedAt"],
+                "nodeCount": header.get("nodeCount"),
+            }
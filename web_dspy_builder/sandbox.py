@@ -0,0 +1,298 @@
+"""Warm pool of worker processes that execute python nodes.
+
+Running user code with ``exec`` on the event loop thread lets one CPU-heavy
+node stall every run on the server, and there is no way to interrupt it.
+:class:`SandboxPool` keeps a few worker processes alive and ships each python
+node to one of them over a pipe (arguments and results are pickled). Each
+worker caches compiled code objects by code hash, runs under an address-space
+limit, and is killed and replaced when a node exceeds its wall-clock budget
+or the awaiting task is cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import traceback
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from io import StringIO
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MEMORY_MB = 512
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+_CODE_CACHE_SIZE = 256
+
+SAFE_BUILTINS = {
+    "len": len,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "sorted": sorted,
+    "range": range,
+    "enumerate": enumerate,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "set": set,
+    "tuple": tuple,
+    "zip": zip,
+    "any": any,
+    "all": all,
+}
+
+
+class SandboxError(RuntimeError):
+    """Raised when a python node cannot be run to completion in a worker."""
+
+
+def code_key(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def execute(
+    code: Any,
+    inputs: Dict[str, Any],
+    config: Dict[str, Any],
+) -> Tuple[Dict[str, Any], str]:
+    """Run node code (source or code object); returns ``(outputs, stdout)``."""
+
+    local_vars: Dict[str, Any] = {"inputs": inputs, "config": config, "outputs": {}}
+    stdout = StringIO()
+    with redirect_stdout(stdout):
+        exec(  # noqa: S102 - execution is sandboxed via SAFE_BUILTINS
+            code,
+            {"__builtins__": SAFE_BUILTINS},
+            local_vars,
+        )
+    return local_vars.get("outputs") or {}, stdout.getvalue()
+
+
+def _limit_memory(memory_mb: int) -> None:
+    if memory_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return
+    limit = memory_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def _worker_main(conn: Any, memory_mb: int) -> None:
+    _limit_memory(memory_mb)
+    compiled: "OrderedDict[str, Any]" = OrderedDict()
+    while True:
+        try:
+            key, source, inputs, config = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            code = compiled.get(key)
+            if code is None:
+                code = compile(source, "<python node>", "exec")
+                compiled[key] = code
+                if len(compiled) > _CODE_CACHE_SIZE:
+                    compiled.popitem(last=False)
+            else:
+                compiled.move_to_end(key)
+            outputs, stdout = execute(code, inputs, config)
+        except BaseException as exc:  # reported to the parent, worker keeps serving
+            _reply(conn, ("error", exc, traceback.format_exc()))
+        else:
+            _reply(conn, ("ok", outputs, stdout))
+
+
+def _reply(conn: Any, message: Tuple[Any, ...]) -> None:
+    try:
+        conn.send(message)
+    except Exception as exc:  # unpicklable outputs or exception
+        if message[0] == "ok":
+            error: BaseException = SandboxError(f"Python node outputs could not be pickled: {exc}")
+        else:
+            error = SandboxError(f"{type(message[1]).__name__}: {message[1]}")
+        conn.send(("error", error, message[-1] if message[0] == "error" else ""))
+
+
+class _Worker:
+    def __init__(self, context: Any, memory_mb: int) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child, memory_mb), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self) -> None:
+        # The pipe is left for the garbage collector: a thread may still be
+        # blocked reading it and must see EOF rather than a recycled fd.
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+
+
+class SandboxPool:
+    """Bounded set of reusable worker processes for python node execution."""
+
+    def __init__(
+        self,
+        *,
+        workers: int = DEFAULT_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT,
+        memory_mb: int = DEFAULT_MEMORY_MB,
+        start_method: Optional[str] = None,
+    ) -> None:
+        self.size = max(1, workers)
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: List[_Worker] = []
+        self._started = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"runs": 0, "timeouts": 0, "cancelled": 0, "restarts": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["SandboxPool"]:
+        """Configure from ``DSPY_BUILDER_PYTHON_SANDBOX`` ("inline" disables),
+        ``DSPY_BUILDER_PYTHON_WORKERS``, ``DSPY_BUILDER_PYTHON_TIMEOUT`` and
+        ``DSPY_BUILDER_PYTHON_MEMORY_MB``."""
+
+        mode = os.getenv("DSPY_BUILDER_PYTHON_SANDBOX", "process")
+        if mode.lower() in {"", "inline", "off", "0", "false"}:
+            return None
+        return cls(
+            workers=int(os.getenv("DSPY_BUILDER_PYTHON_WORKERS", DEFAULT_WORKERS)),
+            timeout=float(os.getenv("DSPY_BUILDER_PYTHON_TIMEOUT", DEFAULT_TIMEOUT)),
+            memory_mb=int(os.getenv("DSPY_BUILDER_PYTHON_MEMORY_MB", DEFAULT_MEMORY_MB)),
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.size)
+            self._loop = loop
+        return self._slots
+
+    def _take_idle(self) -> Optional[_Worker]:
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.alive():
+                return worker
+            worker.kill()
+            self._started -= 1
+            self.stats["restarts"] += 1
+        return None
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.memory_mb)
+
+    async def run(
+        self,
+        code: str,
+        inputs: Dict[str, Any],
+        config: Dict[str, Any],
+        *,
+        timeout: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Execute ``code`` in a worker; returns ``(outputs, stdout)``.
+
+        Exceptions raised by the node code are re-raised here. Timeouts, worker
+        crashes and unpicklable data raise :class:`SandboxError`.
+        """
+
+        budget = self.timeout if timeout is None else timeout
+        async with self._semaphore():
+            worker = self._take_idle()
+            if worker is None:
+                worker = await asyncio.to_thread(self._spawn)
+                self._started += 1
+            healthy = False
+            try:
+                try:
+                    worker.conn.send((code_key(code), code, inputs, config))
+                except Exception as exc:
+                    healthy = True
+                    raise SandboxError(f"Python node inputs could not be pickled: {exc}") from exc
+                receive = asyncio.to_thread(worker.conn.recv)
+                try:
+                    status, payload, extra = await asyncio.wait_for(
+                        receive, budget if budget and budget > 0 else None
+                    )
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    raise SandboxError(f"Python node exceeded its {budget:g}s time limit") from None
+                except asyncio.CancelledError:
+                    self.stats["cancelled"] += 1
+                    raise
+                except (EOFError, OSError) as exc:
+                    raise SandboxError(
+                        f"Python worker exited unexpectedly (exit code {worker.process.exitcode})"
+                    ) from exc
+                except Exception as exc:
+                    # e.g. a class defined in node code, unknown to the parent.
+                    raise SandboxError(f"Python node result could not be unpickled: {exc}") from exc
+                healthy = True
+            finally:
+                if healthy:
+                    self._idle.append(worker)
+                else:
+                    # Killing the process also unblocks the receiving thread.
+                    worker.kill()
+                    self._started -= 1
+        self.stats["runs"] += 1
+        if status == "ok":
+            return payload, extra
+        if extra and hasattr(payload, "add_note"):
+            payload.add_note(f"Traceback in python worker:\n{extra}")
+        raise payload
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": self._started,
+            "idle": len(self._idle),
+            "maxWorkers": self.size,
+            "timeout": self.timeout,
+            "memoryMb": self.memory_mb,
+        }
+
+    def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+            worker.conn.close()
+        self._started -= len(idle)
+
+
+_default_pool: Optional[SandboxPool] = None
+_default_loaded = False
+
+
+def default_sandbox() -> Optional[SandboxPool]:
+    """Process-wide pool shared by every :class:`GraphRunner` (configured from env)."""
+
+    global _default_pool, _default_loaded
+    if not _default_loaded:
+        _default_pool = SandboxPool.from_env()
+        _default_loaded = True
+    return _default_pool
+
+
+__all__ = ["SAFE_BUILTINS", "SandboxError", "SandboxPool", "default_sandbox", "execute"]
@@ -5,20 +5,26 @@ from __future__ import annotations
 import json
 import uuid
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
+from .event_stream import EventStream
 from .graph_runner import GraphRunner
 from .models import RunRequest
+from .node_cache import PersistentNodeCache
+from .profiler import profile_run
+from .response_cache import default_response_cache
 from .run_manager import RunManager
+from .sandbox import default_sandbox
 
 
 FRONTEND_DIR = Path(__file__).resolve().parent / "frontend"
 
-run_manager = RunManager()
+run_manager = RunManager.from_env()
+node_cache: Optional[PersistentNodeCache] = PersistentNodeCache.from_env()
 
 
 def create_app() -> FastAPI:
@@ -36,21 +42,11 @@ def create_app() -> FastAPI:
 
     @app.get("/api/runs")
     async def list_runs() -> Dict[str, object]:
-        runs = []
-        for run_id, state in run_manager.all_runs().items():
-            runs.append(
-                {
-                    "runId": run_id,
-                    "graphId": state.graph.id,
-                    "startedAt": state.started_at.isoformat(),
-                    "nodeCount": len(state.node_results),
-                }
-            )
-        return {"runs": runs}
+        return {"runs": run_manager.summaries()}
 
     @app.get("/api/runs/{run_id}")
     async def get_run(run_id: str) -> Dict[str, object]:
-        state = run_manager.get(run_id)
+        state = await run_manager.aget(run_id)
         if not state:
             raise HTTPException(status_code=404, detail="run not found")
         return {
@@ -61,9 +57,44 @@ def create_app() -> FastAPI:
             "timeline": state.timeline,
         }
 
+    @app.get("/api/runs/{run_id}/profile")
+    async def get_run_profile(
+        run_id: str, prompt_price: float = 0.0, completion_price: float = 0.0
+    ) -> Dict[str, object]:
+        state = await run_manager.aget(run_id)
+        if not state:
+            raise HTTPException(status_code=404, detail="run not found")
+        profile = profile_run(
+            state, prompt_price=prompt_price, completion_price=completion_price
+        )
+        return profile.to_dict()
+
+    @app.get("/api/cache")
+    async def get_cache_stats() -> Dict[str, object]:
+        if node_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **node_cache.stats()}
+
+    @app.get("/api/llm/cache")
+    async def get_llm_cache_stats() -> Dict[str, object]:
+        cache = default_response_cache()
+        if cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **cache.snapshot()}
+
+    @app.get("/api/sandbox")
+    async def get_sandbox_stats() -> Dict[str, object]:
+        pool = default_sandbox()
+        if pool is None:
+            return {"enabled": False}
+        return {"enabled": True, **pool.snapshot()}
+
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket) -> None:
         await websocket.accept()
+        # Events reach the client in array frames through a bounded queue, so a
+        # slow client applies backpressure instead of one send per event.
+        stream = EventStream.from_env(websocket.send_json)
         try:
             while True:
                 message = await websocket.receive_text()
@@ -72,9 +103,9 @@ def create_app() -> FastAPI:
                 run_id = request.run_id or str(uuid.uuid4())
                 base_state = None
                 if request.base_run_id:
-                    base_state = run_manager.get(request.base_run_id)
+                    base_state = await run_manager.aget(request.base_run_id)
                     if base_state is None:
-                        await websocket.send_json(
+                        await stream.publish(
                             {
                                 "type": "run_error",
                                 "runId": run_id,
@@ -86,15 +117,13 @@ def create_app() -> FastAPI:
                 graph = request.graph
                 settings = request.settings
 
-                async def sender(event: Dict[str, object]) -> None:
-                    await websocket.send_json(event)
-
                 runner = GraphRunner(
                     graph,
                     settings,
                     run_id=run_id,
-                    sender=sender,
+                    sender=stream.publish,
                     manager=run_manager,
+                    node_cache=node_cache,
                 )
 
                 resume_state = base_state if request.action == "replay" else None
@@ -106,15 +135,18 @@ def create_app() -> FastAPI:
                         overrides=request.overrides,
                     )
                 except Exception as exc:  # pragma: no cover - error propagation
-                    await websocket.send_json(
+                    await stream.publish(
                         {
                             "type": "run_error",
                             "runId": run_id,
                             "message": str(exc),
                         }
                     )
+                await stream.flush()
         except WebSocketDisconnect:
             return
+        finally:
+            await stream.close()
 
     return app
 
@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 from typing import Any
 
 import os
 
 from fastapi import Depends, FastAPI, Form, HTTPException, Request, status
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
@@ -17,6 +17,7 @@ import timestamp_app_core as core
 from starlette.concurrency import run_in_threadpool
 
 from . import utils
+from .live import PartialSource, partial_digest, partial_events
 from .auth import AuthContext, UserRead
 from refiner_signature import ScheduleBlock
 
@@ -130,18 +131,27 @@ def create_app(config: WebConfig | None = None) -> FastAPI:
             data.update(context)
         return templates.TemplateResponse(request, name, data)
 
-    async def load_history() -> list[tuple[str, list[str]]]:
-        return await run_in_threadpool(utils.load_constraints_history, config.constraints_path, config.history_limit)
+    async def load_history(
+        start: date | None = None,
+        end: date | None = None,
+    ) -> list[tuple[str, list[str]]]:
+        return await run_in_threadpool(
+            utils.load_constraints_history,
+            config.constraints_path,
+            config.history_limit,
+            start=start,
+            end=end,
+        )
 
-    async def load_artifact() -> tuple[str, str]:
+    async def load_artifact() -> tuple[str, str, float | None]:
         text, mtime = await run_in_threadpool(utils.load_text_and_mtime, config.artifact_path)
         formatted = utils.format_timedelta(datetime.now(), mtime)
-        return text, formatted
+        return text, formatted, mtime.timestamp() if mtime else None
 
-    async def load_memory(path: Path) -> tuple[str, str]:
+    async def load_memory(path: Path) -> tuple[str, str, float | None]:
         text, mtime = await run_in_threadpool(utils.load_text_and_mtime, path)
         formatted = utils.format_timedelta(datetime.now(), mtime)
-        return text, formatted
+        return text, formatted, mtime.timestamp() if mtime else None
 
     async def build_snapshot(path: Path) -> TextSnapshot:
         text, mtime = await run_in_threadpool(utils.load_text_and_mtime, path)
@@ -180,96 +190,113 @@ def create_app(config: WebConfig | None = None) -> FastAPI:
     ) -> HTMLResponse:
         if user is None:
             return await render_template("login.html", request, {}, user=None)
-        artifact_text, artifact_age = await load_artifact()
-        memory_text, memory_age = await load_memory(config.memory_path)
-        short_term_text = ""
-        short_term_age = "never"
+        context: dict[str, Any] = {}
+        for name in ("artifact", "memory", "history", "schedule"):
+            context.update(await partials[name].build())
+        return await render_template("index.html", request, context, user=user)
+
+    async def artifact_context() -> dict[str, Any]:
+        artifact_text, artifact_age, artifact_ts = await load_artifact()
+        return {"artifact_text": artifact_text, "artifact_age": artifact_age, "artifact_ts": artifact_ts}
+
+    async def schedule_context() -> dict[str, Any]:
+        return {"schedule": await build_schedule_snapshot()}
+
+    async def memory_context() -> dict[str, Any]:
+        memory_text, memory_age, memory_ts = await load_memory(config.memory_path)
+        short_term_text, short_term_age, short_term_ts = "", "never", None
         if config.short_term_memory_path is not None:
-            short_term_text, short_term_age = await load_memory(config.short_term_memory_path)
-        history = await load_history()
-        schedule_snapshot = await build_schedule_snapshot()
-        return await render_template(
-            "index.html",
-            request,
-            {
-                "artifact_text": artifact_text,
-                "artifact_age": artifact_age,
-                "memory_text": memory_text,
-                "memory_age": memory_age,
-                "short_term_text": short_term_text,
-                "short_term_age": short_term_age,
-                "history": history,
-                "schedule": schedule_snapshot,
-            },
-            user=user,
-        )
+            short_term_text, short_term_age, short_term_ts = await load_memory(config.short_term_memory_path)
+        return {
+            "memory_text": memory_text,
+            "memory_age": memory_age,
+            "memory_ts": memory_ts,
+            "short_term_text": short_term_text,
+            "short_term_age": short_term_age,
+            "short_term_ts": short_term_ts,
+        }
+
+    async def history_context(start: date | None = None, end: date | None = None) -> dict[str, Any]:
+        return {"history": await load_history(start, end)}
+
+    partials: dict[str, PartialSource] = {
+        "artifact": PartialSource("partials/artifact.html", artifact_context, [config.artifact_path]),
+        "schedule": PartialSource("partials/schedule.html", schedule_context, [config.schedule_path]),
+        "memory": PartialSource(
+            "partials/memory.html",
+            memory_context,
+            [p for p in (config.memory_path, config.short_term_memory_path) if p is not None],
+        ),
+        "history": PartialSource("partials/history.html", history_context, [config.constraints_path]),
+    }
+
+    async def conditional_partial(
+        name: str,
+        request: Request,
+        context: dict[str, Any],
+        user: UserRead,
+        *,
+        vary: str = "",
+    ) -> Response:
+        """Render a partial with an ETag; answer 304 if the client already has it."""
+        etag = f'"{name}-{partial_digest({**context, "_vary": vary})}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response = await render_template(partials[name].template, request, context, user=user)
+        response.headers.update(headers)
+        return response
+
+    def render_partial_html(template: str, context: dict[str, Any]) -> str:
+        data = {"config": config, "user": None, "login_url": auth_context.login_url(), **context}
+        return templates.get_template(template).render(data)
 
     @app.get("/partials/artifact", response_class=HTMLResponse)
     async def get_artifact_partial(
         request: Request,
         user: UserRead = Depends(auth_context.current_user),
-    ) -> HTMLResponse:
-        artifact_text, artifact_age = await load_artifact()
-        return await render_template(
-            "partials/artifact.html",
-            request,
-            {
-                "artifact_text": artifact_text,
-                "artifact_age": artifact_age,
-            },
-            user=user,
-        )
+    ) -> Response:
+        return await conditional_partial("artifact", request, await artifact_context(), user)
 
     @app.get("/partials/schedule", response_class=HTMLResponse)
     async def get_schedule_partial(
         request: Request,
         user: UserRead = Depends(auth_context.current_user),
-    ) -> HTMLResponse:
-        schedule_snapshot = await build_schedule_snapshot()
-        return await render_template(
-            "partials/schedule.html",
-            request,
-            {
-                "schedule": schedule_snapshot,
-            },
-            user=user,
-        )
+    ) -> Response:
+        return await conditional_partial("schedule", request, await schedule_context(), user)
 
     @app.get("/partials/memory", response_class=HTMLResponse)
     async def get_memory_partial(
         request: Request,
         user: UserRead = Depends(auth_context.current_user),
-    ) -> HTMLResponse:
-        memory_text, memory_age = await load_memory(config.memory_path)
-        short_term_text = ""
-        short_term_age = "never"
-        if config.short_term_memory_path is not None:
-            short_term_text, short_term_age = await load_memory(config.short_term_memory_path)
-        return await render_template(
-            "partials/memory.html",
-            request,
-            {
-                "memory_text": memory_text,
-                "memory_age": memory_age,
-                "short_term_text": short_term_text,
-                "short_term_age": short_term_age,
-            },
-            user=user,
-        )
+    ) -> Response:
+        return await conditional_partial("memory", request, await memory_context(), user)
 
     @app.get("/partials/history", response_class=HTMLResponse)
     async def get_history_partial(
         request: Request,
+        start: date | None = None,
+        end: date | None = None,
         user: UserRead = Depends(auth_context.current_user),
-    ) -> HTMLResponse:
-        history = await load_history()
-        return await render_template(
-            "partials/history.html",
-            request,
-            {
-                "history": history,
-            },
-            user=user,
+    ) -> Response:
+        context = await history_context(start, end)
+        return await conditional_partial("history", request, context, user, vary=f"{start}:{end}")
+
+    @app.get("/events")
+    async def get_events(
+        request: Request,
+        user: UserRead = Depends(auth_context.current_user),
+    ) -> StreamingResponse:
+        """Server-sent events carrying re-rendered partials when their content changes."""
+        stream = partial_events(
+            partials,
+            render=render_partial_html,
+            is_disconnected=request.is_disconnected,
+        )
+        return StreamingResponse(
+            stream,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
 
     @app.post("/messages", response_class=HTMLResponse)
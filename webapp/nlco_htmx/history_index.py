@@ -0,0 +1,200 @@
+"""Persistent date-heading index for ``constraints.md``.
+
+The index records, for every ``# YYYY-MM-DD`` section, the byte offset of the
+heading and the number of non-empty entry lines in it. It lives in a sidecar
+JSON file next to the constraints file (``.<name>.index.json``) and is updated
+incrementally: only bytes appended since the last indexed newline are scanned.
+A rewrite (different inode, shrunk file or changed trailing bytes) triggers a
+rebuild.
+
+With the index, history requests read just the region that holds the last
+``limit`` entries or the requested date range instead of the whole file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+DATE_HEADING_RE = re.compile(r"^#\s*(\d{4}-\d{2}-\d{2})$")
+
+_VERSION = 1
+_VERIFY_BYTES = 64
+
+
+@dataclass
+class Section:
+    offset: int  # byte offset of the heading (or 0 for text before the first heading)
+    date: Optional[str]  # None for entries before the first heading
+    count: int = 0  # non-empty, non-heading lines
+
+
+@dataclass
+class HistoryIndex:
+    ino: int = 0
+    mtime_ns: int = 0  # file mtime when last checked; catches same-size rewrites
+    indexed: int = 0  # bytes scanned, always just after a newline
+    last_bytes: str = ""  # hex of the bytes before ``indexed``
+    sections: list[Section] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "version": _VERSION,
+                "ino": self.ino,
+                "mtime_ns": self.mtime_ns,
+                "indexed": self.indexed,
+                "last_bytes": self.last_bytes,
+                "sections": [[s.offset, s.date, s.count] for s in self.sections],
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "HistoryIndex":
+        data = json.loads(raw)
+        if data.get("version") != _VERSION:
+            raise ValueError("unsupported index version")
+        return cls(
+            ino=data["ino"],
+            mtime_ns=data.get("mtime_ns", 0),
+            indexed=data["indexed"],
+            last_bytes=data["last_bytes"],
+            sections=[Section(o, d, c) for o, d, c in data["sections"]],
+        )
+
+
+_CACHE: dict[Path, HistoryIndex] = {}
+_LOCK = threading.Lock()
+
+
+def sidecar_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.index.json")
+
+
+def _scan(fh, index: HistoryIndex, start: int, end: int) -> None:
+    """Extend ``index`` with complete lines in ``[start, end)``."""
+    fh.seek(start)
+    offset = start
+    for raw in fh:
+        if offset + len(raw) > end or not raw.endswith(b"\n"):
+            break  # partial last line; picked up by the next update
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        match = DATE_HEADING_RE.match(line)
+        if match:
+            index.sections.append(Section(offset, match.group(1)))
+        elif line.strip():
+            if not index.sections:
+                index.sections.append(Section(0, None))
+            index.sections[-1].count += 1
+        offset += len(raw)
+    index.indexed = offset
+
+
+def _is_append(fh, index: HistoryIndex, st: os.stat_result) -> bool:
+    if st.st_ino != index.ino or st.st_size < index.indexed:
+        return False
+    if st.st_size == index.indexed and st.st_mtime_ns != index.mtime_ns:
+        return False  # touched without growing: rewritten in place
+    expected = bytes.fromhex(index.last_bytes)
+    fh.seek(index.indexed - len(expected))
+    return fh.read(len(expected)) == expected
+
+
+def refresh_index(path: Path) -> Optional[HistoryIndex]:
+    """Bring the index for ``path`` up to date and return it (None if missing)."""
+    with _LOCK:
+        try:
+            fh = path.open("rb")
+        except FileNotFoundError:
+            _CACHE.pop(path, None)
+            return None
+        with fh:
+            st = os.fstat(fh.fileno())
+            index = _CACHE.get(path)
+            if index is None:
+                try:
+                    index = HistoryIndex.from_json(sidecar_path(path).read_text(encoding="utf-8"))
+                except (OSError, ValueError, KeyError, TypeError):
+                    index = None
+            if (
+                index is not None
+                and index.indexed == st.st_size
+                and index.ino == st.st_ino
+                and index.mtime_ns == st.st_mtime_ns
+            ):
+                _CACHE[path] = index
+                return index
+            if index is None or not _is_append(fh, index, st):
+                index = HistoryIndex(ino=st.st_ino)
+            before = index.indexed
+            _scan(fh, index, index.indexed, st.st_size)
+            if index.indexed != before or not index.last_bytes:
+                fh.seek(max(0, index.indexed - _VERIFY_BYTES))
+                index.last_bytes = fh.read(index.indexed - max(0, index.indexed - _VERIFY_BYTES)).hex()
+            if index.indexed != before or index.mtime_ns != st.st_mtime_ns:
+                index.mtime_ns = st.st_mtime_ns
+                _persist(path, index)
+        _CACHE[path] = index
+        return index
+
+
+def _persist(path: Path, index: HistoryIndex) -> None:
+    target = sidecar_path(path)
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        tmp.write_text(index.to_json(), encoding="utf-8")
+        os.replace(tmp, target)
+    except OSError:
+        pass  # read-only location: the in-memory index still works
+
+
+def read_region(path: Path, start: int, end: Optional[int] = None) -> str:
+    with path.open("rb") as fh:
+        fh.seek(start)
+        data = fh.read() if end is None else fh.read(end - start)
+    return data.decode("utf-8", errors="replace")
+
+
+def tail_offset(index: HistoryIndex, limit: int) -> int:
+    """Offset of the section from which at least ``limit`` entries remain."""
+    remaining = limit
+    for section in reversed(index.sections):
+        remaining -= section.count
+        if remaining <= 0:
+            return section.offset
+    return 0
+
+
+def date_range_offsets(
+    index: HistoryIndex, start: Optional[str], end: Optional[str]
+) -> Optional[tuple[int, Optional[int]]]:
+    """Byte range covering sections dated within ``[start, end]`` (ISO strings).
+
+    Returns None when no section matches. Sections are assumed to be in date
+    order, which is how the writers append them.
+    """
+    hits = [
+        i for i, s in enumerate(index.sections)
+        if s.date is not None and (start is None or s.date >= start) and (end is None or s.date <= end)
+    ]
+    if not hits:
+        return None
+    first, last = hits[0], hits[-1]
+    stop = index.sections[last + 1].offset if last + 1 < len(index.sections) else None
+    return index.sections[first].offset, stop
+
+
+__all__ = [
+    "HistoryIndex",
+    "Section",
+    "date_range_offsets",
+    "read_region",
+    "refresh_index",
+    "sidecar_path",
+    "tail_offset",
+]
@@ -0,0 +1,87 @@
+"""Change detection for the HTMX partials: content digests and an SSE stream."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Mapping, Optional
+
+from pydantic import BaseModel
+
+from file_watch import ChangeEvent, FileWatcher
+
+# Relative labels ("2m 14s ago") change every second without the underlying
+# content changing; the browser keeps them current from the timestamps instead.
+_VOLATILE_SUFFIX = "_age"
+_VOLATILE_FIELDS = {"age_label"}
+
+
+@dataclass
+class PartialSource:
+    """A template plus the async context builder and files it depends on."""
+
+    template: str
+    build: Callable[[], Awaitable[dict[str, Any]]]
+    paths: list[Path] = field(default_factory=list)
+
+
+def _stable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude=_VOLATILE_FIELDS)
+    if isinstance(value, (list, tuple)):
+        return [_stable(v) for v in value]
+    return value
+
+
+def partial_digest(context: Mapping[str, Any]) -> str:
+    """Hash of the template inputs, ignoring relative age labels."""
+    stable = {k: _stable(v) for k, v in context.items() if not k.endswith(_VOLATILE_SUFFIX)}
+    raw = json.dumps(stable, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def format_sse(event: str, data: str) -> str:
+    lines = "\n".join(f"data: {line}" for line in data.splitlines() or [""])
+    return f"event: {event}\n{lines}\n\n"
+
+
+async def partial_events(
+    partials: Mapping[str, PartialSource],
+    *,
+    render: Callable[[str, dict[str, Any]], str],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    keepalive: float = 25.0,
+    watcher: Optional[FileWatcher] = None,
+) -> AsyncIterator[str]:
+    """Yield SSE frames with re-rendered partials whenever their content changes.
+
+    The client already has the current page, so only changes after connecting
+    are pushed. Comment frames keep idle connections open through proxies.
+    """
+    changed = ChangeEvent()
+    watcher = watcher or FileWatcher(debounce=0.2, poll_interval=2.0)
+    for source in partials.values():
+        for path in source.paths:
+            watcher.add(path, changed.set)
+    last = {name: partial_digest(await source.build()) for name, source in partials.items()}
+    watcher.start()
+    try:
+        yield ": connected\n\n"
+        while not await is_disconnected():
+            if not await changed.wait(timeout=keepalive):
+                yield ": ping\n\n"
+                continue
+            for name, source in partials.items():
+                context = await source.build()
+                digest = partial_digest(context)
+                if digest == last[name]:
+                    continue
+                last[name] = digest
+                yield format_sse(name, render(source.template, context))
+    finally:
+        watcher.stop()
+
+
+__all__ = ["PartialSource", "format_sse", "partial_digest", "partial_events"]
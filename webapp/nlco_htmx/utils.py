@@ -10,6 +10,7 @@ from typing import Optional
 from refiner_signature import ScheduleBlock, normalize_schedule
 from file_lock import locked_file
 from constraints_io import build_append_block
+from . import history_index
 import os
 
 DATE_HEADING_RE = re.compile(r"^#\s*(\d{4}-\d{2}-\d{2})$")
@@ -66,13 +67,36 @@ def extract_last_constraints_date(content: str) -> Optional[date]:
     return None
 
 
-def load_constraints_history(path: Path, limit: int = 200) -> list[tuple[str, list[str]]]:
+def load_constraints_history(
+    path: Path,
+    limit: int = 200,
+    *,
+    start: date | str | None = None,
+    end: date | str | None = None,
+) -> list[tuple[str, list[str]]]:
     """Return most recent constraint entries grouped by date heading.
 
-    ``limit`` counts individual lines excluding headings.
+    ``limit`` counts individual lines excluding headings. ``start``/``end``
+    (inclusive, ``YYYY-MM-DD``) restrict the result to a date range. Only the
+    region of the file that can contain the result is read; see
+    :mod:`history_index`.
     """
 
-    content = read_text(path)
+    index = history_index.refresh_index(path)
+    if index is None:
+        return []
+    if start is not None or end is not None:
+        span = history_index.date_range_offsets(
+            index,
+            str(start) if start is not None else None,
+            str(end) if end is not None else None,
+        )
+        if span is None:
+            return []
+        content = history_index.read_region(path, *span)
+    else:
+        content = history_index.read_region(path, history_index.tail_offset(index, limit))
+
     lines = [line for line in content.splitlines() if line.strip()]
     history: list[tuple[str, list[str]]] = []
     current_date: Optional[str] = None